@@ -8,4 +8,13 @@ class AboutConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.about'
-    verbose_name = 'درباره من'
\ No newline at end of file
+    verbose_name = 'درباره من'
+    
+    def ready(self):
+        """
+        با هر تغییر در این مدل ها کش صفحه درباره من بی اعتبار می شود
+        """
+        from apps.core.cache import register_invalidation
+        from .models import Profile, Service, Testimonial, Client
+        
+        register_invalidation(Profile, Service, Testimonial, Client)
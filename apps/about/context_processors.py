@@ -0,0 +1,13 @@
+from django.utils.functional import SimpleLazyObject
+
+from .models import Profile
+
+
+def profile(request):
+    """
+    اضافه کردن پروفایل به context همه template ها (مثل base.html)
+
+    پروفایل از کش singleton خوانده می شود و فقط وقتی template واقعا
+    از آن استفاده کند بارگذاری می شود
+    """
+    return {'profile': SimpleLazyObject(Profile.get_solo)}
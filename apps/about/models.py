@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
+from apps.core.cache import aget_singleton, get_singleton
 from apps.core.models import TimeStampedModel, BaseModel
 
 
@@ -92,10 +94,27 @@ class Profile(TimeStampedModel):
     def save(self, *args, **kwargs):
         """
         فقط یک پروفایل در سیستم مجاز است
+
+        بررسی فقط هنگام ایجاد و مستقیما از دیتابیس انجام می شود (کش ممکن
+        است قدیمی باشد)
         """
-        if not self.pk and Profile.objects.exists():
+        if self._state.adding and Profile.objects.exists():
             raise ValueError('فقط یک پروفایل مجاز است')
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def get_solo(cls):
+        """
+        دریافت تنها پروفایل سیستم از کش (یا None اگر هنوز ساخته نشده)
+        """
+        return get_singleton('about:profile', cls, lambda: cls.objects.first())
+
+    @classmethod
+    async def aget_solo(cls):
+        """
+        نسخه async get_solo (برای view های async)
+        """
+        return await aget_singleton('about:profile', cls, cls.objects.afirst)
 
 
 class Service(BaseModel):
@@ -123,6 +142,14 @@ class Service(BaseModel):
         verbose_name = _('خدمت')
         verbose_name_plural = _('خدمات')
         ordering = ['order', 'created_at']
+        indexes = [
+            # index partial برای Service.active.all() با همان ترتیب پیش فرض
+            models.Index(
+                fields=['order', 'created_at'],
+                condition=Q(is_active=True),
+                name='about_service_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -159,6 +186,13 @@ class Testimonial(BaseModel):
         verbose_name = _('نظر مشتری')
         verbose_name_plural = _('نظرات مشتریان')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at'],
+                condition=Q(is_active=True),
+                name='about_testimonial_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return f'{self.name} - {self.rating} ستاره'
@@ -190,6 +224,13 @@ class Client(BaseModel):
         verbose_name = _('مشتری')
         verbose_name_plural = _('مشتریان')
         ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(
+                fields=['order', 'created_at'],
+                condition=Q(is_active=True),
+                name='about_client_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -7,5 +8,6 @@ app_name = 'about'
 urlpatterns = [
     # صفحه اصلی درباره من
     # مثال: /about/ یا /
-    path('', views.AboutView.as_view(), name='index'),
+    # با ASGI نسخه async view استفاده می شود (settings.ASYNC_VIEWS)
+    path('', (views.AsyncAboutView if settings.ASYNC_VIEWS else views.AboutView).as_view(), name='index'),
 ]
\ No newline at end of file
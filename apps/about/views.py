@@ -1,30 +1,43 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from django.views.generic.base import ContextMixin
+import asyncio
 import logging
 
+from apps.core.cache import aget_cached_many, get_cached_many
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.queries import query_budget
 from .models import Profile, Service, Testimonial, Client
 
 # تنظیم logger برای ثبت خطاها
 logger = logging.getLogger(__name__)
 
+# داده های خالی برای جلوگیری از خطا در صورت مشکل کش یا دیتابیس
+EMPTY_CONTEXT = {
+    'profile': None,
+    'services': [],
+    'testimonials': [],
+    'clients': [],
+}
 
-class AboutView(TemplateView):
+
+# validator ها، و با کش خالی: پروفایل، خدمات، نظرات و مشتریان
+@query_budget(max_queries=5)
+class AboutView(ConditionalGetMixin, TemplateView):
     """
     View صفحه درباره من
     
     این view اطلاعات پروفایل، خدمات، نظرات و مشتریان را نمایش می دهد
+    
+    داده های هر مدل جداگانه کش می شوند و با ذخیره یا حذف رکورد در ادمین
+    فقط کش همان مدل بی اعتبار می شود (apps/core/cache.py)
+
+    ETag و Last-Modified با یک query از روی updated_at همین مدل ها ساخته
+    می شوند و پاسخ 304 بدون render کردن template برگردانده می شود
+    (apps/core/conditional.py)
     """
     template_name = 'about/index.html'
-    
-    @method_decorator(cache_page(60 * 15))  # کش کردن برای 15 دقیقه
-    def dispatch(self, *args, **kwargs):
-        """
-        این متد قبل از اجرای get یا post اجرا می شود
-        اینجا کش را فعال می کنیم
-        """
-        return super().dispatch(*args, **kwargs)
+    conditional_models = (Profile, Service, Testimonial, Client)
     
     def get_context_data(self, **kwargs):
         """
@@ -33,41 +46,68 @@ class AboutView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         try:
-            # دریافت اطلاعات پروفایل (فقط یکی وجود دارد)
-            profile = Profile.objects.first()
-            
-            # دریافت خدمات فعال به ترتیب order
-            services = Service.active.all()
-            
-            # دریافت نظرات فعال
-            testimonials = Testimonial.active.all()
-            
-            # دریافت مشتریان فعال
-            clients = Client.active.all()
+            data = get_cached_many({
+                # خدمات فعال به ترتیب order
+                'services': (Service, lambda: list(Service.active.all())),
+                # نظرات فعال
+                'testimonials': (Testimonial, lambda: list(Testimonial.active.all())),
+                # مشتریان فعال
+                'clients': (Client, lambda: list(Client.active.all())),
+            })
             
             # اضافه کردن داده ها به context
-            context.update({
-                'profile': profile,
-                'services': services,
-                'testimonials': testimonials,
-                'clients': clients,
-            })
+            # پروفایل (فقط یکی وجود دارد) از کش singleton خوانده می شود
+            context['profile'] = Profile.get_solo()
+            context.update(data)
             
         except Exception as e:
             # در صورت بروز خطا، خطا را لاگ می کنیم
             logger.error(f'خطا در بارگذاری صفحه درباره من: {str(e)}')
             
             # داده های خالی برای جلوگیری از خطا
-            context.update({
-                'profile': None,
-                'services': [],
-                'testimonials': [],
-                'clients': [],
-            })
+            context.update(EMPTY_CONTEXT)
         
         return context
 
 
+async def active_list(model):
+    """
+    رکوردهای فعال یک مدل با ORM async
+    """
+    return [obj async for obj in model.active.all()]
+
+
+class AsyncAboutView(AboutView):
+    """
+    نسخه async صفحه درباره من (برای ASGI - settings.ASYNC_VIEWS)
+
+    پروفایل، خدمات، نظرات و مشتریان با asyncio.gather همزمان خوانده
+    می شوند و در انتظار کش و دیتابیس event loop آزاد است تا درخواست های
+    دیگر همان worker پاسخ بگیرند
+    """
+
+    async def get(self, request, *args, **kwargs):
+        context = ContextMixin.get_context_data(self, **kwargs)
+
+        try:
+            profile, data = await asyncio.gather(
+                Profile.aget_solo(),
+                aget_cached_many({
+                    'services': (Service, lambda: active_list(Service)),
+                    'testimonials': (Testimonial, lambda: active_list(Testimonial)),
+                    'clients': (Client, lambda: active_list(Client)),
+                }),
+            )
+            context['profile'] = profile
+            context.update(data)
+
+        except Exception as e:
+            logger.error(f'خطا در بارگذاری صفحه درباره من: {str(e)}')
+            context.update(EMPTY_CONTEXT)
+
+        return self.render_to_response(context)
+
+
 # Function-based view برای سازگاری با کدهای قدیمی
 def about_view(request):
     """
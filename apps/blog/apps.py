@@ -8,4 +8,28 @@ class BlogConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.blog'
-    verbose_name = 'وبلاگ'
\ No newline at end of file
+    verbose_name = 'وبلاگ'
+
+    def ready(self):
+        """
+        همگام نگه داشتن index جستجو، sitemap و feed ها با مقالات
+        """
+        from django.db.models.signals import (
+            m2m_changed, post_delete, post_migrate, post_save, pre_delete, pre_save,
+        )
+        from . import search, syndication
+        from .models import Category, Post, Tag
+
+        post_migrate.connect(search.setup_search, sender=self)
+        post_save.connect(search.update_search_index, sender=Post)
+        post_delete.connect(search.remove_from_search_index, sender=Post)
+
+        pre_save.connect(syndication.remember_post_state, sender=Post)
+        post_save.connect(syndication.post_saved, sender=Post)
+        pre_delete.connect(syndication.remember_post_tags, sender=Post)
+        post_delete.connect(syndication.post_deleted, sender=Post)
+        m2m_changed.connect(syndication.post_tags_changed, sender=Post.tags.through)
+        for model in (Category, Tag):
+            pre_save.connect(syndication.remember_taxonomy_slug, sender=model)
+            post_save.connect(syndication.taxonomy_changed, sender=model)
+            post_delete.connect(syndication.taxonomy_changed, sender=model)
\ No newline at end of file
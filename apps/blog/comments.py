@@ -0,0 +1,79 @@
+"""
+بارگذاری درخت نظرات
+
+همه نظرات لازم با یک query خوانده می شوند و درخت در حافظه با O(n)
+ساخته می شود. هر نظر یک لیست children دارد که در template قابل استفاده است:
+
+{% for comment in comments %}
+    {{ comment.content }}
+    {% for reply in comment.children %}...{% endfor %}
+{% endfor %}
+"""
+from .models import Comment
+
+# ستون هایی که برای نمایش نظر لازم است (post و email خوانده نمی شوند)
+TREE_FIELDS = ('id', 'parent_id', 'name', 'website', 'content', 'path', 'depth', 'created_at')
+
+
+def build_comment_tree(comments):
+    """
+    ساختن درخت از لیست نظرات و برگرداندن نظرات ریشه
+
+    نظرات کم عمق ترین سطح ریشه هستند. نظراتی که والدشان در لیست نیست
+    (مثلا والد غیرفعال شده) نمایش داده نمی شوند
+    """
+    comments = list(comments)
+    if not comments:
+        return []
+    nodes = {comment.pk: comment for comment in comments}
+    top_depth = min(comment.depth for comment in comments)
+    roots = []
+    for comment in comments:
+        comment.children = []
+    for comment in comments:
+        parent = nodes.get(comment.parent_id)
+        if parent is not None:
+            parent.children.append(comment)
+        elif comment.depth == top_depth:
+            roots.append(comment)
+    return roots
+
+
+def get_tree_queryset(post):
+    """
+    نظرات فعال یک مقاله به ترتیب path (ترتیب نمایش درخت)
+    """
+    return Comment.active.filter(post=post).only(*TREE_FIELDS).order_by('path')
+
+
+def load_comment_tree(post, root=None):
+    """
+    کل درخت نظرات یک مقاله (یا زیرشاخه یک نظر) با یک query
+    """
+    queryset = get_tree_queryset(post)
+    if root is not None:
+        # زیرشاخه ها بلافاصله بعد از خود نظر در ترتیب path قرار دارند
+        queryset = queryset.filter(path__gte=root.path, path__lt=f'{root.path}0')
+    return build_comment_tree(queryset)
+
+
+def load_comment_page(post, after=None, limit=20):
+    """
+    یک صفحه از نظرات ریشه همراه با همه پاسخ هایشان (دو query)
+
+    after مسیر آخرین نظر ریشه صفحه قبل است (صفحه بندی keyset روی path)
+    خروجی: (لیست نظرات ریشه, cursor صفحه بعد یا None)
+    """
+    roots = get_tree_queryset(post).filter(depth=0).values_list('path', flat=True)
+    if after:
+        roots = roots.filter(path__gt=after)
+    paths = list(roots[:limit + 1])
+    if not paths:
+        return [], None
+
+    has_next = len(paths) > limit
+    paths = paths[:limit]
+    # چون '/' از '0' کوچکتر است، همه زیرشاخه های آخرین ریشه
+    # قبل از path + '0' قرار می گیرند
+    queryset = get_tree_queryset(post).filter(path__gte=paths[0], path__lt=f'{paths[-1]}0')
+    return build_comment_tree(queryset), paths[-1] if has_next else None
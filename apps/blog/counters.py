@@ -0,0 +1,273 @@
+"""
+شمارنده بازدید مقالات با نوشتن تاخیری (write-behind)
+
+به جای اینکه هر بازدید یک UPDATE جداگانه روی جدول مقالات اجرا کند،
+بازدیدها ابتدا در یک شمارنده جمع می شوند و سپس به صورت دسته ای
+با UPDATE های اتمیک (F expression) در دیتابیس نوشته می شوند
+
+دو backend وجود دارد:
+- local: شمارنده در حافظه همان process (مناسب برای یک worker یا تست)
+  command flush_view_counts به این شمارش ها دسترسی ندارد
+- cache: شمارنده در کش مشترک مثل Redis (مناسب برای چند worker گونیکورن)
+
+تنظیمات از طریق BLOG_VIEW_COUNTER در settings خوانده می شود
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+# تنظیمات پیش فرض شمارنده
+DEFAULTS = {
+    'BACKEND': 'local',         # local یا cache
+    'FLUSH_INTERVAL': 10,       # فاصله زمانی نوشتن در دیتابیس (ثانیه)
+    'FLUSH_THRESHOLD': 500,     # تعداد بازدید جمع شده قبل از نوشتن فوری
+    'KEY_PREFIX': 'blog:views',
+}
+
+# حداکثر تعداد id در هر UPDATE (محدودیت متغیرهای SQLite)
+UPDATE_CHUNK_SIZE = 500
+
+
+def get_config():
+    """
+    ادغام تنظیمات پروژه با مقادیر پیش فرض
+    """
+    config = DEFAULTS.copy()
+    config.update(getattr(settings, 'BLOG_VIEW_COUNTER', {}))
+    return config
+
+
+def apply_counts(counts):
+    """
+    نوشتن شمارش ها در دیتابیس
+
+    مقالاتی که تعداد بازدید برابری دارند با یک UPDATE به روز می شوند
+    همه UPDATE ها داخل یک تراکنش اجرا می شوند
+    """
+    from .models import Post
+
+    grouped = defaultdict(list)
+    for pk, amount in counts.items():
+        if amount > 0:
+            grouped[amount].append(pk)
+
+    with transaction.atomic():
+        for amount, pks in grouped.items():
+            for start in range(0, len(pks), UPDATE_CHUNK_SIZE):
+                Post.objects.filter(pk__in=pks[start:start + UPDATE_CHUNK_SIZE]).update(
+                    views_count=F('views_count') + amount
+                )
+
+    return sum(amount for amount in counts.values() if amount > 0)
+
+
+class BaseViewCounter:
+    """
+    کلاس پایه شمارنده ها
+
+    یک thread پس زمینه به صورت دوره ای flush را صدا می زند
+    و هنگام خروج process هم بازدیدهای باقی مانده نوشته می شوند
+    """
+
+    def __init__(self, flush_interval, flush_threshold):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._pid = None
+        self._stop = threading.Event()
+        atexit.register(self.flush)
+
+    def hit(self, pk, amount=1):
+        raise NotImplementedError
+
+    def pending(self, pk):
+        """
+        تعداد بازدیدهایی از این مقاله که هنوز در دیتابیس نوشته نشده اند
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """
+        نوشتن بازدیدهای جمع شده در دیتابیس - تعداد بازدیدهای نوشته شده را برمی گرداند
+        """
+        raise NotImplementedError
+
+    def _ensure_worker(self):
+        """
+        راه اندازی thread پس زمینه (بعد از fork شدن worker هم دوباره ساخته می شود)
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            worker = threading.Thread(
+                target=self._run, name='blog-view-counter', daemon=True
+            )
+            worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('خطا در نوشتن شمارنده بازدید')
+            finally:
+                # اتصال های دیتابیس این thread را می بندیم
+                connections.close_all()
+
+
+class LocalViewCounter(BaseViewCounter):
+    """
+    شمارنده داخل حافظه process
+    """
+
+    def __init__(self, flush_interval, flush_threshold):
+        super().__init__(flush_interval, flush_threshold)
+        self._counts = Counter()
+        self._total = 0
+
+    def hit(self, pk, amount=1):
+        self._ensure_worker()
+        with self._lock:
+            self._counts[pk] += amount
+            self._total += amount
+            due = self._total >= self.flush_threshold
+        if due:
+            self.flush()
+
+    def pending(self, pk):
+        with self._lock:
+            return self._counts.get(pk, 0)
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._total = 0
+        if not counts:
+            return 0
+        try:
+            return apply_counts(counts)
+        except Exception:
+            # در صورت خطا شمارش ها را برمی گردانیم تا از دست نروند
+            with self._lock:
+                self._counts.update(counts)
+                self._total += sum(counts.values())
+            raise
+
+
+class CacheViewCounter(BaseViewCounter):
+    """
+    شمارنده در کش مشترک
+
+    هر مقاله یک کلید شمارنده در کش دارد که با incr اتمیک افزایش می یابد
+    هنگام flush مقدار خوانده شده با decr از کلید کم می شود تا بازدیدهای
+    همزمان از دست نروند. یک قفل در کش تضمین می کند که در هر لحظه فقط
+    یک worker در حال flush باشد
+    """
+    LOCK_TIMEOUT = 60
+
+    def __init__(self, flush_interval, flush_threshold, key_prefix):
+        super().__init__(flush_interval, flush_threshold)
+        self.key_prefix = key_prefix
+        # مقالاتی که این process بازدیدشان را ثبت کرده
+        self._dirty = set()
+        self._hits = 0
+
+    def _key(self, pk):
+        return f'{self.key_prefix}:{pk}'
+
+    def hit(self, pk, amount=1):
+        self._ensure_worker()
+        key = self._key(pk)
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # کلید وجود ندارد - اگر همزمان ساخته شد دوباره incr می کنیم
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+        with self._lock:
+            self._dirty.add(pk)
+            self._hits += amount
+            due = self._hits >= self.flush_threshold
+        if due:
+            self.flush()
+
+    def pending(self, pk):
+        return cache.get(self._key(pk)) or 0
+
+    def flush(self, pks=None):
+        """
+        اگر pks داده نشود فقط مقالات ثبت شده در همین process نوشته می شوند
+        """
+        with self._lock:
+            if pks is None:
+                pks, self._dirty = self._dirty, set()
+                self._hits = 0
+            else:
+                pks = set(pks)
+        if not pks:
+            return 0
+
+        lock_key = f'{self.key_prefix}:flush-lock'
+        if not cache.add(lock_key, os.getpid(), timeout=self.LOCK_TIMEOUT):
+            # worker دیگری در حال flush است - دفعه بعد دوباره تلاش می کنیم
+            with self._lock:
+                self._dirty.update(pks)
+            return 0
+
+        try:
+            keys = {self._key(pk): pk for pk in pks}
+            counts = {}
+            for key, value in cache.get_many(list(keys)).items():
+                if value:
+                    cache.decr(key, value)
+                    counts[keys[key]] = value
+            if not counts:
+                return 0
+            try:
+                return apply_counts(counts)
+            except Exception:
+                for pk, value in counts.items():
+                    cache.incr(self._key(pk), value)
+                raise
+        finally:
+            cache.delete(lock_key)
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def get_view_counter():
+    """
+    شمارنده پیش فرض پروژه (بر اساس BLOG_VIEW_COUNTER ساخته می شود)
+    """
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                config = get_config()
+                if config['BACKEND'] == 'cache':
+                    _counter = CacheViewCounter(
+                        config['FLUSH_INTERVAL'],
+                        config['FLUSH_THRESHOLD'],
+                        config['KEY_PREFIX'],
+                    )
+                else:
+                    _counter = LocalViewCounter(
+                        config['FLUSH_INTERVAL'],
+                        config['FLUSH_THRESHOLD'],
+                    )
+    return _counter
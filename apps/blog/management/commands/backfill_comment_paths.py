@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from apps.blog.models import Comment
+
+
+class Command(BaseCommand):
+    """
+    ساختن path و depth نظراتی که قبل از اضافه شدن مسیر درختی ثبت شده اند
+
+    نظرات سطح به سطح پردازش می شوند: هر دور فقط نظراتی که path ندارند و
+    والدشان path دارد (یا والد ندارند)، پس والد همیشه قبل از پاسخ هایش
+    کامل می شود. پاسخ هایی که عمیق تر از Comment.MAX_DEPTH باشند مثل
+    Comment.save در سطح والدشان قرار می گیرند
+
+    استفاده:
+    python manage.py backfill_comment_paths
+    python manage.py backfill_comment_paths --batch-size 5000
+    """
+    help = 'ساختن مسیر درختی نظرات قدیمی'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='تعداد نظرات در هر دسته')
+
+    def handle(self, *args, **options):
+        queryset = (
+            Comment.objects
+            .filter(path='')
+            .filter(Q(parent__isnull=True) | ~Q(parent__path=''))
+            .select_related('parent')
+            .only('id', 'parent', 'path', 'depth', 'parent__id', 'parent__parent_id', 'parent__path', 'parent__depth')
+            .order_by('pk')
+        )
+        total = 0
+        while True:
+            comments = list(queryset[:options['batch_size']])
+            if not comments:
+                break
+            for comment in comments:
+                self.fill(comment)
+            with transaction.atomic():
+                Comment.objects.bulk_update(comments, ['parent', 'path', 'depth'])
+            total += len(comments)
+
+        remaining = Comment.objects.filter(path='').count()
+        self.stdout.write(self.style.SUCCESS(f'مسیر {total} نظر ساخته شد'))
+        if remaining:
+            # مثلا حلقه در والدها که هیچ وقت به یک نظر اصلی نمی رسد
+            self.stdout.write(self.style.WARNING(f'{remaining} نظر به نظر اصلی نمی رسد و بدون مسیر ماند'))
+
+    @staticmethod
+    def fill(comment):
+        parent = comment.parent
+        segment = str(comment.pk).zfill(Comment.PATH_STEP)
+        if parent is None:
+            comment.path, comment.depth = segment, 0
+        elif parent.depth >= Comment.MAX_DEPTH:
+            # در سطح والد (زیر پدربزرگ)
+            comment.parent_id = parent.parent_id
+            comment.path = f'{parent.path.rsplit("/", 1)[0]}/{segment}'
+            comment.depth = parent.depth
+        else:
+            comment.path = f'{parent.path}/{segment}'
+            comment.depth = parent.depth + 1
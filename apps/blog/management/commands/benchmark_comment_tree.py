@@ -0,0 +1,89 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.comments import load_comment_tree
+from apps.blog.models import Category, Comment, Post
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    سنجش سرعت بارگذاری درخت نظرات
+
+    یک مقاله موقت با تعداد زیادی نظر تو در تو ساخته می شود و زمان
+    load_comment_tree با روش ساده (یک query برای پاسخ های هر نظر)
+    مقایسه می شود. همه داده ها در پایان rollback می شوند
+
+    استفاده:
+    python manage.py benchmark_comment_tree --comments 10000
+    """
+    help = 'سنجش سرعت بارگذاری درخت نظرات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=10000, help='تعداد نظرات')
+        parser.add_argument('--reply-ratio', type=float, default=0.7, help='نسبت نظراتی که پاسخ هستند')
+        parser.add_argument('--skip-naive', action='store_true', help='روش ساده اجرا نشود')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                post = self.create_fixture(options['comments'], options['reply_ratio'])
+                self.run(post, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_fixture(self, count, reply_ratio):
+        category = Category.objects.create(name='benchmark', slug='benchmark-comment-tree')
+        post = Post.objects.create(
+            title='benchmark', slug='benchmark-comment-tree', excerpt='-',
+            content='-', featured_image='benchmark.jpg', category=category,
+        )
+        comments = Comment.objects.bulk_create(
+            Comment(post=post, name=f'user {i}', email='user@example.com', content='متن نظر')
+            for i in range(count)
+        )
+
+        # انتخاب تصادفی والد از بین نظرات قبلی و محاسبه path در حافظه
+        rng = random.Random(0)
+        for index, comment in enumerate(comments):
+            parent = None
+            if index and rng.random() < reply_ratio:
+                parent = comments[rng.randrange(max(0, index - 50), index)]
+                if parent.depth >= Comment.MAX_DEPTH:
+                    parent = None
+            comment.parent = parent
+            comment.depth = parent.depth + 1 if parent else 0
+            comment.path = comment.build_path(parent)
+        Comment.objects.bulk_update(comments, ['parent', 'depth', 'path'], batch_size=500)
+        return post
+
+    def run(self, post, options):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            roots = load_comment_tree(post)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'load_comment_tree: {elapsed * 1000:.1f}ms، {len(queries)} query، {len(roots)} نظر ریشه'
+        )
+
+        if options['skip_naive']:
+            return
+
+        def walk(comment):
+            for reply in comment.replies.filter(is_active=True):
+                walk(reply)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for root in Comment.active.filter(post=post, parent__isnull=True):
+                walk(root)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(f'روش ساده: {elapsed * 1000:.1f}ms، {len(queries)} query')
@@ -0,0 +1,100 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from apps.blog.models import Category, Post
+from apps.blog.search import get_search_backend
+
+
+class Rollback(Exception):
+    pass
+
+
+# کلمات نمونه برای ساختن متن تصادفی مقالات
+WORDS = (
+    'جنگو پایتون وب سرور دیتابیس کش جستجو مقاله برنامه نویسی طراحی '
+    'کارایی سرعت امنیت تست استقرار ابر داکر لینوکس شبکه داده مدل '
+    'django python cache index query search deploy docker server model'
+).split()
+
+# واژگان بزرگ تر تا توزیع کلمات شبیه متن واقعی باشد
+VOCABULARY = WORDS + [f'word{i}' for i in range(5000)]
+
+
+class Command(BaseCommand):
+    """
+    مقایسه سرعت جستجوی متن کامل با icontains ساده
+
+    مقالات موقت ساخته و index می شوند، چند جستجو اجرا و زمان ها
+    گزارش می شود. همه داده ها در پایان rollback می شوند
+
+    استفاده:
+    python manage.py benchmark_search --posts 100000
+    """
+    help = 'مقایسه سرعت جستجوی متن کامل با icontains'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000, help='تعداد مقالات موقت')
+        parser.add_argument('--words', type=int, default=300, help='تعداد کلمات محتوای هر مقاله')
+        parser.add_argument('--repeat', type=int, default=5, help='تعداد تکرار هر جستجو')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.create_fixture(options['posts'], options['words'])
+                self.run(options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_fixture(self, count, words):
+        rng = random.Random(0)
+        category = Category.objects.create(name='benchmark', slug='benchmark-search')
+        started = time.perf_counter()
+        posts = Post.objects.bulk_create(
+            (
+                Post(
+                    title=' '.join(rng.choices(VOCABULARY, k=6)),
+                    slug=f'benchmark-search-{i}',
+                    excerpt=' '.join(rng.choices(VOCABULARY, k=20)),
+                    content=' '.join(rng.choices(VOCABULARY, k=words)) + f' unique{i}',
+                    featured_image='benchmark.jpg',
+                    category=category,
+                )
+                for i in range(count)
+            ),
+            batch_size=1000,
+        )
+        backend = get_search_backend()
+        if hasattr(backend, 'index_posts'):
+            for start in range(0, len(posts), 1000):
+                backend.index_posts(posts[start:start + 1000])
+        self.stdout.write(f'{count} مقاله در {time.perf_counter() - started:.1f} ثانیه ساخته شد')
+
+    def measure(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000, result
+
+    def run(self, repeat):
+        backend = get_search_backend()
+        self.stdout.write(f'backend: {type(backend).__name__}')
+        for query in ('جنگو کش', 'django', 'unique1234'):
+            search_ms, results = self.measure(lambda: backend.search(query, limit=20), repeat)
+            naive_ms, _ = self.measure(
+                lambda: list(
+                    Post.active.filter(
+                        Q(title__icontains=query) | Q(content__icontains=query)
+                    ).only('id', 'title')[:20]
+                ),
+                repeat,
+            )
+            self.stdout.write(
+                f'{query!r}: جستجو {search_ms:.2f}ms ({len(results)} نتیجه) | icontains {naive_ms:.2f}ms'
+            )
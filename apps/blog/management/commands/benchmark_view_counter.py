@@ -0,0 +1,66 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.blog.counters import get_view_counter
+from apps.blog.models import Post
+
+
+class Command(BaseCommand):
+    """
+    سنجش کارایی شمارنده بازدید
+
+    چند thread به صورت همزمان increment_views را صدا می زنند، سپس بررسی
+    می شود که هیچ بازدیدی از دست نرفته باشد. در پایان مقدار views_count
+    به حالت قبل برگردانده می شود
+
+    استفاده:
+    python manage.py benchmark_view_counter --hits 20000 --threads 8
+    """
+    help = 'سنجش سرعت و صحت شمارنده بازدید مقالات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hits', type=int, default=20000, help='تعداد کل بازدیدها')
+        parser.add_argument('--threads', type=int, default=8, help='تعداد thread همزمان')
+        parser.add_argument('--slug', help='اسلاگ مقاله (پیش فرض: اولین مقاله)')
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['slug']:
+            queryset = queryset.filter(slug=options['slug'])
+        post = queryset.first()
+        if post is None:
+            raise CommandError('هیچ مقاله ای برای تست پیدا نشد')
+
+        counter = get_view_counter()
+        counter.flush()
+        before = Post.objects.values_list('views_count', flat=True).get(pk=post.pk)
+
+        threads_count = options['threads']
+        per_thread = options['hits'] // threads_count
+        total = per_thread * threads_count
+
+        def worker():
+            instance = Post(pk=post.pk, views_count=before)
+            for _ in range(per_thread):
+                instance.increment_views()
+            connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.flush()
+        elapsed = time.perf_counter() - started
+
+        after = Post.objects.values_list('views_count', flat=True).get(pk=post.pk)
+        Post.objects.filter(pk=post.pk).update(views_count=before)
+
+        self.stdout.write(f'بازدیدها: {total} در {elapsed:.3f} ثانیه ({total / elapsed:,.0f} بازدید در ثانیه)')
+        if after - before != total:
+            raise CommandError(f'{total - (after - before)} بازدید از دست رفت')
+        self.stdout.write(self.style.SUCCESS('هیچ بازدیدی از دست نرفت'))
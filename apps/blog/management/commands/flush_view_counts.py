@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.blog.counters import CacheViewCounter, get_view_counter
+from apps.blog.models import Post
+
+
+class Command(BaseCommand):
+    """
+    نوشتن فوری بازدیدهای جمع شده در دیتابیس
+
+    فقط با backend کش (BLOG_VIEW_COUNTER['BACKEND'] = 'cache') کار می کند:
+    در backend محلی شمارش ها در حافظه هر worker هستند و این command (که
+    process جداگانه ای است) به آن ها دسترسی ندارد. هر worker بازدیدهای
+    خودش را به صورت دوره ای و هنگام خروج می نویسد
+
+    در backend کش شمارنده همه مقالات خوانده می شود، پس بازدیدهای ثبت شده
+    توسط workerهای دیگر (حتی workerی که ناگهان kill شده) هم نوشته می شوند
+
+    استفاده:
+    python manage.py flush_view_counts
+    """
+    help = 'نوشتن بازدیدهای جمع شده مقالات در دیتابیس'
+
+    def handle(self, *args, **options):
+        counter = get_view_counter()
+        if not isinstance(counter, CacheViewCounter):
+            raise CommandError(
+                'شمارنده بازدید محلی است و بازدیدهای workerها از این process قابل دسترسی نیست '
+                "(BLOG_VIEW_COUNTER['BACKEND'] = 'cache' با یک کش مشترک لازم است)"
+            )
+
+        pks = list(Post.objects.values_list('pk', flat=True))
+        flushed = counter.flush(pks)
+        self.stdout.write(self.style.SUCCESS(f'{flushed} بازدید در دیتابیس نوشته شد'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.blog.syndication import build_all, get_root
+
+
+class Command(BaseCommand):
+    """
+    ساختن دوباره همه فایل های sitemap و feed
+
+    بعد از تغییر SITE_URL یا بعد از import دسته ای مقالات (bulk_create و
+    update سیگنال ارسال نمی کنند) اجرا شود. تغییرات عادی مقالات به صورت
+    خودکار اعمال می شوند
+
+    استفاده:
+    python manage.py generate_syndication
+    """
+    help = 'ساختن دوباره sitemap.xml و feed های RSS/Atom'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        chunks, feeds = build_all()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{chunks} فایل sitemap مقالات و {feeds} feed در {elapsed:.2f} ثانیه ساخته شد ({get_root()})'
+        ))
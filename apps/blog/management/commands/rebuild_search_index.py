@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    ساختن دوباره index جستجوی مقالات
+
+    بعد از import دسته ای مقالات (که signal ها را اجرا نمی کند) استفاده شود
+
+    استفاده:
+    python manage.py rebuild_search_index
+    """
+    help = 'ساختن دوباره index جستجوی مقالات'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.setup()
+        total = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{total} مقاله در index جستجو قرار گرفت'))
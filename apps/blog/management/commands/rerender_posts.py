@@ -0,0 +1,73 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.blog.models import Post
+from apps.core.cache import bump_version
+from apps.blog.rendering import content_hash, render_content
+
+
+class Command(BaseCommand):
+    """
+    پردازش دوباره محتوای مقالات
+
+    فقط مقالاتی که hash محتوایشان عوض شده پردازش می شوند (مگر با --force)
+    پردازش در چند process انجام می شود و نتایج با bulk_update ذخیره می شوند
+
+    ابتدا فقط id ها خوانده می شوند و هر دسته جدا خوانده و ذخیره می شود،
+    چون نوشتن در همان جدول وسط یک cursor باز (iterator) امن نیست
+
+    استفاده:
+    python manage.py rerender_posts
+    python manage.py rerender_posts --force --workers 8
+    """
+    help = 'پردازش دوباره محتوای مقالات به HTML'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='پردازش همه مقالات حتی بدون تغییر')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='تعداد process ها')
+        parser.add_argument('--batch-size', type=int, default=500, help='تعداد مقالات در هر دسته')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pks = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+        size = options['batch_size']
+        rendered = skipped = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for start in range(0, len(pks), size):
+                batch = []
+                posts = Post.objects.filter(pk__in=pks[start:start + size]).only('id', 'content', 'content_hash')
+                for post in posts:
+                    digest = content_hash(post.content)
+                    if not options['force'] and digest == post.content_hash:
+                        skipped += 1
+                        continue
+                    post.content_hash = digest
+                    batch.append(post)
+                rendered += self.render_batch(executor, batch)
+
+        if rendered:
+            # bulk_update سیگنال نمی فرستد، پس کش ها اینجا باطل می شوند
+            bump_version(Post)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{rendered} مقاله پردازش شد، {skipped} مقاله بدون تغییر بود ({elapsed:.1f} ثانیه)'
+        ))
+
+    def render_batch(self, executor, posts):
+        if not posts:
+            return 0
+        results = executor.map(render_content, [post.content for post in posts], chunksize=20)
+        now = timezone.now()
+        for post, result in zip(posts, results):
+            for field, value in result.items():
+                setattr(post, field, value)
+            # Last-Modified و ETag صفحات از روی updated_at ساخته می شوند
+            post.updated_at = now
+        Post.objects.bulk_update(posts, [*Post.RENDERED_FIELDS, 'updated_at'])
+        return len(posts)
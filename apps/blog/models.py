@@ -1,8 +1,13 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Max, Q, Value
+from django.db.models.functions import Concat, Substr
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from apps.core.models import BaseModel, SEOModel
+from .counters import get_view_counter
+from .rendering import content_hash, render_content
 
 
 class Category(BaseModel, SEOModel):
@@ -38,6 +43,13 @@ class Category(BaseModel, SEOModel):
         verbose_name = _('دسته بندی')
         verbose_name_plural = _('دسته بندی ها')
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(
+                fields=['order', 'name'],
+                condition=Q(is_active=True),
+                name='blog_category_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.name
@@ -71,9 +83,22 @@ class Tag(BaseModel):
         verbose_name = _('تگ')
         verbose_name_plural = _('تگ ها')
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['name'],
+                condition=Q(is_active=True),
+                name='blog_tag_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.name
+    
+    def get_absolute_url(self):
+        """
+        لینک صفحه مقالات این تگ
+        """
+        return reverse('blog:tag', kwargs={'slug': self.slug})
 
 
 class Post(BaseModel, SEOModel):
@@ -102,6 +127,43 @@ class Post(BaseModel, SEOModel):
         verbose_name=_('محتوا'),
         help_text=_('محتوای کامل مقاله')
     )
+    
+    # نسخه پردازش شده محتوا (هنگام ذخیره ساخته می شود - rendering.py)
+    content_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name=_('محتوای HTML'),
+        help_text=_('محتوای پردازش شده مقاله')
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name=_('hash محتوا'),
+        help_text=_('برای تشخیص تغییر محتوا و جلوگیری از پردازش دوباره')
+    )
+    toc = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        verbose_name=_('فهرست مطالب'),
+        help_text=_('عناوین داخل محتوای مقاله')
+    )
+    word_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('تعداد کلمات')
+    )
+    reading_time = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('زمان مطالعه'),
+        help_text=_('زمان تقریبی مطالعه به دقیقه')
+    )
+    
+    # فیلدهایی که از روی content ساخته می شوند
+    RENDERED_FIELDS = ('content_html', 'content_hash', 'toc', 'word_count', 'reading_time')
+    
     featured_image = models.ImageField(
         upload_to='blog/posts/', 
         verbose_name=_('تصویر شاخص'),
@@ -145,6 +207,20 @@ class Post(BaseModel, SEOModel):
         verbose_name = _('مقاله')
         verbose_name_plural = _('مقالات')
         ordering = ['-published_at']
+        indexes = [
+            # index های partial فقط مقالات فعال را شامل می شوند
+            # ترتیب (published_at, id) همان ترتیب صفحه بندی keyset است
+            models.Index(
+                fields=['-published_at', '-id'],
+                condition=Q(is_active=True),
+                name='blog_post_active_pub_idx',
+            ),
+            models.Index(
+                fields=['category', '-published_at', '-id'],
+                condition=Q(is_active=True),
+                name='blog_post_category_pub_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -155,8 +231,28 @@ class Post(BaseModel, SEOModel):
         """
         if not self.slug:
             self.slug = slugify(self.title)
+        
+        update_fields = kwargs.get('update_fields')
+        if self.render_content() and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.RENDERED_FIELDS}
         super().save(*args, **kwargs)
     
+    def render_content(self, force=False):
+        """
+        پردازش محتوا فقط در صورت تغییر (بر اساس hash)
+        
+        اگر محتوا دوباره پردازش شد True برمی گرداند
+        """
+        if 'content' in self.get_deferred_fields():
+            return False
+        digest = content_hash(self.content)
+        if not force and digest == self.content_hash:
+            return False
+        for field, value in render_content(self.content).items():
+            setattr(self, field, value)
+        self.content_hash = digest
+        return True
+    
     def get_absolute_url(self):
         """
         لینک صفحه این مقاله
@@ -166,9 +262,12 @@ class Post(BaseModel, SEOModel):
     def increment_views(self):
         """
         افزایش تعداد بازدید
+
+        بازدید در شمارنده write-behind ثبت می شود و به صورت دسته ای
+        در دیتابیس نوشته می شود (apps/blog/counters.py)
         """
+        get_view_counter().hit(self.pk)
         self.views_count += 1
-        self.save(update_fields=['views_count'])
 
 
 class Comment(BaseModel):
@@ -214,10 +313,111 @@ class Comment(BaseModel):
         help_text=_('اگر این نظر پاسخ به نظر دیگری است')
     )
     
+    # مسیر درختی (materialized path) مثل: 0000000012/0000000040
+    # مرتب سازی بر اساس path همان ترتیب نمایش درخت (DFS) است
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name=_('مسیر'),
+        help_text=_('مسیر این نظر در درخت نظرات')
+    )
+    depth = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('عمق'),
+        help_text=_('سطح این نظر در درخت (0 برای نظرات اصلی)')
+    )
+    
+    # طول هر بخش از path و حداکثر عمق ممکن با max_length=255
+    PATH_STEP = 10
+    MAX_DEPTH = 255 // (PATH_STEP + 1) - 1
+    
     class Meta:
         verbose_name = _('نظر')
         verbose_name_plural = _('نظرات')
         ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                condition=Q(is_active=True),
+                name='blog_comment_post_active_idx',
+            ),
+            models.Index(
+                fields=['post', 'path'],
+                condition=Q(is_active=True),
+                name='blog_comment_post_path_idx',
+            ),
+        ]
     
     def __str__(self):
-        return f'{self.name} - {self.post.title}'
\ No newline at end of file
+        return f'{self.name} - {self.post.title}'
+    
+    def save(self, *args, **kwargs):
+        """
+        محاسبه path و depth
+
+        path به id نظر نیاز دارد، پس برای نظر جدید بعد از INSERT با یک
+        UPDATE تکمیل می شود. اگر والد نظر عوض شود، مسیر همه زیرشاخه ها
+        هم با یک UPDATE اصلاح می شود (بعد از بررسی check_move)
+        """
+        parent = self.parent if self.parent_id else None
+        old_path = self.path
+        if old_path:
+            self.check_move(parent)
+        elif parent is not None and parent.depth >= self.MAX_DEPTH:
+            # عمیق تر از این ممکن نیست - پاسخ در همان سطح والد قرار می گیرد
+            parent = parent.parent
+            self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        
+        super().save(*args, **kwargs)
+        
+        new_path = self.build_path(parent)
+        if new_path == old_path:
+            return
+        
+        self.path = new_path
+        Comment.objects.filter(pk=self.pk).update(path=new_path, depth=self.depth)
+        if old_path:
+            # جابجایی زیرشاخه ها به مسیر جدید
+            Comment.objects.filter(path__startswith=f'{old_path}/').update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (new_path.count('/') - old_path.count('/')),
+            )
+    
+    def clean(self):
+        super().clean()
+        if self.path:
+            self.check_move(self.parent if self.parent_id else None)
+
+    def check_move(self, parent):
+        """
+        بررسی جابجایی یک نظر موجود (و زیرشاخه هایش) زیر والد جدید
+
+        والد نمی تواند خود نظر یا یکی از زیرشاخه های آن باشد و عمیق ترین
+        زیرشاخه بعد از جابجایی باید در MAX_DEPTH (و طول path) جا شود
+        """
+        new_path = self.build_path(parent)
+        if new_path == self.path:
+            return
+        if parent is not None and f'{parent.path}/'.startswith(f'{self.path}/'):
+            raise ValidationError(
+                {'parent': _('یک نظر نمی تواند پاسخ خودش یا پاسخ های خودش باشد')}
+            )
+
+        deepest = Comment.objects.filter(path__startswith=f'{self.path}/').aggregate(
+            depth=Max('depth')
+        )['depth']
+        height = deepest - self.depth if deepest is not None else 0
+        new_depth = parent.depth + 1 if parent is not None else 0
+        if new_depth + height > self.MAX_DEPTH:
+            raise ValidationError(
+                {'parent': _('بعد از جابجایی عمق پاسخ ها از %(max)s بیشتر می شود') % {'max': self.MAX_DEPTH}}
+            )
+
+    def build_path(self, parent=None):
+        segment = str(self.pk).zfill(self.PATH_STEP)
+        if parent is None:
+            return segment
+        return f'{parent.path}/{segment}'
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+تبدیل محتوای مقاله به HTML
+
+محتوای خام مقاله فقط یک بار (هنگام ذخیره) پردازش می شود و نتیجه همراه
+با اطلاعات جانبی (تعداد کلمات، زمان مطالعه، فهرست مطالب) در خود مقاله
+ذخیره می شود. hash محتوا تضمین می کند که مقاله بدون تغییر دوباره
+پردازش نشود
+
+قالب محتوا (ساده و شبیه Markdown):
+- پاراگراف ها با یک خط خالی از هم جدا می شوند
+- ## عنوان و ### زیرعنوان (در فهرست مطالب قرار می گیرند)
+- خطوطی که با - شروع می شوند لیست هستند
+- بلوک کد بین ``` قرار می گیرد
+
+همه متن ها escape می شوند، پس HTML داخل محتوا اجرا نمی شود
+"""
+import hashlib
+import math
+import re
+
+from django.utils.html import escape
+from django.utils.text import slugify
+
+# با تغییر خروجی renderer این عدد را افزایش دهید تا همه مقالات دوباره پردازش شوند
+RENDERER_VERSION = 1
+
+# سرعت متوسط مطالعه (کلمه در دقیقه)
+WORDS_PER_MINUTE = 200
+
+HEADING_RE = re.compile(r'^(#{2,3})\s+(.+?)\s*#*$')
+WORD_RE = re.compile(r'\w+')
+
+
+def content_hash(content):
+    """
+    hash محتوا همراه با نسخه renderer
+    """
+    return hashlib.sha256(f'{RENDERER_VERSION}:{content}'.encode()).hexdigest()
+
+
+def _render_inline(text):
+    return escape(text).replace('\n', '<br>')
+
+
+def render_content(content):
+    """
+    تبدیل محتوای خام به HTML و محاسبه اطلاعات جانبی
+
+    این تابع خالص است (به دیتابیس دسترسی ندارد) تا بتوان آن را در
+    process های جداگانه اجرا کرد
+    """
+    content = content.replace('\r\n', '\n').strip()
+    html = []
+    toc = []
+    used_ids = set()
+
+    def heading_id(title):
+        base = slugify(title, allow_unicode=True) or 'section'
+        anchor, index = base, 2
+        while anchor in used_ids:
+            anchor = f'{base}-{index}'
+            index += 1
+        used_ids.add(anchor)
+        return anchor
+
+    # ابتدا بلوک های کد جدا می شوند تا محتوای داخلشان پردازش نشود
+    parts = re.split(r'^```[^\n]*\n(.*?)^```\s*$', content, flags=re.M | re.S)
+    for index, part in enumerate(parts):
+        if index % 2:
+            html.append(f'<pre><code>{escape(part.rstrip())}</code></pre>')
+            continue
+
+        for block in re.split(r'\n\s*\n', part.strip()):
+            if not block:
+                continue
+            lines = block.split('\n')
+
+            # عنوان در خط اول بلوک، ادامه بلوک پاراگراف یا لیست است
+            heading = HEADING_RE.match(lines[0])
+            if heading:
+                level = len(heading.group(1))
+                title = heading.group(2)
+                anchor = heading_id(title)
+                toc.append({'level': level, 'title': title, 'id': anchor})
+                html.append(f'<h{level} id="{anchor}">{escape(title)}</h{level}>')
+                lines = lines[1:]
+                if not lines:
+                    continue
+
+            if all(line.lstrip().startswith('- ') for line in lines):
+                items = ''.join(f'<li>{_render_inline(line.lstrip()[2:])}</li>' for line in lines)
+                html.append(f'<ul>{items}</ul>')
+            else:
+                paragraph = _render_inline('\n'.join(lines))
+                html.append(f'<p>{paragraph}</p>')
+
+    word_count = len(WORD_RE.findall(content))
+    return {
+        'content_html': '\n'.join(html),
+        'toc': toc,
+        'word_count': word_count,
+        'reading_time': max(1, math.ceil(word_count / WORDS_PER_MINUTE)) if word_count else 0,
+    }
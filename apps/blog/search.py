@@ -0,0 +1,276 @@
+"""
+جستجوی متن کامل در مقالات
+
+backend بر اساس نوع دیتابیس انتخاب می شود و API همه یکسان است:
+- SQLite: جدول مجازی FTS5 که با signal های Post همگام نگه داشته می شود
+- PostgreSQL: SearchVector وزن دار همراه با index از نوع GIN
+- سایر دیتابیس ها: icontains ساده (فقط برای سازگاری)
+
+استفاده:
+results = get_search_backend().search('جنگو', limit=20)
+for result in results:
+    result.post, result.rank, result.snippet
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.html import escape
+
+from .models import Post
+
+# نشانگرهای موقت برای شروع و پایان کلمه پیدا شده در snippet
+# متن ابتدا escape می شود و سپس این نشانگرها با <mark> جایگزین می شوند
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+# ستون هایی که برای نمایش نتایج جستجو خوانده می شوند
+RESULT_FIELDS = ('id', 'title', 'slug', 'excerpt', 'published_at')
+
+
+@dataclass
+class SearchResult:
+    post: Post
+    rank: float
+    snippet: str
+
+
+def highlight(text):
+    """
+    تبدیل نشانگرهای موقت به تگ mark بعد از escape کردن متن
+    """
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def _load_posts(ids):
+    posts = Post.active.only(*RESULT_FIELDS).in_bulk(ids)
+    return [posts[pk] for pk in ids if pk in posts]
+
+
+class BaseSearchBackend:
+    """
+    کلاس پایه backend های جستجو
+    """
+
+    def setup(self):
+        """
+        ساختن جدول یا index مورد نیاز (بعد از migrate صدا زده می شود)
+        """
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, pk):
+        pass
+
+    def rebuild(self):
+        """
+        ساختن دوباره کل index - تعداد مقالات index شده را برمی گرداند
+        """
+        return 0
+
+    def search(self, query, limit=20):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    جستجو با FTS5 در SQLite
+
+    جدول blog_post_fts یک کپی از عنوان، خلاصه و محتوای مقالات است که
+    rowid آن برابر id مقاله است. رتبه بندی با bm25 و وزن بیشتر برای عنوان
+    """
+    table = 'blog_post_fts'
+    # وزن ستون ها در bm25: عنوان، خلاصه، محتوا
+    weights = (10.0, 4.0, 1.0)
+    snippet_tokens = 16
+
+    def setup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5('
+                "title, excerpt, content, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def index_post(self, post):
+        self.index_posts([post])
+
+    def index_posts(self, posts):
+        rows = [(post.pk, post.title, post.excerpt, post.content) for post in posts]
+        if not rows:
+            return 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, excerpt, content) VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+        return len(rows)
+
+    def remove_post(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def rebuild(self, batch_size=1000):
+        self.setup()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        total = 0
+        queryset = Post.objects.only('id', 'title', 'excerpt', 'content').order_by('pk')
+        batch = []
+        for post in queryset.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) >= batch_size:
+                total += self.index_posts(batch)
+                batch = []
+        total += self.index_posts(batch)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return total
+
+    @staticmethod
+    def build_match(query):
+        """
+        تبدیل متن کاربر به عبارت MATCH امن
+
+        هر کلمه داخل "" قرار می گیرد تا عملگرهای FTS5 اجرا نشوند
+        و آخرین کلمه به صورت پیشوندی جستجو می شود
+        """
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, query, limit=20):
+        match = self.build_match(query)
+        if match is None:
+            return []
+
+        # مرحله اول: فقط رتبه بندی (snippet برای همه نتایج هزینه زیادی دارد)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT fts.rowid, bm25({self.table}, %s, %s, %s) AS rank '
+                f'FROM {self.table} AS fts '
+                f'INNER JOIN {Post._meta.db_table} AS post ON post.id = fts.rowid '
+                f'WHERE {self.table} MATCH %s AND post.is_active '
+                f'ORDER BY rank LIMIT %s',
+                [*self.weights, match, limit],
+            )
+            ranks = dict(cursor.fetchall())
+            if not ranks:
+                return []
+
+            # مرحله دوم: snippet فقط برای نتایج همین صفحه
+            placeholders = ', '.join(['%s'] * len(ranks))
+            cursor.execute(
+                f'SELECT rowid, snippet({self.table}, 2, %s, %s, %s, %s) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s AND rowid IN ({placeholders})',
+                [MARK_START, MARK_END, '…', self.snippet_tokens, match, *ranks],
+            )
+            snippets = dict(cursor.fetchall())
+
+        return [
+            # bm25 منفی است و عدد کمتر یعنی مرتبط تر
+            SearchResult(post, -ranks[post.pk], highlight(snippets.get(post.pk, '')))
+            for post in _load_posts(list(ranks))
+        ]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    جستجو با SearchVector در PostgreSQL
+
+    index از نوع GIN دقیقا روی همان عبارت SearchVector ساخته می شود
+    که در query استفاده می شود، پس PostgreSQL از index استفاده می کند
+    """
+    config = 'simple'
+    index_name = 'blog_post_search_gin'
+
+    def get_vector(self):
+        from django.contrib.postgres.search import SearchVector
+
+        return (
+            SearchVector('title', weight='A', config=self.config)
+            + SearchVector('excerpt', weight='B', config=self.config)
+            + SearchVector('content', weight='C', config=self.config)
+        )
+
+    def setup(self):
+        from django.contrib.postgres.indexes import GinIndex
+
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, Post._meta.db_table)
+        if self.index_name in indexes:
+            return
+        with connection.schema_editor() as schema_editor:
+            schema_editor.add_index(Post, GinIndex(self.get_vector(), name=self.index_name))
+
+    def search(self, query, limit=20):
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+        query = query.strip()
+        if not query:
+            return []
+        search_query = SearchQuery(query, search_type='websearch', config=self.config)
+        vector = self.get_vector()
+        posts = (
+            Post.active
+            .annotate(search=vector)
+            .filter(search=search_query)
+            .annotate(
+                rank=SearchRank(vector, search_query),
+                snippet=SearchHeadline(
+                    'content', search_query, config=self.config,
+                    start_sel=MARK_START, stop_sel=MARK_END, max_words=30, min_words=10,
+                ),
+            )
+            .only(*RESULT_FIELDS)
+            .order_by('-rank', '-published_at')[:limit]
+        )
+        return [SearchResult(post, post.rank, highlight(post.snippet)) for post in posts]
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    جستجوی ساده با icontains (بدون index) برای سایر دیتابیس ها
+    """
+
+    def search(self, query, limit=20):
+        query = query.strip()
+        if not query:
+            return []
+        posts = (
+            Post.active
+            .filter(Q(title__icontains=query) | Q(excerpt__icontains=query) | Q(content__icontains=query))
+            .only(*RESULT_FIELDS)[:limit]
+        )
+        return [SearchResult(post, 0.0, escape(post.excerpt)) for post in posts]
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    return BACKENDS.get(connection.vendor, SimpleSearchBackend)()
+
+
+def setup_search(sender, **kwargs):
+    """
+    ساختن جدول/index جستجو بعد از migrate
+    """
+    get_search_backend().setup()
+
+
+def update_search_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: get_search_backend().index_post(instance))
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: get_search_backend().remove_post(pk))
@@ -0,0 +1,587 @@
+"""
+ساختن sitemap و feed های RSS/Atom به صورت فایل
+
+به جای ساختن sitemap و feed در هر درخواست crawler، خروجی ها یک بار به صورت
+فایل (همراه با نسخه های .gz و .br) ساخته می شوند و با ETag و Last-Modified
+ارسال می شوند (apps/core/static.py:serve_file)
+
+فایل ها:
+sitemap.xml                     فهرست (sitemap index) همه sitemap ها
+sitemap-pages.xml               صفحات ثابت، دسته بندی ها و تگ ها
+sitemap-posts-<n>.xml           مقالات با id در بازه n*50000+1 تا (n+1)*50000
+feeds/all.rss.xml               آخرین مقالات (و all.atom.xml)
+feeds/category-<slug>.rss.xml   آخرین مقالات هر دسته بندی
+feeds/tag-<slug>.rss.xml        آخرین مقالات هر تگ
+
+با تغییر یک مقاله فقط فایل های وابسته به آن (بخش sitemap شامل آن مقاله،
+feed اصلی و feed های دسته بندی و تگ هایش) دوباره ساخته می شوند. تغییرات
+پشت سر هم (مثلا ذخیره دسته ای در ادمین) جمع شده و یک بار در thread پس زمینه
+پردازش می شوند. تغییراتی که هنگام خروج process هنوز در صف هستند قبل از
+خروج ساخته می شوند (atexit)
+
+sitemap index از روی مقالات دیتابیس ساخته می شود (نه فایل های موجود) و
+بخش هایی که فایلشان وجود ندارد همان جا ساخته می شوند، پس index هیچ وقت
+به فایلی که وجود ندارد اشاره نمی کند
+
+هر ساخت (ساخت کامل، صف پس زمینه یا ساخت فایل در اولین درخواست) پشت
+build_lock انجام می شود تا ساخت های همزمان روی هم ننویسند. ساخت کامل فایل ها
+را قبل از ساختن حذف نمی کند؛ فایل های قدیمی تا جایگزینی سرو می شوند و فقط
+فایل هایی که دیگر ساخته نمی شوند در پایان حذف می شوند
+
+تنظیمات از طریق BLOG_SYNDICATION در settings خوانده می شود
+"""
+import atexit
+import gzip
+import logging
+from contextlib import contextmanager
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Max, Prefetch
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:
+    # ویندوز: فقط قفل بین thread های همین process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# تنظیمات پیش فرض
+DEFAULTS = {
+    'ROOT': None,                       # پوشه فایل ها (پیش فرض: BASE_DIR/syndication)
+    'SITE_URL': 'http://localhost:8000',
+    'TITLE': 'وبلاگ',
+    'DESCRIPTION': 'آخرین مقالات',
+    'FEED_ITEMS': 20,
+    'DEBOUNCE': 2.0,                    # زمان جمع کردن تغییرات قبل از ساختن فایل ها (ثانیه)
+}
+
+# حداکثر تعداد URL در هر فایل sitemap (محدودیت پروتکل sitemap)
+SITEMAP_LIMIT = 50000
+
+FEED_FORMATS = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+
+
+def get_config():
+    config = DEFAULTS.copy()
+    config.update(getattr(settings, 'BLOG_SYNDICATION', {}))
+    if config['ROOT'] is None:
+        config['ROOT'] = Path(settings.BASE_DIR) / 'syndication'
+    config['SITE_URL'] = config['SITE_URL'].rstrip('/')
+    return config
+
+
+def get_root():
+    return Path(get_config()['ROOT'])
+
+
+def absolute_url(path):
+    return get_config()['SITE_URL'] + path
+
+
+def _w3c_date(value):
+    return timezone.localtime(value).isoformat(timespec='seconds')
+
+
+_build_lock = threading.Lock()
+
+
+@contextmanager
+def build_lock():
+    """
+    فقط یک ساخت در هر لحظه، بین thread ها و (با flock) بین worker ها
+
+    قفل reentrant نیست؛ توابع build_* داخل آن صدا زده می شوند و خودشان قفل نمی گیرند
+    """
+    root = get_root()
+    root.mkdir(parents=True, exist_ok=True)
+    with _build_lock, open(root / '.lock', 'w') as file:
+        if fcntl is not None:
+            # با بسته شدن فایل آزاد می شود
+            fcntl.flock(file, fcntl.LOCK_EX)
+        yield
+
+
+def ensure_file(name, builder):
+    """
+    ساختن فایلی که هنوز وجود ندارد (اولین درخواست بعد از راه اندازی)
+
+    درخواست های همزمان پشت قفل منتظر می مانند و فقط اولی builder را اجرا می کند
+    """
+    path = get_root() / name
+    if path.is_file():
+        return
+    with build_lock():
+        if not path.is_file():
+            builder()
+
+
+def write_file(name, content):
+    """
+    نوشتن اتمیک فایل همراه با نسخه های فشرده
+
+    اگر محتوا تغییری نکرده باشد فایل دوباره نوشته نمی شود تا Last-Modified
+    و ETag ثابت بمانند و crawler ها پاسخ 304 بگیرند
+    """
+    path = get_root() / name
+    content = content.encode('utf-8') if isinstance(content, str) else content
+    try:
+        if path.read_bytes() == content:
+            return False
+    except OSError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    variants = {'': content, '.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        # کیفیت 11 برای فایل های چند مگابایتی چند ثانیه طول می کشد
+        variants['.br'] = brotli.compress(content, quality=9)
+
+    # نسخه های فشرده اول نوشته می شوند تا هیچ وقت از فایل اصلی قدیمی تر نباشند
+    for extension in sorted(variants, key=bool, reverse=True):
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(variants[extension])
+        # mkstemp فایل را فقط برای مالک قابل خواندن می سازد
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, f'{path}{extension}')
+    return True
+
+
+def remove_file(name):
+    path = get_root() / name
+    for extension in ('', '.gz', '.br'):
+        try:
+            os.remove(f'{path}{extension}')
+        except FileNotFoundError:
+            pass
+
+
+def _url_entry(location, lastmod=None):
+    lastmod = f'<lastmod>{_w3c_date(lastmod)}</lastmod>' if lastmod else ''
+    return f'<url><loc>{escape(absolute_url(location))}</loc>{lastmod}</url>\n'
+
+
+def _url_prefix(name):
+    """
+    ساختن آدرس ها با جایگزینی slug در یک آدرس نمونه (بسیار سریع تر از reverse برای هر ردیف)
+    """
+    sample = reverse(name, kwargs={'slug': 'slug-placeholder'})
+    return sample.split('slug-placeholder')
+
+
+# ---------------------------------------------------------------- sitemap
+
+def post_chunk(pk):
+    return (pk - 1) // SITEMAP_LIMIT
+
+
+def chunk_name(chunk):
+    return f'sitemap-posts-{chunk}.xml'
+
+
+def post_chunks():
+    """
+    شماره بخش هایی که مقاله فعال دارند (یک query)
+    """
+    from .models import Post
+
+    return sorted(
+        Post.active.order_by()
+        .annotate(chunk=(F('pk') - 1) / SITEMAP_LIMIT)
+        .values_list('chunk', flat=True)
+        .distinct()
+    )
+
+
+def build_posts_sitemap(chunk):
+    """
+    sitemap مقالات یک بازه id - اگر مقاله فعالی در بازه نباشد فایل حذف می شود
+    """
+    from .models import Post
+
+    name = chunk_name(chunk)
+    start, end = chunk * SITEMAP_LIMIT + 1, (chunk + 1) * SITEMAP_LIMIT
+    rows = (
+        Post.active
+        .filter(pk__gte=start, pk__lte=end)
+        .order_by('pk')
+        .values_list('slug', 'updated_at')
+        .iterator(chunk_size=5000)
+    )
+    before, after = _url_prefix('blog:post_detail')
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    count = 0
+    for slug, updated_at in rows:
+        parts.append(_url_entry(f'{before}{slug}{after}', updated_at))
+        count += 1
+    parts.append('</urlset>\n')
+
+    if not count:
+        remove_file(name)
+        return 0
+    write_file(name, ''.join(parts))
+    return count
+
+
+def build_pages_sitemap():
+    from .models import Category, Post, Tag
+
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    latest = Post.active.aggregate(latest=Max('updated_at'))['latest']
+    for name in ('about:index', 'blog:post_list', 'contact:contact'):
+        parts.append(_url_entry(reverse(name), latest if name == 'blog:post_list' else None))
+
+    for model, url_name in ((Category, 'blog:category'), (Tag, 'blog:tag')):
+        before, after = _url_prefix(url_name)
+        rows = model.active.order_by('pk').values_list('slug', 'updated_at').iterator(chunk_size=5000)
+        for slug, updated_at in rows:
+            parts.append(_url_entry(f'{before}{slug}{after}', updated_at))
+    parts.append('</urlset>\n')
+    write_file('sitemap-pages.xml', ''.join(parts))
+
+
+def build_sitemap_index():
+    """
+    فهرست sitemap ها (lastmod هر بخش = زمان تغییر فایل)
+
+    بخش های مقالات از دیتابیس خوانده می شوند و فایل هایی که هنوز ساخته
+    نشده اند (مثلا بعد از deploy روی پوشه خالی) قبل از نوشتن index ساخته می شوند
+    """
+    root = get_root()
+    if not (root / 'sitemap-pages.xml').is_file():
+        build_pages_sitemap()
+    names = ['sitemap-pages.xml']
+    for chunk in post_chunks():
+        if not (root / chunk_name(chunk)).is_file():
+            build_posts_sitemap(chunk)
+        names.append(chunk_name(chunk))
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for name in names:
+        try:
+            modified = os.stat(root / name).st_mtime
+        except OSError:
+            continue
+        lastmod = _w3c_date(datetime.fromtimestamp(modified, tz=dt_timezone.utc))
+        section = name[len('sitemap-'):-len('.xml')]
+        location = absolute_url(reverse('sitemap_section', kwargs={'section': section}))
+        parts.append(f'<sitemap><loc>{escape(location)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n')
+    parts.append('</sitemapindex>\n')
+    write_file('sitemap.xml', ''.join(parts))
+
+
+# ---------------------------------------------------------------- feeds
+
+def feed_name(kind, slug, feed_format):
+    prefix = 'all' if kind == 'all' else f'{kind}-{slug}'
+    return f'feeds/{prefix}.{feed_format}.xml'
+
+
+def build_feed(kind, slug=None):
+    """
+    ساختن feed های RSS و Atom برای همه مقالات، یک دسته بندی یا یک تگ
+
+    اگر دسته بندی یا تگ وجود نداشته باشد (یا غیرفعال باشد) فایل های آن حذف می شوند
+    """
+    from .models import Category, Post, Tag
+
+    config = get_config()
+    posts = Post.active.select_related('category').prefetch_related(
+        Prefetch('tags', queryset=Tag.active.only('id', 'name'))
+    )
+    title, link = config['TITLE'], reverse('blog:post_list')
+    if kind != 'all':
+        model = Category if kind == 'category' else Tag
+        target = model.active.filter(slug=slug).first()
+        if target is None:
+            for feed_format in FEED_FORMATS:
+                remove_file(feed_name(kind, slug, feed_format))
+            return False
+        posts = posts.filter(**{'category' if kind == 'category' else 'tags': target})
+        title = f'{title} - {target.name}'
+        link = reverse(f'blog:{kind}', kwargs={'slug': slug})
+
+    posts = list(
+        posts.only('id', 'title', 'slug', 'excerpt', 'published_at', 'updated_at', 'category__name')
+        .order_by('-published_at', '-id')[:config['FEED_ITEMS']]
+    )
+    for feed_format, feed_class in FEED_FORMATS.items():
+        feed = feed_class(
+            title=title,
+            link=absolute_url(link),
+            description=config['DESCRIPTION'],
+            language=settings.LANGUAGE_CODE,
+            feed_url=absolute_url(feed_url(kind, slug, feed_format)),
+        )
+        for post in posts:
+            url = absolute_url(post.get_absolute_url())
+            feed.add_item(
+                title=post.title,
+                link=url,
+                unique_id=url,
+                description=post.excerpt,
+                pubdate=post.published_at,
+                updateddate=post.updated_at,
+                categories=[post.category.name, *(tag.name for tag in post.tags.all())],
+            )
+        write_file(feed_name(kind, slug, feed_format), feed.writeString('utf-8'))
+    return True
+
+
+def feed_url(kind, slug, feed_format):
+    if kind == 'all':
+        return reverse('blog:feed', kwargs={'feed_format': feed_format})
+    return reverse(f'blog:{kind}_feed', kwargs={'slug': slug, 'feed_format': feed_format})
+
+
+# ---------------------------------------------------------------- build
+
+def build(target):
+    """
+    ساختن یک فایل (یا گروه فایل) بر اساس target:
+    ('posts', chunk) / ('pages',) / ('index',) / ('feed', kind, slug)
+    """
+    if target[0] == 'posts':
+        build_posts_sitemap(target[1])
+    elif target[0] == 'pages':
+        build_pages_sitemap()
+    elif target[0] == 'index':
+        build_sitemap_index()
+    elif target[0] == 'feed':
+        build_feed(target[1], target[2])
+
+
+def build_all():
+    """
+    ساختن دوباره همه فایل ها (دستور generate_syndication)
+
+    خروجی: تعداد فایل های sitemap مقالات و تعداد feed ها
+    """
+    with build_lock():
+        return rebuild_all()
+
+
+def rebuild_all():
+    """
+    بدنه build_all - باید داخل build_lock صدا زده شود
+    """
+    from .models import Category, Post, Tag
+
+    last = Post.active.aggregate(last=Max('pk'))['last'] or 0
+    chunks = [chunk for chunk in range(post_chunk(last) + 1 if last else 0) if build_posts_sitemap(chunk)]
+    build_pages_sitemap()
+
+    feeds = [('all', None)]
+    feeds += [('category', slug) for slug in Category.active.values_list('slug', flat=True)]
+    feeds += [('tag', slug) for slug in Tag.active.values_list('slug', flat=True)]
+    for kind, slug in feeds:
+        build_feed(kind, slug)
+
+    # حذف فایل هایی که دیگر ساخته نمی شوند (بخش های خالی، دسته بندی ها و
+    # تگ های حذف شده یا تغییر نام داده)
+    keep = {chunk_name(chunk) for chunk in chunks}
+    keep.update(feed_name(kind, slug, feed_format) for kind, slug in feeds for feed_format in FEED_FORMATS)
+    root = get_root()
+    for path in list(root.glob('sitemap-posts-*.xml')) + list(root.glob('feeds/*.xml')):
+        name = path.relative_to(root).as_posix()
+        if name not in keep:
+            remove_file(name)
+
+    build_sitemap_index()
+    return len(chunks), len(feeds)
+
+
+class RebuildQueue:
+    """
+    جمع کردن تغییرات و ساختن فایل های وابسته در thread پس زمینه
+
+    هر target فقط یک بار ساخته می شود حتی اگر چند بار در بازه DEBOUNCE
+    درخواست شده باشد. sitemap index همیشه در پایان ساخته می شود
+
+    thread پس زمینه daemon است، پس هنگام خروج process (restart worker یا
+    پایان یک management command) صف با flush خالی می شود
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def schedule(self, *targets):
+        with self._lock:
+            self._pending.update(targets)
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def run(self):
+        with self._lock:
+            targets, self._pending = self._pending, set()
+            self._timer = None
+        if not targets:
+            return
+        try:
+            with build_lock():
+                # ترتیب: sitemap ها و feed ها، سپس index که به فایل های sitemap وابسته است
+                for target in sorted(targets - {('index',)}, key=repr):
+                    try:
+                        build(target)
+                    except Exception:
+                        logger.exception(f'خطا در ساختن {target}')
+                if any(target[0] in ('posts', 'pages', 'index') for target in targets):
+                    build_sitemap_index()
+        finally:
+            connections.close_all()
+
+
+    def flush(self):
+        """
+        ساختن فوری target های در صف (بدون صبر برای DEBOUNCE)
+
+        اگر thread پس زمینه در حال ساختن باشد تا پایان آن صبر می کند
+        """
+        with self._lock:
+            timer = self._timer
+        if timer is not None:
+            timer.cancel()
+            if timer is not threading.current_thread():
+                timer.join()
+        self.run()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_rebuild_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = RebuildQueue(get_config()['DEBOUNCE'])
+    return _queue
+
+
+def schedule(*targets):
+    """
+    ساختن target ها بعد از commit تراکنش فعلی
+    """
+    transaction.on_commit(lambda: get_rebuild_queue().schedule(*targets))
+
+
+# ---------------------------------------------------------------- signals
+
+def remember_post_state(sender, instance, **kwargs):
+    """
+    pre_save: دسته بندی قبلی مقاله تا feed آن هم دوباره ساخته شود
+    """
+    if instance.pk is None:
+        instance._syndication_category = None
+        return
+    instance._syndication_category = (
+        sender.objects.filter(pk=instance.pk).values_list('category__slug', flat=True).first()
+    )
+
+
+def remember_post_tags(sender, instance, **kwargs):
+    """
+    pre_delete: تگ های مقاله (بعد از حذف، رابطه ها هم حذف شده اند)
+    """
+    instance._syndication_tags = list(instance.tags.values_list('slug', flat=True))
+
+
+def _post_targets(instance, tag_slugs):
+    targets = {('posts', post_chunk(instance.pk)), ('pages',), ('feed', 'all', None)}
+    category_slugs = {getattr(instance, '_syndication_category', None)}
+    if instance.category_id:
+        category_slugs.add(instance.category.slug)
+    targets.update(('feed', 'category', slug) for slug in category_slugs if slug)
+    targets.update(('feed', 'tag', slug) for slug in tag_slugs)
+    return targets
+
+
+def post_saved(sender, instance, **kwargs):
+    schedule(*_post_targets(instance, instance.tags.values_list('slug', flat=True)))
+
+
+def post_deleted(sender, instance, **kwargs):
+    schedule(*_post_targets(instance, getattr(instance, '_syndication_tags', ())))
+
+
+def post_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    m2m_changed تگ های مقاله (از هر دو طرف رابطه)
+    """
+    from .models import Tag
+
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if reverse:
+        # tag.posts.add(...) - فقط feed همین تگ تغییر می کند
+        if action != 'pre_clear':
+            schedule(('feed', 'tag', instance.slug))
+        return
+
+    if action == 'pre_clear':
+        # در post_clear لیست تگ ها در دسترس نیست
+        instance._syndication_cleared = list(instance.tags.values_list('slug', flat=True))
+        return
+    if action == 'post_clear':
+        slugs = getattr(instance, '_syndication_cleared', [])
+    else:
+        slugs = list(Tag.objects.filter(pk__in=pk_set).values_list('slug', flat=True))
+    # نام تگ ها در آیتم های feed اصلی و feed دسته بندی هم آمده است
+    targets = {('feed', 'all', None), *(('feed', 'tag', slug) for slug in slugs)}
+    if instance.category_id:
+        targets.add(('feed', 'category', instance.category.slug))
+    schedule(*targets)
+
+
+def remember_taxonomy_slug(sender, instance, **kwargs):
+    """
+    pre_save دسته بندی و تگ: slug قبلی تا فایل های feed آن حذف شوند
+    """
+    instance._syndication_slug = None
+    if instance.pk is not None:
+        instance._syndication_slug = (
+            sender.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+        )
+
+
+def taxonomy_changed(sender, instance, **kwargs):
+    """
+    post_save و post_delete دسته بندی و تگ
+    """
+    from .models import Category
+
+    kind = 'category' if sender is Category else 'tag'
+    targets = {('pages',), ('feed', kind, instance.slug)}
+    old_slug = getattr(instance, '_syndication_slug', None)
+    if old_slug and old_slug != instance.slug:
+        # build_feed برای slug ای که دیگر وجود ندارد فایل هایش را حذف می کند
+        targets.add(('feed', kind, old_slug))
+    schedule(*targets)
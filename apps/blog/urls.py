@@ -1,18 +1,41 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 from . import views
 
 app_name = 'blog'
 
+# با ASGI نسخه async view ها استفاده می شود (settings.ASYNC_VIEWS)
+if settings.ASYNC_VIEWS:
+    PostListView, PostDetailView = views.AsyncPostListView, views.AsyncPostDetailView
+else:
+    PostListView, PostDetailView = views.PostListView, views.PostDetailView
+
 urlpatterns = [
     # لیست مقالات
-    path('', views.PostListView.as_view(), name='post_list'),
+    path('', PostListView.as_view(), name='post_list'),
     
     # جزئیات مقاله
-    path('post/<slug:slug>/', views.PostDetailView.as_view(), name='post_detail'),
+    path('post/<slug:slug>/', PostDetailView.as_view(), name='post_detail'),
     
     # مقالات یک دسته بندی
     path('category/<slug:slug>/', views.CategoryPostsView.as_view(), name='category'),
     
+    # جستجو در مقالات (JSON)
+    path('search/', views.PostSearchView.as_view(), name='search'),
+    
     # مقالات یک تگ
     path('tag/<slug:slug>/', views.TagPostsView.as_view(), name='tag'),
+    
+    # feed های RSS و Atom
+    re_path(r'^feed/(?P<feed_format>rss|atom)/$', views.FeedView.as_view(), name='feed'),
+    re_path(
+        r'^category/(?P<slug>[-\w]+)/feed/(?P<feed_format>rss|atom)/$',
+        views.FeedView.as_view(kind='category'),
+        name='category_feed',
+    ),
+    re_path(
+        r'^tag/(?P<slug>[-\w]+)/feed/(?P<feed_format>rss|atom)/$',
+        views.FeedView.as_view(kind='tag'),
+        name='tag_feed',
+    ),
 ]
\ No newline at end of file
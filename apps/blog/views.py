@@ -1,18 +1,252 @@
-from django.shortcuts import render
-from django.views.generic import ListView, DetailView
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.translation import gettext as _
+from django.views.generic import ListView, DetailView, View
 
-class PostListView(ListView):
-    template_name = 'blog/post_list.html'
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.queries import query_budget
+from apps.core.static import serve_file
+from . import syndication
+from .comments import load_comment_tree
+from .models import Category, Comment, Post, Tag
+from .search import get_search_backend
+
+
+class PostListMixin(ConditionalGetMixin, KeysetPaginationMixin):
+    """
+    queryset سبک برای صفحات لیست مقالات
+
+    - فقط ستون های مورد نیاز لیست خوانده می شوند (content خوانده نمی شود)
+    - دسته بندی با JOIN و تگ ها با یک query جداگانه برای کل صفحه
+    - صفحه بندی keyset روی (published_at, id)
+    - ETag و Last-Modified از روی مقالات، دسته بندی ها و تگ ها (304 بدون render)
+    """
+    template_name = 'blog/blog.html'
+    conditional_models = (Post, Category, Tag)
     context_object_name = 'posts'
-    
+    paginate_by = 10
+    keyset_ordering = ('-published_at', '-id')
+
+    # ستون هایی که در لیست مقالات نمایش داده می شوند
+    # (views_count نه: تغییرش updated_at را عوض نمی کند و در ETag نیست)
+    list_fields = (
+        'id', 'title', 'slug', 'excerpt', 'featured_image',
+        'is_featured', 'published_at',
+        'category__id', 'category__name', 'category__slug', 'category__color',
+    )
+
+    def get_queryset(self):
+        return (
+            Post.active
+            .select_related('category')
+            .prefetch_related(
+                Prefetch('tags', queryset=Tag.active.only('id', 'name', 'slug'))
+            )
+            .only(*self.list_fields)
+        )
+
+
+@query_budget(max_queries=6, max_duplicates=0)
+class PostListView(PostListMixin, ListView):
+    """
+    لیست همه مقالات فعال
+    """
+
+
+@query_budget(max_queries=6, max_duplicates=0)
+class PostDetailView(ConditionalGetMixin, DetailView):
+    """
+    صفحه یک مقاله
+
+    ETag فقط به همین مقاله، نظرات آن و دسته بندی ها و تگ ها بستگی دارد
+    درخت نظرات با یک query خوانده می شود (apps/blog/comments.py)
+    بازدید فقط برای پاسخ های کامل شمرده می شود (نه 304) و در شمارنده
+    write-behind ثبت می شود (apps/blog/counters.py)
+    """
+    template_name = 'blog/single-post.html'
+    queryset = Post.active.select_related('category')
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        self.object.increment_views()
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if 'comments' not in context:
+            context['comments'] = load_comment_tree(self.object)
+        return context
+
+    def get_conditional_querysets(self):
+        slug = self.kwargs['slug']
+        return [
+            Post.active.filter(slug=slug),
+            Comment.objects.filter(post__slug=slug),
+            Category.objects.all(),
+            Tag.objects.all(),
+        ]
+
+
+class AsyncPostListView(PostListView):
+    """
+    نسخه async لیست مقالات (برای ASGI - settings.ASYNC_VIEWS)
+
+    صفحه با پیمایش async queryset خوانده می شود (apps/core/pagination.py)
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        paginator, page, object_list, is_paginated = await self.apaginate_queryset(
+            self.object_list, self.paginate_by
+        )
+        context = self.get_context_data(object_list=object_list)
+        context.update(paginator=paginator, page_obj=page, is_paginated=is_paginated)
+        return self.render_to_response(context)
+
+    def get_paginate_by(self, queryset):
+        # صفحه قبلا در get خوانده شده است
+        return None
+
+
+class AsyncPostDetailView(PostDetailView):
+    """
+    نسخه async صفحه یک مقاله (برای ASGI - settings.ASYNC_VIEWS)
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.get_queryset().filter(slug=self.kwargs['slug']).afirst()
+        if self.object is None:
+            # همان پیام DetailView.get_object
+            raise Http404(_('No %(verbose_name)s found matching the query') % {
+                'verbose_name': Post._meta.verbose_name,
+            })
+        comments = await sync_to_async(load_comment_tree)(self.object)
+        context = self.get_context_data(object=self.object, comments=comments)
+        response = self.render_to_response(context)
+        # ممکن است شمارنده همین جا در دیتابیس نوشته شود
+        await sync_to_async(self.object.increment_views)()
+        return response
+
+
+@query_budget(max_queries=6, max_duplicates=0)
+class CategoryPostsView(PostListMixin, ListView):
+    """
+    مقالات یک دسته بندی
+    """
+
+    def get_queryset(self):
+        self.category = get_object_or_404(Category.active, slug=self.kwargs['slug'])
+        return super().get_queryset().filter(category=self.category)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['category'] = self.category
+        return context
+
+
+@query_budget(max_queries=6, max_duplicates=0)
+class TagPostsView(PostListMixin, ListView):
+    """
+    مقالات یک تگ
+    """
+
     def get_queryset(self):
-        return []
+        self.tag = get_object_or_404(Tag.active, slug=self.kwargs['slug'])
+        return super().get_queryset().filter(tags=self.tag)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tag'] = self.tag
+        return context
 
-class PostDetailView(DetailView):
-    template_name = 'blog/post_detail.html'
+
+class PostSearchView(View):
+    """
+    جستجوی مقالات (JSON)
     
-class CategoryPostsView(ListView):
-    template_name = 'blog/category_posts.html'
+    مثال: /blog/search/?q=جنگو
+    نتایج بر اساس میزان ارتباط مرتب شده و هر نتیجه یک snippet دارد
+    که کلمات پیدا شده در آن با <mark> مشخص شده اند
+    """
+    max_query_length = 200
+    max_results = 20
     
-class TagPostsView(ListView):
-    template_name = 'blog/tag_posts.html'
\ No newline at end of file
+    def get(self, request):
+        query = request.GET.get('q', '').strip()[:self.max_query_length]
+        results = get_search_backend().search(query, limit=self.max_results)
+        return JsonResponse({
+            'query': query,
+            'results': [
+                {
+                    'title': result.post.title,
+                    'url': result.post.get_absolute_url(),
+                    'excerpt': result.post.excerpt,
+                    'snippet': result.snippet,
+                    'rank': result.rank,
+                }
+                for result in results
+            ],
+        }, json_dumps_params={'ensure_ascii': False})
+
+
+class SyndicationFileMixin:
+    """
+    ارسال فایل های ساخته شده sitemap و feed (apps/blog/syndication.py)
+
+    اگر فایل هنوز ساخته نشده باشد یک بار همین جا ساخته می شود (پشت
+    syndication.build_lock، پس درخواست های همزمان فقط یک بار می سازند)
+    """
+    cache_control = 'public, max-age=3600'
+    content_type = 'application/xml; charset=utf-8'
+
+    def serve(self, request, name):
+        path = syndication.get_root() / name
+        if not path.is_file():
+            syndication.ensure_file(name, lambda: self.build(name))
+            if not path.is_file():
+                raise Http404(name)
+        return serve_file(request, str(path), self.cache_control, self.content_type)
+
+    def build(self, name):
+        """
+        ساختن فایل - داخل build_lock صدا زده می شود
+        """
+        raise NotImplementedError
+
+
+class SitemapView(SyndicationFileMixin, View):
+    """
+    sitemap.xml (فهرست) و بخش های آن: sitemap-pages.xml و sitemap-posts-<n>.xml
+    """
+
+    def get(self, request, section=None):
+        return self.serve(request, f'sitemap-{section}.xml' if section else 'sitemap.xml')
+
+    def build(self, name):
+        # فایل گم شده ای که index به آن اشاره می کند: ساخت کامل (برای بخش هایی
+        # که مقاله ندارند چیزی ساخته نمی شود و پاسخ 404 است)
+        chunks = {syndication.chunk_name(chunk) for chunk in syndication.post_chunks()}
+        if name in ('sitemap.xml', 'sitemap-pages.xml') or name in chunks:
+            syndication.rebuild_all()
+
+
+class FeedView(SyndicationFileMixin, View):
+    """
+    feed های RSS و Atom: همه مقالات، یک دسته بندی یا یک تگ
+    """
+    kind = 'all'
+    content_types = {
+        'rss': 'application/rss+xml; charset=utf-8',
+        'atom': 'application/atom+xml; charset=utf-8',
+    }
+
+    def get(self, request, feed_format, slug=None):
+        self.content_type = self.content_types[feed_format]
+        self.slug = slug
+        return self.serve(request, syndication.feed_name(self.kind, slug, feed_format))
+
+    def build(self, name):
+        syndication.build_feed(self.kind, self.slug)
@@ -0,0 +1,151 @@
+import csv
+
+from django.contrib import admin, messages
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from .models import ContactMessage, ContactInfo
+
+
+class Echo:
+    """
+    شیء شبیه فایل که فقط مقدار نوشته شده را برمی گرداند (برای csv.writer)
+    """
+    def write(self, value):
+        return value
+
+
+@admin.register(ContactMessage)
+class ContactMessageAdmin(admin.ModelAdmin):
+    """
+    پنل ادمین برای مدیریت پیام های تماس
+    """
+    list_display = ['name', 'email', 'subject', 'status', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['name', 'email', 'subject']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['name', 'email', 'phone', 'subject', 'message', 'created_at', 'updated_at']
+    actions = ['mark_read', 'mark_replied', 'archive', 'export_csv']
+    list_per_page = 50
+    # برای صندوق های بزرگ از COUNT(*) اضافه روی کل جدول جلوگیری می شود
+    show_full_result_count = False
+
+    fieldsets = (
+        (_('پیام'), {
+            'fields': ('name', 'email', 'phone', 'subject', 'message')
+        }),
+        (_('پیگیری'), {
+            'fields': ('status', 'admin_notes')
+        }),
+        (_('تاریخ ها'), {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        })
+    )
+
+    # ستون های فایل CSV
+    export_fields = ('id', 'created_at', 'status', 'name', 'email', 'phone', 'subject', 'message')
+    # شروع سلول با این کاراکترها در Excel فرمول حساب می شود (CSV injection)
+    formula_prefixes = ('=', '+', '-', '@', '\t', '\r')
+
+    def has_add_permission(self, request):
+        """
+        پیام ها فقط از طریق فرم تماس ساخته می شوند
+        """
+        return False
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        """
+        باز کردن پیام جدید (GET صفحه ویرایش) آن را خوانده شده می کند
+
+        یک UPDATE شرطی قبل از خواندن شیء اجرا می شود تا فرم وضعیت جدید را
+        نشان دهد. صفحه های حذف و تاریخچه وضعیت را تغییر نمی دهند
+        """
+        if request.method == 'GET':
+            try:
+                self.get_queryset(request).order_by().filter(pk=unquote(object_id)).mark_read()
+            except (ValidationError, ValueError):
+                # شناسه نامعتبر - change_view خودش پیام مناسب را نشان می دهد
+                pass
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def _transition_action(self, request, queryset, method, label):
+        # order_by حذف می شود تا UPDATE بدون مرتب سازی اجرا شود
+        changed = getattr(queryset.order_by(), method)()
+        self.message_user(
+            request,
+            _('%(count)d پیام %(label)s.') % {'count': changed, 'label': label},
+            messages.SUCCESS,
+        )
+
+    @admin.action(description=_('علامت گذاری به عنوان خوانده شده'))
+    def mark_read(self, request, queryset):
+        self._transition_action(request, queryset, 'mark_read', _('خوانده شده'))
+
+    @admin.action(description=_('علامت گذاری به عنوان پاسخ داده شده'))
+    def mark_replied(self, request, queryset):
+        self._transition_action(request, queryset, 'mark_replied', _('پاسخ داده شده'))
+
+    @admin.action(description=_('آرشیو پیام ها'))
+    def archive(self, request, queryset):
+        self._transition_action(request, queryset, 'archive', _('آرشیو شد'))
+
+    @admin.action(description=_('خروجی CSV'))
+    def export_csv(self, request, queryset):
+        """
+        خروجی CSV به صورت stream - پیام ها دسته ای از دیتابیس خوانده می شوند
+        و هیچ وقت کل فایل در حافظه ساخته نمی شود
+        """
+        rows = queryset.order_by('-created_at').values_list(*self.export_fields).iterator(chunk_size=2000)
+
+        def generate():
+            writer = csv.writer(Echo())
+            # BOM برای نمایش درست متن فارسی در Excel
+            yield '\ufeff' + writer.writerow(self.export_fields)
+            for row in rows:
+                row = [self.escape_csv_cell(value) for value in row]
+                row[1] = timezone.localtime(row[1]).strftime('%Y-%m-%d %H:%M')
+                yield writer.writerow(row)
+
+        filename = f'contact-messages-{timezone.localdate():%Y%m%d}.csv'
+        response = StreamingHttpResponse(generate(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def escape_csv_cell(self, value):
+        """
+        متن هایی که با کاراکتر فرمول شروع می شوند با ' شروع می شوند
+        تا Excel آن ها را به عنوان متن نشان دهد
+        """
+        if isinstance(value, str) and value.startswith(self.formula_prefixes):
+            return f"'{value}"
+        return value
+
+
+@admin.register(ContactInfo)
+class ContactInfoAdmin(admin.ModelAdmin):
+    """
+    پنل ادمین برای مدیریت اطلاعات تماس
+    """
+    list_display = ['email', 'phone', 'is_active', 'created_at']
+    list_filter = ['is_active', 'created_at']
+    search_fields = ['email', 'phone', 'address']
+    readonly_fields = ['created_at', 'updated_at']
+
+    fieldsets = (
+        (_('اطلاعات تماس'), {
+            'fields': ('address', 'phone', 'email', 'working_hours')
+        }),
+        (_('موقعیت روی نقشه'), {
+            'fields': ('latitude', 'longitude')
+        }),
+        (_('تنظیمات نمایش'), {
+            'fields': ('is_active',)
+        }),
+        (_('تاریخ ها'), {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        })
+    )
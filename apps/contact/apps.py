@@ -8,4 +8,13 @@ class ContactConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.contact'
-    verbose_name = 'تماس با من'
\ No newline at end of file
+    verbose_name = 'تماس با من'
+    
+    def ready(self):
+        """
+        با تغییر اطلاعات تماس کش آن بی اعتبار می شود
+        """
+        from apps.core.cache import register_invalidation
+        from .models import ContactInfo
+        
+        register_invalidation(ContactInfo)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+
+from .models import ContactInfo
+
+
+def contact_info(request):
+    """
+    اضافه کردن اطلاعات تماس فعال به context همه template ها
+    """
+    return {'contact_info': SimpleLazyObject(ContactInfo.get_active)}
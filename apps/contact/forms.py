@@ -0,0 +1,40 @@
+from django import forms
+from django.utils.text import Truncator
+from django.utils.translation import gettext_lazy as _
+
+
+class ContactMessageForm(forms.Form):
+    """
+    اعتبارسنجی فرم تماس
+
+    عمدا ModelForm نیست تا اعتبارسنجی هیچ query ای اجرا نکند و
+    بتوان آن را مستقیما داخل view غیرهمزمان صدا زد
+    """
+    name = forms.CharField(max_length=100)
+    email = forms.EmailField()
+    phone = forms.CharField(max_length=20, required=False)
+    subject = forms.CharField(max_length=200, required=False)
+    message = forms.CharField(max_length=5000)
+
+    # فیلد مخفی برای ربات ها - کاربر واقعی آن را پر نمی کند
+    website = forms.CharField(required=False)
+
+    def clean_website(self):
+        if self.cleaned_data['website']:
+            raise forms.ValidationError(_('درخواست نامعتبر است'))
+        return ''
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # فرم صفحه تماس فیلد موضوع ندارد - ابتدای پیام به عنوان موضوع ذخیره می شود
+        if not cleaned_data.get('subject') and cleaned_data.get('message'):
+            first_line = cleaned_data['message'].strip().splitlines()[0]
+            cleaned_data['subject'] = Truncator(first_line).chars(60)
+        return cleaned_data
+
+    def get_message_data(self):
+        """
+        داده های لازم برای ساختن ContactMessage
+        """
+        fields = ('name', 'email', 'phone', 'subject', 'message')
+        return {field: self.cleaned_data[field] for field in fields}
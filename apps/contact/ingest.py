@@ -0,0 +1,191 @@
+"""
+دریافت غیرهمزمان پیام های فرم تماس
+
+view فقط پیام را اعتبارسنجی کرده و در یک صف داخل حافظه قرار می دهد.
+یک thread پس زمینه پیام ها را دسته ای با bulk_create در دیتابیس می نویسد
+و ایمیل اطلاع رسانی را با یک اتصال SMTP برای کل دسته ارسال می کند.
+به این ترتیب هجوم پیام های اسپم نه worker های وب را مشغول می کند و نه
+SQLite را برای هر پیام قفل می کند
+
+اگر صف پر باشد پیام جدید پذیرفته نمی شود (view پاسخ 503 می دهد)
+
+تنظیمات از طریق CONTACT_INGEST در settings خوانده می شود
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# تنظیمات پیش فرض
+DEFAULTS = {
+    'QUEUE_SIZE': 1000,         # حداکثر پیام در انتظار نوشتن
+    'BATCH_SIZE': 100,          # حداکثر پیام در هر bulk_create
+    'FLUSH_INTERVAL': 1.0,      # حداکثر زمان انتظار پیام در صف (ثانیه)
+    'NOTIFY_EMAILS': None,      # گیرندگان ایمیل اطلاع رسانی (پیش فرض: ADMINS)
+}
+
+
+def get_config():
+    config = DEFAULTS.copy()
+    config.update(getattr(settings, 'CONTACT_INGEST', {}))
+    return config
+
+
+def get_notify_emails(config):
+    emails = config['NOTIFY_EMAILS']
+    if emails is None:
+        emails = [email for _, email in settings.ADMINS]
+    return list(emails)
+
+
+def send_notifications(messages, recipients):
+    """
+    ارسال ایمیل اطلاع رسانی برای یک دسته پیام با یک اتصال
+    """
+    if not recipients or not messages:
+        return 0
+    emails = [
+        EmailMessage(
+            subject=f'{settings.EMAIL_SUBJECT_PREFIX}پیام جدید: {message.subject}',
+            body=f'{message.name} <{message.email}> {message.phone}\n\n{message.message}',
+            to=recipients,
+            reply_to=[message.email],
+        )
+        for message in messages
+    ]
+    with get_connection() as connection:
+        return connection.send_messages(emails)
+
+
+class MessageQueue:
+    """
+    صف پیام های تماس همراه با thread نویسنده
+    """
+
+    def __init__(self, queue_size, batch_size, flush_interval, notify_emails):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.notify_emails = notify_emails
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        atexit.register(self.drain)
+
+    def submit(self, data):
+        """
+        قرار دادن داده های یک پیام در صف - اگر صف پر باشد False
+
+        این متد هیچ وقت block نمی شود و از داخل event loop قابل استفاده است
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(data)
+        except queue.Full:
+            logger.warning('صف پیام های تماس پر است - پیام پذیرفته نشد')
+            return False
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _take_batch(self, timeout):
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def process(self, batch):
+        """
+        نوشتن یک دسته پیام در دیتابیس و ارسال ایمیل - تعداد پیام های نوشته شده
+        """
+        from .models import ContactMessage
+
+        messages = ContactMessage.objects.bulk_create(
+            [ContactMessage(**data) for data in batch]
+        )
+        try:
+            send_notifications(messages, self.notify_emails)
+        except Exception:
+            # پیام ها ذخیره شده اند، فقط اطلاع رسانی انجام نشد
+            logger.exception('خطا در ارسال ایمیل پیام های تماس')
+        return len(messages)
+
+    def _requeue(self, batch):
+        for data in batch:
+            try:
+                self._queue.put_nowait(data)
+            except queue.Full:
+                logger.error(f'پیام تماس از دست رفت: {data.get("email")}')
+
+    def drain(self):
+        """
+        نوشتن همه پیام های باقی مانده (هنگام خروج process)
+        """
+        total = 0
+        while True:
+            batch = self._take_batch(timeout=0)
+            if not batch:
+                return total
+            total += self.process(batch)
+
+    def _ensure_worker(self):
+        """
+        راه اندازی thread پس زمینه (بعد از fork شدن worker هم دوباره ساخته می شود)
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            worker = threading.Thread(target=self._run, name='contact-ingest', daemon=True)
+            worker.start()
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(timeout=self.flush_interval)
+            if not batch:
+                continue
+            try:
+                self.process(batch)
+            except Exception:
+                logger.exception(f'خطا در ذخیره {len(batch)} پیام تماس')
+                self._requeue(batch)
+                # قبل از تلاش دوباره کمی صبر می کنیم (مثلا دیتابیس قفل است)
+                time.sleep(self.flush_interval)
+            finally:
+                connections.close_all()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_message_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                config = get_config()
+                _queue = MessageQueue(
+                    config['QUEUE_SIZE'],
+                    config['BATCH_SIZE'],
+                    config['FLUSH_INTERVAL'],
+                    get_notify_emails(config),
+                )
+    return _queue
@@ -0,0 +1,89 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from apps.contact.models import ContactInfo
+
+
+class Command(BaseCommand):
+    """
+    تست همزمانی فعال سازی اطلاعات تماس
+
+    چند thread به صورت همزمان رکورد جدید فعال می سازند یا رکوردهای موجود
+    را دوباره فعال می کنند. در پایان بررسی می شود که دقیقا یک رکورد فعال
+    وجود داشته باشد و مقدار کش شده get_active همان رکورد باشد.
+    رکوردهای ساخته شده در پایان حذف می شوند
+
+    استفاده:
+    python manage.py stress_contact_info --threads 16 --saves 50
+    """
+    help = 'تست همزمانی ذخیره و فعال سازی ContactInfo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='تعداد thread همزمان')
+        parser.add_argument('--saves', type=int, default=50, help='تعداد ذخیره در هر thread')
+
+    def handle(self, *args, **options):
+        existing = set(ContactInfo.objects.values_list('pk', flat=True))
+        previous_active = ContactInfo.objects.filter(is_active=True).values_list('pk', flat=True).first()
+        created = []
+        results = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def worker(number):
+            barrier.wait()
+            for index in range(options['saves']):
+                try:
+                    with lock:
+                        candidates = list(created)
+                    if candidates and random.random() < 0.5:
+                        info = ContactInfo.objects.get(pk=random.choice(candidates))
+                        info.is_active = True
+                        info.save()
+                        outcome = 'reactivated'
+                    else:
+                        info = ContactInfo(
+                            address='stress test', phone='0', email=f'stress{number}-{index}@example.com',
+                            working_hours='-', is_active=True,
+                        )
+                        info.save()
+                        with lock:
+                            created.append(info.pk)
+                        outcome = 'created'
+                except Exception as e:
+                    outcome = type(e).__name__
+                with lock:
+                    results[outcome] += 1
+            connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        # on_commit باطل سازی کش در thread هر ذخیره اجرا شده است
+        active = list(ContactInfo.objects.filter(is_active=True).values_list('pk', flat=True))
+        cached = ContactInfo.get_active()
+
+        for outcome, count in sorted(results.items()):
+            self.stdout.write(f'{outcome}: {count}')
+        self.stdout.write(f'{sum(results.values())} ذخیره در {elapsed:.2f} ثانیه، رکوردهای فعال: {active}')
+
+        with transaction.atomic():
+            ContactInfo.objects.exclude(pk__in=existing).delete()
+            if previous_active is not None:
+                ContactInfo.objects.get(pk=previous_active).save()
+
+        if len(active) != 1:
+            raise CommandError(f'به جای یک رکورد فعال {len(active)} رکورد فعال وجود دارد')
+        if cached is None or cached.pk != active[0]:
+            raise CommandError('مقدار کش شده get_active با رکورد فعال دیتابیس یکسان نیست')
+        self.stdout.write(self.style.SUCCESS('دقیقا یک رکورد فعال و کش به روز است'))
@@ -1,8 +1,38 @@
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from apps.core.cache import get_singleton
 from apps.core.models import TimeStampedModel
 
 
+class ContactMessageQuerySet(models.QuerySet):
+    """
+    تغییر وضعیت دسته ای پیام ها با یک UPDATE
+
+    هر تغییر فقط روی پیام هایی اعمال می شود که وضعیت فعلی شان اجازه آن را
+    می دهد (ContactMessage.TRANSITIONS)، مثلا پیام پاسخ داده شده با
+    mark_read دوباره خوانده شده نمی شود. خروجی تعداد پیام های تغییر کرده است
+    """
+
+    def transition(self, status):
+        sources = [
+            source for source, targets in self.model.TRANSITIONS.items()
+            if status in targets
+        ]
+        # update() فیلد auto_now را به روز نمی کند
+        return self.filter(status__in=sources).update(status=status, updated_at=timezone.now())
+
+    def mark_read(self):
+        return self.transition('read')
+
+    def mark_replied(self):
+        return self.transition('replied')
+
+    def archive(self):
+        return self.transition('archived')
+
+
 class ContactMessage(TimeStampedModel):
     """
     مدل پیام های تماس
@@ -52,6 +82,14 @@ class ContactMessage(TimeStampedModel):
         verbose_name=_('وضعیت'),
         help_text=_('وضعیت پیام')
     )
+
+    # تغییر وضعیت های مجاز: وضعیت فعلی -> وضعیت های بعدی
+    TRANSITIONS = {
+        'new': ('read', 'replied', 'archived'),
+        'read': ('replied', 'archived'),
+        'replied': ('archived',),
+        'archived': (),
+    }
     
     # یادداشت ادمین
     admin_notes = models.TextField(
@@ -60,28 +98,40 @@ class ContactMessage(TimeStampedModel):
         help_text=_('یادداشت داخلی برای ادمین')
     )
     
+    objects = ContactMessageQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('پیام تماس')
         verbose_name_plural = _('پیام های تماس')
         ordering = ['-created_at']
+        indexes = [
+            # فیلتر وضعیت در صندوق پیام های ادمین
+            models.Index(fields=['status', '-created_at'], name='contact_msg_status_idx'),
+        ]
     
     def __str__(self):
         return f'{self.name} - {self.subject}'
     
+    def _transition(self, status):
+        """
+        تغییر وضعیت همین پیام با UPDATE شرطی (بدون خواندن دوباره از دیتابیس)
+        """
+        changed = type(self).objects.filter(pk=self.pk).transition(status)
+        if changed:
+            self.status = status
+        return bool(changed)
+
     def mark_as_read(self):
         """
         علامت گذاری پیام به عنوان خوانده شده
         """
-        if self.status == 'new':
-            self.status = 'read'
-            self.save(update_fields=['status'])
-    
+        return self._transition('read')
+
     def mark_as_replied(self):
         """
         علامت گذاری پیام به عنوان پاسخ داده شده
         """
-        self.status = 'replied'
-        self.save(update_fields=['status'])
+        return self._transition('replied')
 
 
 class ContactInfo(TimeStampedModel):
@@ -139,15 +189,65 @@ class ContactInfo(TimeStampedModel):
     class Meta:
         verbose_name = _('اطلاعات تماس')
         verbose_name_plural = _('اطلاعات تماس')
+        constraints = [
+            # حداکثر یک رکورد فعال - حتی اگر دو ذخیره همزمان از قفل عبور کنند
+            models.UniqueConstraint(
+                fields=['is_active'],
+                condition=Q(is_active=True),
+                name='contact_info_single_active',
+            ),
+        ]
     
     def __str__(self):
         return f'اطلاعات تماس - {self.email}'
     
+    # تعداد تلاش دوباره وقتی ذخیره همزمان دیگری زودتر فعال شده باشد
+    SAVE_ATTEMPTS = 3
+    
     def save(self, *args, **kwargs):
         """
         فقط یک رکورد اطلاعات تماس فعال مجاز است
+
+        غیرفعال کردن رکورد فعال قبلی و ذخیره این رکورد در یک تراکنش انجام
+        می شود و رکورد فعال قبلی تا پایان تراکنش قفل می ماند. اگر ذخیره
+        همزمان دیگری رکورد فعال ساخته باشد، constraint خطا می دهد و عملیات
+        دوباره تکرار می شود (آخرین ذخیره برنده است)
+        """
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        for attempt in range(self.SAVE_ATTEMPTS):
+            try:
+                with transaction.atomic(using=using):
+                    if self.is_active:
+                        self._deactivate_others(using)
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if not self.is_active or attempt == self.SAVE_ATTEMPTS - 1:
+                    raise
+    
+    def _deactivate_others(self, using):
+        active = (
+            ContactInfo.objects.using(using)
+            .select_for_update()
+            .filter(is_active=True)
+            .exclude(pk=self.pk)
+        )
+        pks = list(active.values_list('pk', flat=True))
+        if pks:
+            ContactInfo.objects.using(using).filter(pk__in=pks).update(is_active=False)
+    
+    def validate_constraints(self, exclude=None):
+        """
+        فعال کردن یک رکورد در فرم ادمین مجاز است چون save بقیه را غیرفعال می کند
+        """
+        exclude = set(exclude or ()) | {'is_active'}
+        super().validate_constraints(exclude=exclude)
+    
+    @classmethod
+    def get_active(cls):
+        """
+        دریافت اطلاعات تماس فعال از کش (یا None)
         """
-        if self.is_active:
-            # غیرفعال کردن سایر رکوردها
-            ContactInfo.objects.filter(is_active=True).update(is_active=False)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        return get_singleton(
+            'contact:active_info', cls, lambda: cls.objects.filter(is_active=True).first()
+        )
\ No newline at end of file
@@ -1,10 +1,53 @@
-from django.shortcuts import render
-from django.views.generic import TemplateView
+from django.conf import settings
 from django.http import JsonResponse
+from django.views.generic import TemplateView, View
 
-class ContactView(TemplateView):
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.ratelimit import ratelimit
+from .forms import ContactMessageForm
+from .ingest import get_message_queue
+
+
+class ContactView(ConditionalGetMixin, TemplateView):
+    """
+    صفحه تماس
+
+    صفحه توکن CSRF فرم را دارد، پس فقط در مرورگر کاربر کش می شود و کوکی
+    CSRF هم جزو ETag است
+    """
     template_name = 'contact/contact.html'
+    cache_control = {'private': True, 'max_age': 0, 'must_revalidate': True}
+
+    def get_etag_extra(self):
+        return (self.request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),)
+
+
+class SendMessageView(View):
+    """
+    دریافت پیام فرم تماس (AJAX)
+
+    view غیرهمزمان است و به دیتابیس دسترسی ندارد: تعداد پیام ها برای هر IP و
+    هر ایمیل قبل از هر پردازشی محدود می شود و پیام بعد از اعتبارسنجی در صف
+    قرار می گیرد و در پس زمینه ذخیره می شود (apps/contact/ingest.py)
+    """
+
+    @ratelimit(rate='5/10m', key=('ip', 'post:email'), group='contact:send_message')
+    async def post(self, request):
+        form = ContactMessageForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({
+                'success': False,
+                'message': 'لطفا فیلدهای فرم را به درستی پر کنید.',
+                'errors': form.errors,
+            }, status=400, json_dumps_params={'ensure_ascii': False})
+
+        if not get_message_queue().submit(form.get_message_data()):
+            return JsonResponse({
+                'success': False,
+                'message': 'در حال حاضر امکان دریافت پیام وجود ندارد. لطفا بعدا تلاش کنید.',
+            }, status=503, json_dumps_params={'ensure_ascii': False})
 
-class SendMessageView(TemplateView):
-    def post(self, request):
-        return JsonResponse({'success': True})
\ No newline at end of file
+        return JsonResponse({
+            'success': True,
+            'message': 'پیام شما با موفقیت ارسال شد.',
+        }, status=202, json_dumps_params={'ensure_ascii': False})
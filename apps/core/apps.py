@@ -8,4 +8,12 @@ class CoreConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
-    verbose_name = 'Core'
\ No newline at end of file
+    verbose_name = 'Core'
+    
+    def ready(self):
+        """
+        ساخت خودکار نسخه های responsive تصاویر بعد از آپلود
+        """
+        from .images import register_image_fields
+        
+        register_image_fields()
\ No newline at end of file
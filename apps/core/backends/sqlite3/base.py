@@ -0,0 +1,57 @@
+"""
+backend SQLite برای اجرای سایت با چند worker روی یک سرور
+
+همان backend پیش فرض Django با دو تفاوت که از OPTIONS خوانده می شوند:
+
+- pragmas: PRAGMA هایی که برای هر اتصال جدید اجرا می شوند (WAL،
+  synchronous=NORMAL، mmap_size، cache_size و ...)
+- transaction_mode: نوع BEGIN در transaction.atomic. با DEFERRED (پیش فرض
+  SQLite) تراکنشی که اول می خواند و بعد می نویسد هنگام گرفتن قفل نوشتن
+  بلافاصله خطای database is locked می گیرد و busy timeout کمکی نمی کند؛
+  با IMMEDIATE قفل نوشتن از ابتدای تراکنش گرفته می شود و worker ها به
+  ترتیب منتظر می مانند
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'apps.core.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+        },
+    }
+}
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_mode = 'DEFERRED'
+    pragmas = {}
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # این گزینه ها مخصوص این backend هستند و به sqlite3.connect داده نمی شوند
+        transaction_mode = (kwargs.pop('transaction_mode', None) or 'DEFERRED').upper()
+        if transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'transaction_mode نامعتبر برای SQLite: {transaction_mode!r} '
+                f'(یکی از {", ".join(TRANSACTION_MODES)})'
+            )
+        self.transaction_mode = transaction_mode
+        self.pragmas = kwargs.pop('pragmas', None) or {}
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        # مستقیما روی اتصال sqlite3 اجرا می شود تا جزو query های درخواست شمرده نشود
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,306 @@
+"""
+کش سطح مدل با باطل سازی از طریق signal
+
+برای هر مدل یک "نسخه" در کش نگهداری می شود. داده های کش شده همیشه
+با نسخه فعلی مدل کلید می خورند، پس با هر post_save یا post_delete
+کافیست نسخه را عوض کنیم تا همه داده های قبلی آن مدل بی اعتبار شوند
+
+بدون Redis (LocMemCache) هر worker کش جدای خودش را دارد، پس نسخه ها و
+داده ها فقط OBJECT_CACHE_LOCAL_TIMEOUT ثانیه نگه داشته می شوند
+
+استفاده:
+register_invalidation(Service)   # معمولا در AppConfig.ready
+services = get_cached('about:services', Service, lambda: list(Service.active.all()))
+"""
+import asyncio
+import hashlib
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import translation
+
+from .metrics import get_registry, labels
+from .routers import get_config as get_router_config
+
+VERSION_KEY_PREFIX = 'core:version'
+STAMP_KEY_PREFIX = 'core:stamp'
+DATA_KEY_PREFIX = 'core:data'
+FRAGMENT_KEY_PREFIX = 'core:fragment'
+
+# نشانگر "در کش نیست" (چون None هم می تواند مقدار معتبر باشد)
+MISSING = object()
+
+
+def is_process_local():
+    """
+    آیا کش پیش فرض فقط در حافظه همین process است (LocMemCache بدون REDIS_URL)
+
+    در این حالت bump_version فقط کش همین worker را عوض می کند و بقیه
+    worker ها تا منقضی شدن کلیدها داده قدیمی را می بینند
+    """
+    return isinstance(caches['default'], LocMemCache)
+
+
+def get_local_timeout():
+    """
+    حداکثر عمر نسخه ها و داده ها وقتی کش مشترک نیست (پیش فرض یک دقیقه)
+    """
+    return getattr(settings, 'OBJECT_CACHE_LOCAL_TIMEOUT', 60)
+
+
+def get_timeout():
+    """
+    مدت نگهداری داده ها در کش
+
+    چون با هر تغییر نسخه عوض می شود، می تواند طولانی باشد
+    این زمان فقط برای پاک شدن کلیدهای نسخه های قدیمی است. با کش
+    حافظه process به get_local_timeout محدود می شود
+    """
+    timeout = getattr(settings, 'OBJECT_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+    if is_process_local():
+        return min(timeout, get_local_timeout())
+    return timeout
+
+
+def get_version_timeout():
+    """
+    مدت نگهداری نسخه مدل ها: در کش مشترک بدون انقضا، در کش حافظه
+    process کوتاه تا تغییر در worker های دیگر هم دیده شود
+    """
+    return get_local_timeout() if is_process_local() else None
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def _version_key(model):
+    return f'{VERSION_KEY_PREFIX}:{model_label(model)}'
+
+
+def get_versions(*models):
+    """
+    دریافت نسخه فعلی چند مدل با یک درخواست به کش
+
+    نسخه زمان آخرین تغییر (به نانوثانیه) است، پس اگر کش پاک شود
+    نسخه جدید هرگز با نسخه های قبلی برابر نمی شود
+    """
+    keys = {_version_key(model): model for model in models}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, model in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(key, version, timeout=get_version_timeout()):
+                version = cache.get(key, version)
+        versions[model] = version
+    return versions
+
+
+def bump_version(model):
+    """
+    بی اعتبار کردن همه داده های کش شده یک مدل
+    """
+    cache.set(_version_key(model), time.time_ns(), timeout=get_version_timeout())
+
+
+def sync_versions(stamps):
+    """
+    عوض کردن نسخه مدل هایی که در دیتابیس تغییر کرده اند ولی کش هنوز آن را نمی داند
+
+    stamps یک dict است: {مدل: وضعیت فعلی جدول در دیتابیس}، مثلا
+    (بیشترین updated_at, تعداد رکوردها). اگر stamp با آخرین stamp دیده شده در
+    این کش برابر نباشد نسخه مدل عوض می شود. با کش حافظه process تغییری که
+    worker دیگری ذخیره کرده (و signal آن فقط کش همان worker را عوض کرده)
+    این جا دیده می شود و داده ها قبل از render دوباره از دیتابیس خوانده می شوند
+
+    خروجی: مدل هایی که نسخه شان عوض شد
+    """
+    keys = {f'{STAMP_KEY_PREFIX}:{model_label(model)}': model for model in stamps}
+    found = cache.get_many(list(keys))
+    changed = {}
+    for key, model in keys.items():
+        if found.get(key, MISSING) != stamps[model]:
+            bump_version(model)
+            changed[key] = stamps[model]
+    if changed:
+        cache.set_many(changed, timeout=get_version_timeout())
+    return [keys[key] for key in changed]
+
+
+def _data_key(name, models, versions):
+    stamp = '.'.join(str(versions[model]) for model in models)
+    return f'{DATA_KEY_PREFIX}:{name}:{stamp}'
+
+
+def _normalize_entries(entries):
+    normalized = {}
+    for name, (models, loader) in entries.items():
+        if not isinstance(models, (list, tuple)):
+            models = [models]
+        normalized[name] = (models, loader)
+    all_models = {model for models, _ in normalized.values() for model in models}
+    return normalized, all_models
+
+
+def _record(name, hit):
+    get_registry().inc('cv_object_cache_requests_total', labels(name=name, result='hit' if hit else 'miss'))
+
+
+def get_cached_many(entries):
+    """
+    دریافت چند داده کش شده با حداکثر دو درخواست به کش
+
+    entries یک dict است: {نام: (مدل یا لیست مدل ها, تابع ساخت داده)}
+    فقط داده هایی که نسخه مدلشان عوض شده دوباره ساخته می شوند
+    """
+    normalized, all_models = _normalize_entries(entries)
+    versions = get_versions(*all_models)
+
+    keys = {name: _data_key(name, models, versions) for name, (models, _) in normalized.items()}
+    found = cache.get_many(list(keys.values()))
+
+    results = {}
+    missing = {}
+    for name, key in keys.items():
+        value = found.get(key, MISSING)
+        if value is MISSING:
+            value = normalized[name][1]()
+            missing[key] = value
+        _record(name, key not in missing)
+        results[name] = value
+
+    if missing:
+        cache.set_many(missing, timeout=get_timeout())
+    return results
+
+
+async def aget_cached_many(entries):
+    """
+    نسخه async get_cached_many برای view های async
+
+    تابع ساخت هر داده یک coroutine برمی گرداند (مثلا با ORM async) و
+    داده هایی که در کش نیستند همزمان با asyncio.gather ساخته می شوند
+    """
+    normalized, all_models = _normalize_entries(entries)
+    versions = await sync_to_async(get_versions)(*all_models)
+
+    keys = {name: _data_key(name, models, versions) for name, (models, _) in normalized.items()}
+    found = await cache.aget_many(list(keys.values()))
+
+    stale = [name for name, key in keys.items() if key not in found]
+    loaded = dict(zip(stale, await asyncio.gather(*(normalized[name][1]() for name in stale))))
+
+    results = {}
+    for name, key in keys.items():
+        _record(name, name not in loaded)
+        results[name] = loaded[name] if name in loaded else found[key]
+
+    if loaded:
+        await cache.aset_many({keys[name]: value for name, value in loaded.items()}, timeout=get_timeout())
+    return results
+
+
+def fragment_key(name, models, vary_on=()):
+    """
+    کلید کش یک قسمت از template
+
+    شامل زبان فعال و نسخه مدل ها است، پس با تغییر هر رکورد این مدل ها یا
+    عوض شدن زبان قسمت دوباره ساخته می شود
+    """
+    versions = get_versions(*models)
+    stamp = '.'.join(str(versions[model]) for model in models)
+    vary = hashlib.md5(':'.join(map(str, vary_on)).encode()).hexdigest()
+    return f'{FRAGMENT_KEY_PREFIX}:{name}:{translation.get_language()}:{stamp}:{vary}'
+
+
+def get_cached(name, models, loader):
+    """
+    نسخه ساده get_cached_many برای یک داده
+    """
+    return get_cached_many({name: (models, loader)})[name]
+
+
+def _invalidate(sender, **kwargs):
+    # بعد از commit نسخه را عوض می کنیم تا درخواست همزمان داده قدیمی
+    # را با نسخه جدید در کش ذخیره نکند
+    transaction.on_commit(lambda: _bump_after_commit(sender), using=kwargs.get('using'))
+
+
+def _bump_after_commit(model):
+    bump_version(model)
+    # با replica ها درخواستی که بین commit و رسیدن تغییر به replica از آن
+    # می خواند، داده قدیمی را با نسخه جدید کش می کند؛ بعد از حداکثر تاخیر
+    # replication نسخه یک بار دیگر عوض می شود
+    config = get_router_config()
+    if config['REPLICAS'] and config['PIN_SECONDS']:
+        timer = threading.Timer(config['PIN_SECONDS'], bump_version, args=(model,))
+        timer.daemon = True
+        timer.start()
+
+
+# مدل هایی که باطل سازی کش برایشان ثبت شده (به ترتیب ثبت)
+_registered_models = []
+
+
+def register_invalidation(*models):
+    """
+    اتصال signal های post_save و post_delete برای باطل سازی کش این مدل ها
+    """
+    for model in models:
+        if model not in _registered_models:
+            _registered_models.append(model)
+        uid = f'core.cache.invalidate:{model_label(model)}'
+        post_save.connect(_invalidate, sender=model, dispatch_uid=uid, weak=False)
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=uid, weak=False)
+
+
+def get_registered_models():
+    """
+    همه مدل هایی که نسخه کش دارند (مثلا برای باطل کردن همه آن ها در benchmark ها)
+    """
+    return tuple(_registered_models)
+
+
+# کش داخل حافظه process برای رکوردهای singleton: {نام: (نسخه, مقدار)}
+_local_singletons = {}
+
+
+def get_singleton(name, model, loader):
+    """
+    دریافت رکوردی که تقریبا هیچ وقت تغییر نمی کند (مثل پروفایل)
+
+    مقدار در حافظه همان process نگه داشته می شود و فقط نسخه مدل از کش
+    مشترک خوانده می شود، پس در حالت عادی هیچ query و deserialize ای
+    انجام نمی شود. با تغییر نسخه، مقدار از کش مشترک یا دیتابیس دوباره
+    خوانده می شود
+    """
+    version = get_versions(model)[model]
+    memo = _local_singletons.get(name)
+    if memo is not None and memo[0] == version:
+        return memo[1]
+
+    value = get_cached(name, model, loader)
+    _local_singletons[name] = (version, value)
+    return value
+
+
+async def aget_singleton(name, model, loader):
+    """
+    نسخه async get_singleton - loader یک coroutine برمی گرداند
+    """
+    version = (await sync_to_async(get_versions)(model))[model]
+    memo = _local_singletons.get(name)
+    if memo is not None and memo[0] == version:
+        return memo[1]
+
+    value = (await aget_cached_many({name: (model, loader)}))[name]
+    _local_singletons[name] = (version, value)
+    return value
@@ -0,0 +1,195 @@
+"""
+درخواست های شرطی (ETag و Last-Modified) برای صفحات عمومی
+
+validator های هر صفحه بدون ساختن template محاسبه می شوند:
+- بیشترین updated_at و تعداد رکوردهای مدل های صفحه و مدل های context
+  processor ها (پروفایل و اطلاعات تماس)، همه با یک query
+  (UNION ALL از یک aggregate برای هر queryset)
+- زمان آخرین تغییر template ها و hash مانیفست فایل های استاتیک، تا با
+  deploy جدید ETag ها عوض شوند
+
+validator ها فقط از دیتابیس و فایل ها ساخته می شوند (نه از نسخه های کش که
+در هر process جدا هستند)، پس ETag یک صفحه در همه worker ها و بعد از
+راه اندازی دوباره یکسان است. برای اینکه بدنه صفحه با همان داده ها ساخته شود،
+وضعیت هر مدل دارای کش (register_invalidation) با cache.sync_versions به کش
+داده می شود و اگر کش از دیتابیس عقب باشد نسخه آن مدل عوض می شود
+
+هر چیزی که در صفحه نمایش داده می شود باید در validator ها باشد؛ مثلا
+views_count که با UPDATE بدون تغییر updated_at زیاد می شود نمایش داده نمی شود
+
+اگر درخواست If-None-Match یا If-Modified-Since معتبر داشته باشد پاسخ 304
+بدون ساختن context و render کردن template برگردانده می شود
+
+برای view های async (متد get با async def) validator ها با sync_to_async
+محاسبه می شوند
+
+استفاده:
+class PostListView(ConditionalGetMixin, ListView):
+    conditional_models = (Post, Category, Tag)
+    cache_control = {'public': True, 'max_age': 60}
+"""
+import hashlib
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db.models import Count, Max, Value
+from django.template import engines
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils import translation
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_registered_models, sync_versions
+
+_template_stamp = None
+
+
+def get_template_stamp():
+    """
+    زمان آخرین تغییر فایل های template (نانوثانیه) به همراه hash مانیفست استاتیک
+
+    در حالت عادی یک بار برای هر process محاسبه می شود و در DEBUG هر بار
+    """
+    global _template_stamp
+    if _template_stamp is not None and not settings.DEBUG:
+        return _template_stamp
+
+    latest = 0
+    for engine in engines.all():
+        for directory in getattr(engine, 'template_dirs', ()):
+            for path in Path(directory).rglob('*.html'):
+                latest = max(latest, path.stat().st_mtime_ns)
+    _template_stamp = f'{latest}:{getattr(staticfiles_storage, "manifest_hash", "")}'
+    return _template_stamp
+
+
+def aggregate_querysets(querysets):
+    """
+    (بیشترین updated_at, تعداد رکوردها) هر queryset با یک query، به ترتیب querysets
+
+    تعداد هم لازم است چون حذف یک رکورد updated_at بقیه را عوض نمی کند
+    """
+    parts = [
+        qs.order_by()
+        .annotate(conditional_group=Value(index))
+        .values('conditional_group')
+        .annotate(last=Max('updated_at'), count=Count('pk'))
+        .values_list('conditional_group', 'last', 'count')
+        for index, qs in enumerate(querysets)
+    ]
+    if not parts:
+        return []
+    query = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+
+    rows = [(None, 0)] * len(parts)
+    for index, last, count in query:
+        rows[index] = (last, count)
+    return rows
+
+
+def aggregate_last_modified(querysets):
+    """
+    (بیشترین updated_at, مجموع تعداد رکوردها) چند queryset با یک query
+    """
+    return combine_rows(aggregate_querysets(querysets))
+
+
+def combine_rows(rows):
+    """
+    (بیشترین updated_at, مجموع تعداد) از خروجی aggregate_querysets
+    """
+    dates = [last for last, _ in rows if last is not None]
+    return max(dates, default=None), sum(count for _, count in rows)
+
+
+def sync_cache_versions(querysets, rows):
+    """
+    فرستادن وضعیت مدل های دارای کش به cache.sync_versions
+
+    فقط queryset های بدون فیلتر وضعیت کل جدول را نشان می دهند
+    """
+    registered = set(get_registered_models())
+    stamps = {
+        qs.model: (last.isoformat() if last else '', count)
+        for qs, (last, count) in zip(querysets, rows)
+        if qs.model in registered and not qs.query.has_filters()
+    }
+    if stamps:
+        sync_versions(stamps)
+
+
+class ConditionalGetMixin:
+    """
+    اضافه کردن ETag، Last-Modified و Cache-Control به view های کلاسی
+
+    - conditional_models: مدل هایی که updated_at آن ها بررسی می شود
+    - get_conditional_querysets: برای محدود کردن به رکوردهای همین صفحه
+    - shared_models: مدل های context processor ها که در همه صفحات هستند
+    - get_etag_extra: مقادیر دیگری که خروجی صفحه به آن ها بستگی دارد
+    """
+    conditional_models = ()
+    shared_models = ('about.Profile', 'contact.ContactInfo')
+    cache_control = {'public': True, 'max_age': 60}
+
+    def get_conditional_querysets(self):
+        return [model._default_manager.all() for model in self.conditional_models]
+
+    def get_shared_querysets(self, querysets):
+        """
+        querysets مدل های shared_models که در querysets صفحه نیستند
+        """
+        present = {qs.model for qs in querysets}
+        models = (apps.get_model(label) for label in self.shared_models)
+        return [model._default_manager.all() for model in models if model not in present]
+
+    def get_etag_extra(self):
+        return ()
+
+    def get_validators(self):
+        """
+        (etag, last_modified) صفحه - last_modified به صورت timestamp
+        """
+        querysets = self.get_conditional_querysets()
+        querysets = [*querysets, *self.get_shared_querysets(querysets)]
+        rows = aggregate_querysets(querysets)
+        # بدنه صفحه باید از همان داده هایی ساخته شود که ETag از آن ها ساخته می شود
+        sync_cache_versions(querysets, rows)
+        last, count = combine_rows(rows)
+
+        # هر زبان خروجی جداگانه دارد (Vary: Accept-Language توسط LocaleMiddleware)
+        parts = [translation.get_language(), get_template_stamp(), count, last.isoformat() if last else '']
+        parts.extend(self.get_etag_extra())
+        etag = quote_etag(hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest())
+        return etag, int(last.timestamp()) if last is not None else None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, last_modified)
+
+    async def _adispatch(self, request, *args, **kwargs):
+        etag, last_modified = await sync_to_async(self.get_validators)()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, last_modified)
+
+    def add_validators(self, response, etag, last_modified):
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        patch_cache_control(response, **self.cache_control)
+        return response
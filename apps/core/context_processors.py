@@ -0,0 +1,8 @@
+from .i18n import get_language_assets
+
+
+def language(request):
+    """
+    جهت صفحه (rtl/ltr) و stylesheet مخصوص آن برای زبان فعال
+    """
+    return get_language_assets()
@@ -0,0 +1,303 @@
+"""
+ساختن نسخه کوچک شده (subset) فونت های فارسی
+
+فونت های IRY و Sarb به صورت کامل (WOFF2, WOFF, SVG) همراه پروژه هستند
+در حالی که سایت فقط بخش کوچکی از glyph های آنها را استفاده می کند.
+دستور subset_fonts کاراکترهای استفاده شده در template ها و فیلدهای متنی
+دیتابیس را جمع می کند و برای هر @font-face در rtl.css یک WOFF2 کوچک می سازد:
+
+statics/assets/fonts/subset/IRY-Bold.woff2
+statics/assets/fonts/subset/manifest.json
+statics/assets/styles/fonts-subset.css
+
+fonts-subset.css بعد از rtl.css بارگذاری می شود و همان @font-face ها را با
+unicode-range تعریف می کند. مرورگر برای هر کاراکتر آخرین face ای را
+انتخاب می کند که unicode-range آن کاراکتر را پوشش دهد، پس فونت کامل فقط
+وقتی دانلود می شود که متن جدیدی کاراکتر خارج از subset داشته باشد
+
+تگ {% font_subsets %} در templatetags/fonts.py لینک CSS و preload ها را
+از روی manifest می سازد (اگر subset ساخته نشده باشد چیزی چاپ نمی شود)
+"""
+import json
+import os
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+try:
+    from fontTools import subset as font_subset
+    from fontTools.ttLib import TTFont
+except ImportError:
+    font_subset = None
+    TTFont = None
+
+# مسیرها نسبت به پوشه static
+SOURCE_CSS = 'assets/styles/rtl.css'
+OUTPUT_CSS = 'assets/styles/fonts-subset.css'
+SUBSET_DIR = 'assets/fonts/subset'
+MANIFEST_NAME = 'manifest.json'
+
+# فونت هایی که به صورت پیش فرض preload می شوند (متن اصلی، عنوان ها و نام کاربر)
+DEFAULT_PRELOAD = ('IRY.woff2', 'IRY-ExtraBold.woff2', 'Sarb-Regular.woff2')
+
+# کاراکترهایی که همیشه در subset قرار می گیرند تا متن جدید فارسی یا لاتین
+# قبل از اجرای دوباره دستور هم با فونت subset نمایش داده شود
+BASE_CHARACTERS = (
+    ''.join(chr(code) for code in range(0x20, 0x7F))
+    + 'ءآأؤإئابةتثجحخدذرزسشصضطظعغفقكلمنهوىيپچژکگی'
+    + '۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩'
+    + '،؛؟«»٪٫٬ـ'
+    + 'ًٌٍَُِّْٰ'
+    + '‌‍ –—…‘’“”•'
+)
+
+# اپ هایی که فیلدهای متنی آنها اسکن می شود
+TEXT_APPS = ('about', 'blog', 'contact')
+
+FONT_FACE_RE = re.compile(r'@font-face\s*{(?P<body>[^}]*)}', re.S)
+FAMILY_RE = re.compile(r"font-family\s*:\s*['\"]?(?P<value>[^;'\"]+)['\"]?\s*;")
+WOFF2_RE = re.compile(r"url\(['\"]?(?P<value>[^'\")]+\.woff2)['\"]?\)\s*format\(['\"]woff2['\"]\)")
+WEIGHT_RE = re.compile(r'font-weight\s*:\s*(?P<value>[^;]+);')
+STYLE_RE = re.compile(r'font-style\s*:\s*(?P<value>[^;]+);')
+
+
+@dataclass
+class FontFace:
+    family: str
+    # مسیر فایل WOFF2 نسبت به پوشه static
+    source: str
+    weight: str = 'normal'
+    style: str = 'normal'
+
+    @property
+    def filename(self):
+        return posixpath.basename(self.source)
+
+    @property
+    def subset_path(self):
+        return posixpath.join(SUBSET_DIR, self.filename)
+
+
+def static_dir():
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def parse_font_faces(css, css_path=SOURCE_CSS):
+    """
+    خواندن @font-face های یک فایل CSS (فقط face هایی که WOFF2 دارند)
+    """
+    faces = []
+    base = posixpath.dirname(css_path)
+    for match in FONT_FACE_RE.finditer(css):
+        body = match.group('body')
+        family = FAMILY_RE.search(body)
+        source = WOFF2_RE.search(body)
+        if not family or not source:
+            continue
+        weight = WEIGHT_RE.search(body)
+        style = STYLE_RE.search(body)
+        faces.append(FontFace(
+            family=family.group('value').strip(),
+            source=posixpath.normpath(posixpath.join(base, source.group('value'))),
+            weight=weight.group('value').strip() if weight else 'normal',
+            style=style.group('value').strip() if style else 'normal',
+        ))
+    return faces
+
+
+def iter_template_files():
+    """
+    همه فایل های template پروژه و اپ های داخلی
+    """
+    directories = []
+    for engine in settings.TEMPLATES:
+        directories.extend(Path(directory) for directory in engine.get('DIRS', []))
+    for label in TEXT_APPS:
+        directories.append(Path(apps.get_app_config(label).path) / 'templates')
+
+    for directory in directories:
+        if directory.is_dir():
+            yield from (path for path in directory.rglob('*') if path.suffix in ('.html', '.txt'))
+
+
+def collect_template_text():
+    characters = set()
+    for path in iter_template_files():
+        characters.update(path.read_text(encoding='utf-8', errors='ignore'))
+    return characters
+
+
+def collect_database_text(chunk_size=2000):
+    """
+    کاراکترهای همه فیلدهای متنی (CharField/TextField) و برچسب choices
+    """
+    characters = set()
+    for label in TEXT_APPS:
+        for model in apps.get_app_config(label).get_models():
+            fields = [
+                field.name for field in model._meta.concrete_fields
+                if isinstance(field, (models.CharField, models.TextField))
+            ]
+            for field in model._meta.concrete_fields:
+                for _, display in field.flatchoices or ():
+                    characters.update(str(display))
+            characters.update(str(model._meta.verbose_name))
+            characters.update(str(model._meta.verbose_name_plural))
+            if not fields:
+                continue
+            rows = model._default_manager.values_list(*fields).iterator(chunk_size=chunk_size)
+            for row in rows:
+                for value in row:
+                    if value:
+                        characters.update(value)
+    return characters
+
+
+def collect_characters(include_database=True):
+    characters = set(BASE_CHARACTERS)
+    characters.update(collect_template_text())
+    if include_database:
+        characters.update(collect_database_text())
+    # کاراکترهای کنترلی و خط جدید در فونت نیازی ندارند
+    return {char for char in characters if ord(char) >= 0x20}
+
+
+def unicode_range(codepoints):
+    """
+    تبدیل مجموعه codepoint ها به مقدار unicode-range فشرده
+
+    {0x41, 0x42, 0x43, 0x628} -> 'U+0041-0043, U+0628'
+    """
+    ranges = []
+    for code in sorted(codepoints):
+        if ranges and code == ranges[-1][1] + 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return ', '.join(
+        f'U+{start:04X}' if start == end else f'U+{start:04X}-{end:04X}'
+        for start, end in ranges
+    )
+
+
+def subset_font(source, output, characters):
+    """
+    ساختن WOFF2 شامل فقط glyph های لازم برای characters
+
+    همه feature های layout (اتصال حروف فارسی، kern، mark و ...) حفظ می شوند.
+    codepoint هایی که در فونت خروجی وجود دارند برگردانده می شوند
+    """
+    if font_subset is None:
+        raise RuntimeError('برای ساختن subset فونت ها fonttools را نصب کنید')
+
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.name_languages = ['*']
+    options.hinting = False
+    options.desubroutinize = True
+    options.notdef_outline = True
+
+    font = TTFont(source)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=[ord(char) for char in characters])
+    subsetter.subset(font)
+    codepoints = set(font.getBestCmap() or {})
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    font_subset.save_font(font, str(output), options)
+    return codepoints
+
+
+def render_css(entries):
+    """
+    ساختن @font-face ها برای فایل های subset
+    """
+    blocks = ['/* generated by `manage.py subset_fonts` - do not edit */']
+    for entry in entries:
+        url = posixpath.relpath(entry['path'], posixpath.dirname(OUTPUT_CSS))
+        blocks.append(
+            '@font-face {\n'
+            f"    font-family: '{entry['family']}';\n"
+            f"    src: url('{url}') format('woff2');\n"
+            f"    font-weight: {entry['weight']};\n"
+            f"    font-style: {entry['style']};\n"
+            '    font-display: swap;\n'
+            f"    unicode-range: {entry['unicode_range']};\n"
+            '}'
+        )
+    return '\n'.join(blocks) + '\n'
+
+
+def build_subsets(characters, preload=DEFAULT_PRELOAD, root=None):
+    """
+    ساختن subset همه @font-face های rtl.css همراه با CSS و manifest
+
+    خروجی: لیست face ها همراه با حجم فایل اصلی و subset
+    """
+    root = Path(root or static_dir())
+    css = (root / SOURCE_CSS).read_text(encoding='utf-8')
+
+    entries = []
+    for face in parse_font_faces(css):
+        source = root / face.source
+        if not source.exists():
+            continue
+        output = root / face.subset_path
+        codepoints = subset_font(source, output, characters)
+
+        # حجم همه فرمت های فونت اصلی (WOFF2, WOFF, SVG)
+        stem = source.with_suffix('')
+        original_total = sum(
+            path.stat().st_size for path in source.parent.glob(f'{stem.name}.*') if path.is_file()
+        )
+        entries.append({
+            'family': face.family,
+            'weight': face.weight,
+            'style': face.style,
+            'path': face.subset_path,
+            'source': face.source,
+            'unicode_range': unicode_range(codepoints),
+            'glyphs': len(codepoints),
+            'original_size': source.stat().st_size,
+            'original_total': original_total,
+            'size': output.stat().st_size,
+        })
+
+    (root / OUTPUT_CSS).write_text(render_css(entries), encoding='utf-8')
+
+    manifest = {
+        'css': OUTPUT_CSS,
+        'preload': [entry['path'] for entry in entries if posixpath.basename(entry['path']) in preload],
+        'faces': entries,
+    }
+    manifest_file = root / SUBSET_DIR / MANIFEST_NAME
+    manifest_file.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    return entries
+
+
+_manifest_memo = {}
+
+
+def load_manifest():
+    """
+    خواندن manifest ساخته شده (با بررسی زمان تغییر فایل) - اگر وجود نداشته باشد None
+    """
+    path = static_dir() / SUBSET_DIR / MANIFEST_NAME
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if _manifest_memo.get('mtime') != mtime:
+        try:
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+        except ValueError:
+            manifest = None
+        _manifest_memo.update(mtime=mtime, manifest=manifest)
+    return _manifest_memo['manifest']
@@ -0,0 +1,54 @@
+"""
+زبان های سایت (فارسی راست به چپ و انگلیسی چپ به راست)
+
+- فایل های ترجمه همه زبان های LANGUAGES یک بار هنگام شروع process
+  بارگذاری می شوند (warm_translations در wsgi.py و asgi.py) تا اولین درخواست
+  هر زبان در هر worker هزینه خواندن فایل های .mo را نپردازد
+- جهت صفحه و stylesheet مخصوص آن برای هر زبان یک بار محاسبه و در حافظه
+  نگه داشته می شود، پس context processor فقط یک جستجوی dict انجام می دهد
+"""
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils import translation
+from django.utils.translation import trans_real
+
+# stylesheet اضافه برای هر جهت
+DIRECTION_STYLESHEETS = {
+    'rtl': 'assets/styles/rtl.css',
+    'ltr': None,
+}
+
+# {زبان: {'LANGUAGE_DIRECTION': ..., 'direction_stylesheet': ...}}
+_language_assets = {}
+
+
+def get_language_assets(language=None):
+    """
+    جهت و آدرس stylesheet جهت برای زبان (پیش فرض: زبان فعال)
+    """
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    assets = _language_assets.get(language)
+    if assets is None:
+        try:
+            bidi = translation.get_language_info(language)['bidi']
+        except KeyError:
+            bidi = language.split('-')[0] in settings.LANGUAGES_BIDI
+        direction = 'rtl' if bidi else 'ltr'
+        stylesheet = DIRECTION_STYLESHEETS[direction]
+        assets = _language_assets[language] = {
+            'LANGUAGE_DIRECTION': direction,
+            'direction_stylesheet': static(stylesheet) if stylesheet else None,
+        }
+    return assets
+
+
+def warm_translations():
+    """
+    بارگذاری فایل های ترجمه کامپایل شده (.mo) همه زبان ها در حافظه process
+
+    قبل از fork شدن worker ها (gunicorn --preload) صدا زده شود تا حافظه
+    ترجمه ها بین worker ها مشترک باشد
+    """
+    for language, _ in settings.LANGUAGES:
+        trans_real.translation(language)
+        get_language_assets(language)
@@ -0,0 +1,258 @@
+"""
+ساختن نسخه های کوچک تر تصاویر آپلود شده (responsive images)
+
+برای هر تصویر چند عرض مختلف در فرمت های AVIF (اگر Pillow پشتیبانی کند)،
+WebP و JPEG (یا PNG برای تصاویر شفاف) ساخته می شود و اطلاعات آنها در
+یک manifest.json کنار فایل ها ذخیره می شود:
+
+media/derivatives/blog/posts/photo/640.webp
+media/derivatives/blog/posts/photo/manifest.json
+
+ساخت نسخه ها بعد از ذخیره مدل در یک thread pool پس زمینه انجام می شود
+تا درخواست ادمین منتظر پردازش تصویر نماند. تگ {% picture %} در
+templatetags/images.py از manifest برای ساختن srcset استفاده می کند
+"""
+import io
+import json
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import bump_version
+
+try:
+    # پشتیبانی AVIF در نسخه های قدیمی Pillow از طریق plugin
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+# فیلدهای تصویری که نسخه های کوچک تر برایشان ساخته می شود
+IMAGE_FIELDS = (
+    ('about.Profile', 'avatar'),
+    ('about.Service', 'icon'),
+    ('about.Testimonial', 'avatar'),
+    ('about.Client', 'logo'),
+    ('blog.Post', 'featured_image'),
+)
+
+# عرض نسخه ها (نسخه های بزرگ تر از تصویر اصلی ساخته نمی شوند)
+WIDTHS = (320, 640, 960, 1280, 1920)
+
+DERIVATIVES_DIR = 'derivatives'
+MANIFEST_NAME = 'manifest.json'
+CACHE_PREFIX = 'core:images'
+
+# تنظیمات فرمت ها: (فرمت Pillow, پسوند, گزینه های ذخیره)
+FORMATS = {
+    'avif': ('AVIF', 'avif', {'quality': 55}),
+    'webp': ('WEBP', 'webp', {'quality': 78, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', 'png', {'optimize': True}),
+}
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+}
+
+
+def get_formats(has_alpha):
+    """
+    فرمت های قابل ساخت - فرمت آخر fallback برای مرورگرهای قدیمی است
+    """
+    Image.init()
+    formats = [name for name in ('avif', 'webp') if FORMATS[name][0] in Image.SAVE]
+    formats.append('png' if has_alpha else 'jpeg')
+    return formats
+
+
+def derivative_dir(name):
+    return posixpath.join(DERIVATIVES_DIR, posixpath.splitext(name)[0])
+
+
+def manifest_path(name):
+    return posixpath.join(derivative_dir(name), MANIFEST_NAME)
+
+
+def _cache_key(name):
+    return f'{CACHE_PREFIX}:{name}'
+
+
+def generate_variants(name, storage=default_storage):
+    """
+    ساختن همه نسخه های یک تصویر و ذخیره manifest
+
+    خروجی manifest:
+    {'width': 1600, 'height': 900, 'sources': {'webp': [[320, 'derivatives/.../320.webp'], ...]}}
+    """
+    with storage.open(name, 'rb') as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    widths = [width for width in WIDTHS if width < image.width] + [image.width]
+    directory = derivative_dir(name)
+    sources = {}
+
+    for format_name in get_formats(has_alpha):
+        pillow_format, extension, options = FORMATS[format_name]
+        sources[format_name] = []
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, pillow_format, **options)
+
+            path = posixpath.join(directory, f'{width}.{extension}')
+            if storage.exists(path):
+                storage.delete(path)
+            storage.save(path, ContentFile(buffer.getvalue()))
+            sources[format_name].append([width, path])
+
+    manifest = {'width': image.width, 'height': image.height, 'sources': sources}
+    path = manifest_path(name)
+    if storage.exists(path):
+        storage.delete(path)
+    storage.save(path, ContentFile(json.dumps(manifest).encode()))
+    cache.set(_cache_key(name), manifest, timeout=None)
+    return manifest
+
+
+def get_variants(fieldfile, storage=default_storage):
+    """
+    خواندن manifest یک تصویر (از کش) - اگر هنوز ساخته نشده None
+    """
+    name = getattr(fieldfile, 'name', fieldfile)
+    if not name:
+        return None
+    manifest = cache.get(_cache_key(name))
+    if manifest is None:
+        try:
+            with storage.open(manifest_path(name), 'rb') as file:
+                manifest = json.loads(file.read())
+            cache.set(_cache_key(name), manifest, timeout=None)
+        except (OSError, ValueError):
+            # هنوز ساخته نشده - برای مدت کوتاهی به خاطر می سپاریم
+            cache.set(_cache_key(name), False, timeout=60)
+            return None
+    return manifest or None
+
+
+def variant_url(fieldfile, width, storage=default_storage):
+    """
+    آدرس کوچک ترین نسخه ای که عرضش حداقل width است (یا آدرس تصویر اصلی)
+    """
+    manifest = get_variants(fieldfile, storage)
+    if not manifest:
+        return fieldfile.url if fieldfile else ''
+    # فرمت اول بهترین فرمت قابل ساخت است
+    for candidate_width, path in next(iter(manifest['sources'].values())):
+        if candidate_width >= width:
+            return storage.url(path)
+    return storage.url(path)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2),
+                    thread_name_prefix='image-derivatives',
+                )
+    return _executor
+
+
+def _generate_in_background(name):
+    try:
+        generate_variants(name)
+        invalidate_image_owners(name)
+    except Exception:
+        logger.exception(f'خطا در ساخت نسخه های تصویر {name}')
+    finally:
+        connections.close_all()
+
+
+def invalidate_image_owners(name):
+    """
+    باطل کردن کش مدل هایی که این تصویر را دارند
+
+    قسمت های کش شده template (و ETag صفحات) تا قبل از ساخته شدن نسخه ها
+    فقط تصویر اصلی را دارند و باید دوباره ساخته شوند تا srcset اضافه شود.
+    updated_at رکوردها هم عوض می شود تا ETag صفحات و کش worker های دیگر
+    (conditional.sync_cache_versions) هم تغییر را ببینند، حتی وقتی این تابع
+    در process دیگری مثل generate_image_variants اجرا شود
+    """
+    for label, field_name in IMAGE_FIELDS:
+        model = apps.get_model(label)
+        if model._default_manager.filter(**{field_name: name}).update(updated_at=timezone.now()):
+            bump_version(model)
+
+
+def schedule_variants(name):
+    """
+    ساخت نسخه ها بعد از commit تراکنش در thread pool پس زمینه
+    """
+    transaction.on_commit(lambda: get_executor().submit(_generate_in_background, name))
+
+
+def _make_receiver(field_names):
+    def receiver(sender, instance, **kwargs):
+        for field_name in field_names:
+            fieldfile = getattr(instance, field_name)
+            if fieldfile and get_variants(fieldfile) is None:
+                schedule_variants(fieldfile.name)
+    return receiver
+
+
+def register_image_fields():
+    """
+    اتصال signal برای ساخت خودکار نسخه ها (در CoreConfig.ready)
+    """
+    fields = {}
+    for label, field_name in IMAGE_FIELDS:
+        fields.setdefault(apps.get_model(label), []).append(field_name)
+    for model, field_names in fields.items():
+        post_save.connect(
+            _make_receiver(field_names),
+            sender=model,
+            weak=False,
+            dispatch_uid=f'core.images:{model._meta.label_lower}',
+        )
+
+
+def iter_image_names():
+    """
+    نام همه تصاویر ثبت شده در IMAGE_FIELDS (برای دستور backfill)
+    """
+    for label, field_name in IMAGE_FIELDS:
+        model = apps.get_model(label)
+        names = (
+            model._default_manager.exclude(**{field_name: ''})
+            .values_list(field_name, flat=True)
+            .distinct()
+            .iterator()
+        )
+        yield from names
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.core.ratelimit import CacheBackend, LocalBackend, RateLimiter, ratelimit
+
+
+class Command(BaseCommand):
+    """
+    سنجش هزینه rate limiter برای هر درخواست
+
+    برای هر الگوریتم و backend دو عدد گزارش می شود:
+    - hit: فقط بررسی محدودیت برای یک کلید
+    - view: کل decorator روی یک view ساده (استخراج IP و ایمیل از درخواست
+      و بررسی دو کلید) منهای زمان خود view
+
+    درخواست ها از تعداد زیادی IP مختلف ارسال می شوند تا حذف LRU هم سنجیده شود.
+    اگر هزینه backend محلی بیشتر از --budget میکروثانیه باشد دستور خطا می دهد
+
+    استفاده:
+    python manage.py benchmark_ratelimit
+    python manage.py benchmark_ratelimit --requests 200000 --budget 20
+    """
+    help = 'سنجش سرعت الگوریتم ها و backend های rate limit'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000, help='تعداد درخواست ها')
+        parser.add_argument('--clients', type=int, default=50000, help='تعداد IP های مختلف')
+        parser.add_argument('--budget', type=float, default=30.0, help='حداکثر هزینه مجاز (میکروثانیه)')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        clients = options['clients']
+        factory = RequestFactory()
+        requests = [
+            factory.post(
+                '/contact/send-message/',
+                {'email': f'user{index}@example.com', 'message': 'سلام'},
+                REMOTE_ADDR=f'10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}',
+            )
+            for index in range(min(total, clients))
+        ]
+        # فرم درخواست ها از قبل parse می شود تا فقط هزینه limiter سنجیده شود
+        for request in requests:
+            request.POST
+
+        def view(request):
+            return HttpResponse()
+
+        baseline = self.measure(lambda index: view(requests[index % len(requests)]), total)
+
+        failures = []
+        for algorithm in RateLimiter.ALGORITHMS:
+            for backend in (LocalBackend(max_keys=clients // 2), CacheBackend(key_prefix='rl-benchmark')):
+                name = f'{algorithm}/{"local" if backend.is_local else "cache"}'
+                limiter = RateLimiter('1000/m', algorithm, backend)
+                hit = self.measure(lambda index: limiter.hit(f'ip:{index % clients}'), total)
+
+                decorated = ratelimit('1000/m', key=('ip', 'post:email'), algorithm=algorithm, backend=backend)(view)
+                full = self.measure(lambda index: decorated(requests[index % len(requests)]), total)
+                overhead = max(0.0, full - baseline)
+
+                self.stdout.write(f'{name:<28} hit: {hit:7.2f}µs   view: {overhead:7.2f}µs')
+                if backend.is_local and overhead > options['budget']:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f'هزینه بیشتر از {options["budget"]}µs: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'هزینه backend محلی کمتر از {options["budget"]}µs در هر درخواست'))
+
+    @staticmethod
+    def measure(function, count):
+        """
+        میانگین زمان هر فراخوانی (میکروثانیه)
+        """
+        started = time.perf_counter()
+        for index in range(count):
+            function(index)
+        return (time.perf_counter() - started) / count * 1e6
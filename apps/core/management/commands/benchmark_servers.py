@@ -0,0 +1,182 @@
+import asyncio
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# env هر حالت اجرا (gunicorn.conf.py و settings.ASYNC_VIEWS)
+SERVERS = {
+    'wsgi': {'GUNICORN_ASGI': 'False', 'ASYNC_VIEWS': 'False'},
+    'asgi': {'GUNICORN_ASGI': 'True', 'ASYNC_VIEWS': 'True'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def read_response(reader):
+    """
+    خواندن یک پاسخ HTTP/1.1 کامل (Content-Length یا chunked) - status برگردانده می شود
+    """
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    return status, headers.get('connection') == 'close'
+
+
+async def client(port, request, deadline, latencies, errors):
+    """
+    یک اتصال keep-alive که تا deadline پشت سر هم درخواست می فرستد
+    """
+    connection = None
+    while time.monotonic() < deadline:
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection('127.0.0.1', port)
+            reader, writer = connection
+            started = time.perf_counter()
+            writer.write(request)
+            status, close = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+            if close:
+                writer.close()
+                connection = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def load(port, path, concurrency, seconds):
+    request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept-Language: fa\r\n\r\n'.encode()
+    latencies, errors = [], []
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(client(port, request, deadline, latencies, errors) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    """
+    مقایسه throughput و تاخیر مسیر WSGI (gthread) و ASGI (uvicorn و view های async)
+
+    هر حالت با gunicorn.conf.py و تنظیمات فعلی پروژه (همان دیتابیس و کش)
+    در یک process جدا اجرا می شود و برای هر مسیر تعداد مشخصی اتصال
+    keep-alive همزمان به مدت --seconds درخواست می فرستند. درخواست ها ETag
+    ندارند، پس هر پاسخ کامل ساخته می شود
+
+    مولد بار یک process پایتون است؛ اگر CPU این process پر شود نتیجه محدود
+    به خود آن است، پس برای سرورهای بزرگ تر از wrk یا ابزار مشابه استفاده کنید
+
+    استفاده:
+    python manage.py benchmark_servers
+    python manage.py benchmark_servers / /blog/ --concurrency 64 --seconds 10 --workers 4
+    """
+    help = 'مقایسه بار WSGI و ASGI روی صفحات درباره من و وبلاگ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/', '/blog/'], help='مسیرها (پیش فرض: / و /blog/)')
+        parser.add_argument('--server', action='append', choices=tuple(SERVERS), help='حالت اجرا (پیش فرض: همه)')
+        parser.add_argument('--workers', type=int, default=2, help='تعداد worker های gunicorn')
+        parser.add_argument('--concurrency', type=int, default=32, help='تعداد اتصال همزمان')
+        parser.add_argument('--seconds', type=float, default=5.0, help='مدت بار برای هر مسیر')
+
+    def handle(self, *args, **options):
+        servers = options['server'] or list(SERVERS)
+        for module in ['gunicorn'] + (['uvicorn'] if 'asgi' in servers else []):
+            if importlib.util.find_spec(module) is None:
+                raise CommandError(f'{module} نصب نیست (requirements.txt)')
+
+        self.stdout.write(
+            f'{"server":<8}{"path":<24}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"errors":>8}'
+        )
+        for name in servers:
+            port = free_port()
+            process = self.start(name, port, options['workers'])
+            try:
+                self.wait_ready(process, port)
+                for path in options['paths']:
+                    # گرم کردن کش ها و template های هر worker
+                    asyncio.run(load(port, path, options['workers'] * 2, 0.5))
+                    latencies, errors = asyncio.run(
+                        load(port, path, options['concurrency'], options['seconds'])
+                    )
+                    self.report(name, path, latencies, errors, options['seconds'])
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+                process.log.close()
+
+    @staticmethod
+    def start(name, port, workers):
+        env = {**os.environ, **SERVERS[name]}
+        env.update({
+            'GUNICORN_BIND': f'127.0.0.1:{port}',
+            'GUNICORN_WORKERS': str(workers),
+            # بدون ساخت دوباره worker ها وسط اندازه گیری
+            'GUNICORN_MAX_REQUESTS': '0',
+        })
+        # لاگ در فایل موقت تا pipe پر نشود و gunicorn را متوقف نکند
+        log = tempfile.TemporaryFile()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn'],
+            cwd=settings.BASE_DIR, env=env, stdout=log, stderr=log,
+        )
+        process.log = log
+        return process
+
+    @staticmethod
+    def wait_ready(process, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                process.log.seek(0)
+                raise CommandError(f'gunicorn اجرا نشد:\n{process.log.read().decode()}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'gunicorn بعد از {timeout} ثانیه آماده نشد')
+
+    def report(self, name, path, latencies, errors, seconds):
+        self.stdout.write(
+            f'{name:<8}{path:<24}{len(latencies) / seconds:>9.0f}'
+            f'{percentile(latencies, 0.5) * 1000:>9.1f}'
+            f'{percentile(latencies, 0.95) * 1000:>9.1f}'
+            f'{percentile(latencies, 0.99) * 1000:>9.1f}'
+            f'{len(errors):>8}'
+        )
+        if errors:
+            self.stdout.write(f'         {sorted(set(map(str, errors)))}')
@@ -0,0 +1,146 @@
+import multiprocessing
+import random
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+
+from apps.blog.models import Category, Post
+from apps.contact.models import ContactMessage
+
+# تنظیمات مقایسه شده: رفتار پیش فرض SQLite و تنظیمات apps/core/backends/sqlite3
+PROFILES = {
+    'default': {'transaction_mode': 'DEFERRED', 'pragmas': {}},
+    'tuned': None,  # همان OPTIONS تنظیمات پروژه
+}
+
+
+def worker(path, options, seconds, seed, results):
+    """
+    ترکیب درخواست ها در یک process: خواندن، افزایش شمارنده بازدید و
+    تراکنش خواندن و سپس نوشتن (مثل ذخیره پیام یا ذخیره در ادمین)
+    """
+    connection = connections['default']
+    connection.settings_dict['NAME'] = path
+    connection.settings_dict['OPTIONS'] = options
+    rng = random.Random(seed)
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    counts = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        roll = rng.random()
+        try:
+            if roll < 0.6:
+                operation = 'read'
+                list(Post.objects.filter(is_active=True).values_list('title', 'views_count')[:10])
+            elif roll < 0.8:
+                operation = 'counter'
+                Post.objects.filter(pk=rng.choice(post_ids)).update(views_count=F('views_count') + 1)
+            else:
+                operation = 'transaction'
+                with transaction.atomic():
+                    unread = ContactMessage.objects.filter(status='new').count()
+                    ContactMessage.objects.create(
+                        name='load test', email='load@example.com',
+                        subject=f'#{unread}', message='load test',
+                    )
+            counts[operation] += 1
+        except OperationalError as e:
+            counts[f'error: {e}'] += 1
+    connections.close_all()
+    results.put(dict(counts))
+
+
+class Command(BaseCommand):
+    """
+    مقایسه throughput تنظیمات پیش فرض SQLite و backend تنظیم شده با چند process
+
+    برای هر پروفایل یک فایل دیتابیس موقت ساخته می شود و چند process همزمان
+    (مثل worker های گونیکورن) ترکیبی از خواندن، UPDATE شمارنده و تراکنش
+    خواندن-نوشتن اجرا می کنند. تعداد عملیات موفق در ثانیه و تعداد خطاهای
+    database is locked گزارش می شود
+
+    استفاده:
+    python manage.py benchmark_sqlite
+    python manage.py benchmark_sqlite --processes 8 --seconds 10
+    """
+    help = 'مقایسه throughput حالت پیش فرض SQLite و backend تنظیم شده'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help='تعداد process همزمان')
+        parser.add_argument('--seconds', type=float, default=5.0, help='مدت هر اجرا')
+        parser.add_argument('--posts', type=int, default=200, help='تعداد مقالات اولیه')
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        if connection.vendor != 'sqlite':
+            raise CommandError('این دستور فقط برای دیتابیس SQLite است')
+        original = dict(connection.settings_dict)
+        context = multiprocessing.get_context('fork')
+
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for name, profile in PROFILES.items():
+                    sqlite_options = dict(original['OPTIONS'])
+                    if profile is not None:
+                        sqlite_options.update(profile)
+                    path = str(Path(directory) / f'{name}.sqlite3')
+                    self.prepare(connection, path, sqlite_options, options['posts'])
+
+                    results = context.Queue()
+                    processes = [
+                        context.Process(
+                            target=worker,
+                            args=(path, sqlite_options, options['seconds'], seed, results),
+                        )
+                        for seed in range(options['processes'])
+                    ]
+                    for process in processes:
+                        process.start()
+                    totals = Counter()
+                    for _ in processes:
+                        totals.update(results.get())
+                    for process in processes:
+                        process.join()
+                    self.report(name, totals, options['seconds'])
+        finally:
+            connection.close()
+            connection.settings_dict.clear()
+            connection.settings_dict.update(original)
+
+    def prepare(self, connection, path, sqlite_options, posts):
+        """
+        ساخت جداول و داده اولیه در فایل موقت (قبل از fork)
+        """
+        connection.close()
+        connection.settings_dict['NAME'] = path
+        connection.settings_dict['OPTIONS'] = sqlite_options
+        call_command('migrate', run_syncdb=True, verbosity=0)
+        # bulk_create تا signal های مقالات (feed، جستجو و ...) اجرا نشوند
+        category = Category.objects.bulk_create([Category(name='load test', slug='load-test')])[0]
+        Post.objects.bulk_create([
+            Post(
+                title=f'load test {index}', slug=f'load-test-{index}',
+                excerpt='load test', content='load test', category=category,
+            )
+            for index in range(posts)
+        ])
+        # اتصال والد نباید بین process ها مشترک شود
+        connections.close_all()
+
+    def report(self, name, totals, seconds):
+        errors = sum(count for key, count in totals.items() if key.startswith('error'))
+        succeeded = sum(totals.values()) - errors
+        details = ', '.join(f'{key}: {totals[key]}' for key in ('read', 'counter', 'transaction'))
+        self.stdout.write(
+            f'{name:<8} {succeeded / seconds:9.0f} عملیات در ثانیه   خطا: {errors:<6} ({details})'
+        )
+        for key, count in totals.items():
+            if key.startswith('error'):
+                self.stdout.write(f'         {count}x {key}')
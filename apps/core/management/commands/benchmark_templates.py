@@ -0,0 +1,119 @@
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.http import Http404
+from django.template import engines
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.views.generic.detail import SingleObjectMixin
+from django.views.generic.list import MultipleObjectMixin
+
+from apps.about.views import AboutView
+from apps.blog.models import Post
+from apps.blog.views import PostDetailView, PostListView
+from apps.contact.views import ContactView
+from apps.core.cache import bump_version, get_registered_models
+
+# view هر template و تابعی که kwargs آدرس آن را می سازد. context واقعی مثل
+# متد get همان view ساخته می شود (بدون ثبت بازدید و شرط های ETag)
+# about/resume.html و about/portfolio.html قسمت پویا و view ندارند و مثل
+# بقیه فقط با context processor ها render می شوند
+CONTEXT_VIEWS = {
+    'about/index.html': (AboutView, dict),
+    'blog/blog.html': (PostListView, dict),
+    # بدون مقاله فعال slug خالی است و get_object خطای 404 می دهد
+    'blog/single-post.html': (
+        PostDetailView,
+        lambda: {'slug': Post.active.order_by('-published_at').values_list('slug', flat=True).first() or ''},
+    ),
+    'contact/contact.html': (ContactView, dict),
+}
+
+# template هایی که فقط داخل template دیگری include می شوند
+PARTIAL_TEMPLATES = {'blog/comment.html'}
+
+
+class Command(BaseCommand):
+    """
+    سنجش زمان parse و render هر template
+
+    برای هر template سه عدد گزارش می شود (میلی ثانیه):
+    - parse: کامپایل متن template بدون loader کش شده
+    - cold: render بعد از عوض شدن نسخه همه مدل ها (قسمت های cachemodels دوباره ساخته می شوند)
+    - warm: render با template کش شده و قسمت های کش شده
+
+    استفاده:
+    python manage.py benchmark_templates
+    python manage.py benchmark_templates blog/single-post.html --iterations 500
+    """
+    help = 'سنجش زمان parse و render template ها'
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*', help='نام template ها (پیش فرض: همه)')
+        parser.add_argument('--iterations', type=int, default=100, help='تعداد تکرار هر اندازه گیری')
+
+    def handle(self, *args, **options):
+        engine = engines['django']
+        iterations = options['iterations']
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+
+        self.stdout.write(f'{"template":<28}{"parse":>10}{"cold":>10}{"warm":>10}')
+        for name in options['templates'] or self.find_templates(engine):
+            template = get_template(name)
+            source = template.template.source
+            try:
+                context = self.get_context(name, request)
+            except Http404:
+                self.stdout.write(self.style.WARNING(f'{name:<28}داده ای برای ساختن context نیست'))
+                continue
+
+            parse = self.measure(lambda: engine.from_string(source), iterations)
+            cold = self.measure(lambda: template.render(context, request), iterations, before=self.invalidate)
+            warm = self.measure(lambda: template.render(context, request), iterations)
+            self.stdout.write(f'{name:<28}{parse:>10.2f}{cold:>10.2f}{warm:>10.2f}')
+
+    @staticmethod
+    def find_templates(engine):
+        names = []
+        for directory in engine.template_dirs:
+            root = Path(directory)
+            names.extend(str(path.relative_to(root)) for path in sorted(root.rglob('*.html')))
+        return [name for name in names if name not in PARTIAL_TEMPLATES]
+
+    @staticmethod
+    def get_context(name, request):
+        """
+        context ای که view همین template برای render می سازد
+        """
+        if name not in CONTEXT_VIEWS:
+            return {}
+        view_class, get_kwargs = CONTEXT_VIEWS[name]
+        view = view_class()
+        view.setup(request, **get_kwargs())
+        if isinstance(view, SingleObjectMixin):
+            view.object = view.get_object()
+        if isinstance(view, MultipleObjectMixin):
+            view.object_list = view.get_queryset()
+        return view.get_context_data()
+
+    @staticmethod
+    def invalidate():
+        for model in get_registered_models():
+            bump_version(model)
+
+    @staticmethod
+    def measure(function, count, before=None):
+        """
+        میانگین زمان هر فراخوانی (میلی ثانیه) - زمان before حساب نمی شود
+        """
+        total = 0.0
+        for _ in range(count):
+            if before is not None:
+                before()
+            started = time.perf_counter()
+            function()
+            total += time.perf_counter() - started
+        return total / count * 1000
@@ -0,0 +1,96 @@
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# اجرا داخل process جدید با پروفایل مورد نظر: اتصال دیتابیس، کش و یک درخواست
+PROBE = '''
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+
+with connection.cursor() as cursor:
+    if connection.vendor == 'sqlite':
+        cursor.execute('PRAGMA journal_mode')
+        print('journal_mode', cursor.fetchone()[0])
+    else:
+        cursor.execute('SELECT 1')
+cache.set('boot-settings', 1)
+assert cache.get('boot-settings') == 1, 'کش کار نمی کند'
+response = Client().get('/', secure=True, HTTP_HOST=settings.ALLOWED_HOSTS[0])
+print('DEBUG', settings.DEBUG, 'cache', settings.CACHES['default']['BACKEND'])
+print('CONN_MAX_AGE', connection.settings_dict['CONN_MAX_AGE'], 'status', response.status_code)
+assert response.status_code == 200, response.status_code
+'''
+
+
+class Command(BaseCommand):
+    """
+    راه اندازی هر پروفایل تنظیمات (dev و prod) در یک process جداگانه
+
+    به جای سرویس های واقعی از جایگزین محلی استفاده می شود: یک فایل SQLite
+    موقت به جای دیتابیس و کش حافظه به جای Redis (مگر اینکه --redis-url داده
+    شود). برای هر پروفایل check (و check --deploy برای prod)، migrate و یک
+    درخواست به صفحه اصلی اجرا می شود
+
+    استفاده:
+    python manage.py boot_settings
+    python manage.py boot_settings --profile prod --redis-url redis://127.0.0.1:6379/15
+    """
+    help = 'بررسی بالا آمدن پروفایل های تنظیمات با سرویس های جایگزین محلی'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', choices=('dev', 'prod'), help='پروفایل (پیش فرض: همه)')
+        parser.add_argument('--redis-url', default='', help='Redis واقعی به جای کش حافظه')
+
+    def handle(self, *args, **options):
+        failures = []
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in options['profile'] or ('dev', 'prod'):
+                self.stdout.write(self.style.MIGRATE_HEADING(profile))
+                env = self.get_env(profile, Path(directory), options['redis_url'])
+                commands = [
+                    ['check', '--deploy', '--fail-level', 'ERROR'] if profile == 'prod' else ['check'],
+                    ['migrate', '--run-syncdb', '-v', '0'],
+                    ['shell', '-c', PROBE],
+                ]
+                for command in commands:
+                    result = subprocess.run(
+                        [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), *command],
+                        env=env, capture_output=True, text=True,
+                    )
+                    output = (result.stdout + result.stderr).strip()
+                    if output:
+                        self.stdout.write(output)
+                    if result.returncode:
+                        failures.append(f'{profile}: {command[0]}')
+                        break
+
+        if failures:
+            raise CommandError('خطا در ' + '، '.join(failures))
+        self.stdout.write(self.style.SUCCESS('همه پروفایل ها بالا آمدند'))
+
+    @staticmethod
+    def get_env(profile, directory, redis_url):
+        env = {
+            key: value for key, value in os.environ.items()
+            if not key.startswith(('DJANGO_', 'DB_')) and key not in ('REDIS_URL', 'DEBUG', 'ALLOWED_HOSTS')
+        }
+        env.update({
+            'DJANGO_SETTINGS_MODULE': 'cv_django.settings',
+            'DJANGO_ENV': profile,
+            'DB_ENGINE': 'sqlite',
+            'DB_NAME': str(directory / f'{profile}.sqlite3'),
+            'REDIS_URL': redis_url,
+            'METRICS_ROOT': str(directory / f'metrics-{profile}'),
+            'ALLOWED_HOSTS': 'testserver',
+        })
+        if profile == 'prod':
+            env['SECRET_KEY'] = secrets.token_urlsafe(50)
+        return env
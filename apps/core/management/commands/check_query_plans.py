@@ -0,0 +1,85 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.about.models import Client, Service, Testimonial
+from apps.blog.comments import get_tree_queryset
+from apps.blog.models import Category, Comment, Post, Tag
+from apps.blog.views import PostListMixin
+from apps.core.pagination import KeysetPaginator
+
+
+def get_key_queries():
+    """
+    query های پرتکرار سایت که باید از index استفاده کنند
+    """
+    posts = PostListMixin().get_queryset().order_by(*PostListMixin.keyset_ordering)
+    # صفحه دوم لیست با همان شرط seek که view می سازد
+    paginator = KeysetPaginator(posts, PostListMixin.paginate_by, PostListMixin.keyset_ordering)
+    cursor = paginator.encode_cursor(Post(id=1, published_at=timezone.now()))
+    return {
+        'services': Service.active.all(),
+        'testimonials': Testimonial.active.all(),
+        'clients': Client.active.all(),
+        'categories': Category.active.all(),
+        'tags': Tag.active.all(),
+        'post_list': posts[:11],
+        'post_list_cursor': paginator.get_page_queryset(after=cursor),
+        'post_list_before': paginator.get_page_queryset(before=cursor),
+        'category_posts': posts.filter(category_id=1)[:11],
+        'post_comments': Comment.active.filter(post_id=1),
+        'comment_tree': get_tree_queryset(Post(id=1)),
+    }
+
+
+# الگوی full table scan در خروجی EXPLAIN هر دیتابیس
+FULL_SCAN_PATTERNS = {
+    # SQLite: "SCAN blog_post" بدون "USING INDEX"
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING)(?:\s|$)'),
+    # PostgreSQL: "Seq Scan on blog_post"
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+class Command(BaseCommand):
+    """
+    اجرای EXPLAIN روی query های اصلی و بررسی استفاده از index
+
+    اگر هر کدام از query ها به full table scan برسد، دستور با خطا تمام می شود
+    (مناسب برای اجرا در CI بعد از migrate)
+
+    استفاده:
+    python manage.py check_query_plans
+    python manage.py check_query_plans --verbose
+    """
+    help = 'بررسی query plan های اصلی و گزارش full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose', action='store_true', help='نمایش کامل خروجی EXPLAIN')
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'دیتابیس {connection.vendor} پشتیبانی نمی شود')
+
+        failures = []
+        for name, queryset in get_key_queries().items():
+            plan = queryset.explain()
+            if options['verbose']:
+                self.stdout.write(f'--- {name}\n{plan}')
+
+            tables = [
+                table for table in pattern.findall(plan)
+                # فقط جدول اصلی هر query بررسی می شود (جدول های JOIN شده با کلید اصلی خوانده می شوند)
+                if table == queryset.model._meta.db_table
+            ]
+            if tables:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'✗ {name}: full scan روی {", ".join(tables)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {name}'))
+
+        if failures:
+            raise CommandError(f'{len(failures)} query از index استفاده نمی کند: {", ".join(failures)}')
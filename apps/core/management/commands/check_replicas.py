@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# اجرا داخل process جدید با یک primary و دو replica فایل SQLite (و یک replica خراب)
+PROBE = '''
+import contextvars
+import sqlite3
+import time
+from collections import Counter
+
+from django.core.management import call_command
+from django.db import connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.about.models import Service
+from apps.blog.models import Category, Post
+from apps.contact.models import ContactMessage
+from apps.core.cache import _invalidate, get_versions
+from apps.core.routers import ReplicaRouterMiddleware, get_config, is_pinned
+
+replica_router = router.routers[0]
+config = get_config()
+
+
+def isolated(function):
+    """ اجرا در context جدا تا pin شدن به primary به بقیه بررسی ها نرسد """
+    return contextvars.copy_context().run(function)
+
+
+def check(name, condition):
+    print(('OK  ' if condition else 'FAIL'), name)
+    assert condition, name
+
+
+# primary و کپی آن در replica ها (replication اولیه)
+isolated(lambda: call_command('migrate', run_syncdb=True, verbosity=0))
+def seed():
+    category = Category.objects.bulk_create([Category(name='replica', slug='replica')])[0]
+    Post.objects.bulk_create([
+        Post(title=f'post {index}', slug=f'post-{index}', excerpt='-', content='-', category=category)
+        for index in range(10)
+    ])
+isolated(seed)
+connections.close_all()
+primary = sqlite3.connect(connections['default'].settings_dict['NAME'])
+for alias in ('replica1', 'replica2'):
+    with sqlite3.connect(connections[alias].settings_dict['NAME']) as target:
+        primary.backup(target)
+primary.close()
+
+# تغییری که هنوز به replica ها نرسیده (تاخیر replication)
+isolated(lambda: Post.objects.bulk_create([
+    Post(title='lagging', slug='lagging', excerpt='-', content='-', category=Category.objects.get())
+]))
+
+check('خواندن از replica', Post.objects.all().db.startswith('replica') and Post.objects.count() == 10)
+check('ContactMessage از primary', ContactMessage.objects.all().db == 'default')
+check('نوشتن روی primary', isolated(lambda: router.db_for_write(ContactMessage)) == 'default')
+
+usage = Counter(isolated(lambda: router.db_for_read(Post)) for _ in range(4000))
+print('   ', dict(usage))
+check('replica خراب کنار گذاشته می شود', 'replica3' not in usage and 'default' not in usage)
+check('انتخاب با وزن 3:1', 2.5 < usage['replica1'] / usage['replica2'] < 3.5)
+
+def atomic_read():
+    with transaction.atomic():
+        return Post.objects.count()
+check('خواندن داخل تراکنش از primary', isolated(atomic_read) == 11)
+
+def read_after_write():
+    Category.objects.filter(slug='replica').update(name='replica')
+    return Post.objects.count()
+check('خواندن بعد از نوشتن از primary', isolated(read_after_write) == 11)
+check('pin به context بیرونی نمی رسد', not is_pinned())
+
+# middleware: کوکی بعد از نوشتن در POST و خواندن از primary با کوکی
+factory = RequestFactory()
+def write_view(request):
+    Category.objects.filter(slug='replica').update(name='replica')
+    return HttpResponse()
+def read_view(request):
+    return HttpResponse(str(Post.objects.count()))
+response = ReplicaRouterMiddleware(write_view)(factory.post('/'))
+check('کوکی pin بعد از POST', config['PIN_COOKIE'] in response.cookies)
+response = ReplicaRouterMiddleware(write_view)(factory.get('/'))
+check('بدون کوکی برای نوشتن جانبی GET', config['PIN_COOKIE'] not in response.cookies)
+request = factory.get('/')
+request.COOKIES[config['PIN_COOKIE']] = '1'
+check('با کوکی از primary', ReplicaRouterMiddleware(read_view)(request).content == b'11')
+check('بدون کوکی از replica', ReplicaRouterMiddleware(read_view)(factory.get('/')).content == b'10')
+check('pin بعد از درخواست پاک می شود', not is_pinned())
+
+# نسخه کش بعد از حداکثر تاخیر replication دوباره عوض می شود
+before = get_versions(Service)
+isolated(lambda: _invalidate(Service))
+after_commit = get_versions(Service)
+time.sleep(config['PIN_SECONDS'] + 0.5)
+check('باطل سازی دوباره کش بعد از تاخیر', before != after_commit != get_versions(Service))
+
+# همه replica ها خراب: خواندن از primary
+for alias in ('replica1', 'replica2'):
+    connections[alias].close()
+    connections[alias].settings_dict['NAME'] = connections['replica3'].settings_dict['NAME']
+replica_router.health.reset()
+check('بدون replica سالم از primary', Post.objects.all().db == 'default' and Post.objects.count() == 11)
+'''
+
+
+class Command(BaseCommand):
+    """
+    بررسی router replica ها با فایل های SQLite محلی
+
+    در یک process جدید یک primary، دو replica (کپی primary با وزن 3 و 1)
+    و یک replica خراب تنظیم می شود. بعد از کپی، یک مقاله فقط در primary
+    نوشته می شود تا تاخیر replication شبیه سازی شود و سپس خواندن از replica،
+    انتخاب با وزن، کنار گذاشتن replica خراب، pin شدن به primary بعد از
+    نوشتن (و با کوکی middleware) و ماندن ContactMessage روی primary بررسی می شود
+
+    استفاده:
+    python manage.py check_replicas
+    """
+    help = 'بررسی router replica ها با یک primary و replica های SQLite'
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            env = {key: value for key, value in os.environ.items() if not key.startswith(('DJANGO_', 'DB_'))}
+            env.update({
+                'DJANGO_SETTINGS_MODULE': 'cv_django.settings',
+                'DJANGO_ENV': 'dev',
+                'DB_ENGINE': 'sqlite',
+                'DB_NAME': str(directory / 'primary.sqlite3'),
+                'DB_REPLICAS': ','.join([
+                    f'{directory / "replica1.sqlite3"}@3',
+                    f'{directory / "replica2.sqlite3"}@1',
+                    f'{directory / "missing" / "replica3.sqlite3"}@1',
+                ]),
+                'DB_REPLICA_PIN_SECONDS': '1',
+                'METRICS_ROOT': str(directory / 'metrics'),
+            })
+            result = subprocess.run(
+                [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), 'shell', '-c', PROBE],
+                env=env, capture_output=True, text=True,
+            )
+        output = (result.stdout + result.stderr).strip()
+        if output:
+            self.stdout.write(output)
+        if result.returncode:
+            raise CommandError('router replica ها درست کار نمی کند')
+        self.stdout.write(self.style.SUCCESS('router replica ها درست کار می کند'))
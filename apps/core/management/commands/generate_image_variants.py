@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.images import generate_variants, get_variants, invalidate_image_owners, iter_image_names
+
+
+class Command(BaseCommand):
+    """
+    ساختن نسخه های responsive برای تصاویر موجود
+
+    تصاویری که قبلا نسخه هایشان ساخته شده رد می شوند (مگر با --force)
+    بعد از ساخت نسخه های هر تصویر کش مدل هایی که آن را دارند باطل می شود
+    تا srcset در صفحات اضافه شود
+
+    استفاده:
+    python manage.py generate_image_variants
+    python manage.py generate_image_variants --force
+    """
+    help = 'ساختن نسخه های کوچک تر (WebP/AVIF/JPEG) برای تصاویر موجود'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='ساختن دوباره همه نسخه ها')
+
+    def handle(self, *args, **options):
+        generated = skipped = failed = 0
+        for name in iter_image_names():
+            if not options['force'] and get_variants(name):
+                skipped += 1
+                continue
+            try:
+                manifest = generate_variants(name)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f'✗ {name}: {e}'))
+                continue
+            invalidate_image_owners(name)
+            generated += 1
+            formats = ', '.join(manifest['sources'])
+            self.stdout.write(f'✓ {name} ({manifest["width"]}x{manifest["height"]}: {formats})')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{generated} تصویر پردازش شد، {skipped} تصویر از قبل آماده بود، {failed} خطا'
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import resolve
+
+from apps.core.queries import check_budget, count_queries, get_view_budget
+
+# صفحاتی که به صورت پیش فرض بررسی می شوند
+DEFAULT_PATHS = ('/', '/blog/', '/contact/', '/sitemap.xml', '/blog/feed/rss/')
+
+
+class Command(BaseCommand):
+    """
+    گزارش query های صفحات سایت
+
+    هر صفحه با test client درخواست می شود و تعداد query ها، زمان دیتابیس و
+    ساختارهای تکراری (N+1) همراه با محل اجرا (خط template یا کد) چاپ می شود.
+    اگر صفحه ای از بودجه تعیین شده با query_budget بیشتر شود یا N+1 داشته
+    باشد دستور خطا می دهد (مناسب برای CI)
+
+    استفاده:
+    python manage.py query_report
+    python manage.py query_report /blog/ /blog/tag/django/ --threshold 2
+    """
+    help = 'گزارش تعداد query ها و N+1 صفحات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='آدرس صفحات (پیش فرض: صفحات اصلی)')
+        parser.add_argument('--threshold', type=int, default=None, help='حداقل تکرار برای N+1')
+
+    def handle(self, *args, **options):
+        client = Client()
+        failures = []
+
+        for path in options['paths'] or DEFAULT_PATHS:
+            with count_queries(duplicate_threshold=options['threshold']) as stats:
+                response = client.get(path, HTTP_HOST='localhost')
+
+            self.stdout.write(f'{path} [{response.status_code}] {stats.summary()}')
+            budget = get_view_budget(resolve(path).func) or {}
+            problems = check_budget(stats, **budget)
+            if stats.n_plus_one():
+                problems.append('N+1')
+            if problems:
+                failures.append(f'{path}: {"، ".join(problems)}')
+
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('همه صفحات در محدوده بودجه query هستند'))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.fonts import DEFAULT_PRELOAD, build_subsets, collect_characters, font_subset
+
+
+class Command(BaseCommand):
+    """
+    ساختن subset فونت های فارسی از روی کاراکترهای استفاده شده در سایت
+
+    بعد از تغییر template ها یا اضافه شدن محتوای جدید (قبل از collectstatic)
+    اجرا شود. کاراکترهایی که در subset نیستند از فونت کامل نمایش داده می شوند
+
+    استفاده:
+    python manage.py subset_fonts
+    python manage.py subset_fonts --no-database
+    python manage.py subset_fonts --preload IRY.woff2 --preload IRY-Bold.woff2
+    """
+    help = 'ساختن WOFF2 کوچک شده برای فونت های IRY و Sarb همراه با unicode-range'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-database', action='store_true',
+            help='فقط template ها اسکن شوند (بدون فیلدهای متنی دیتابیس)',
+        )
+        parser.add_argument(
+            '--preload', action='append',
+            help=f'نام فایل فونتی که preload می شود (پیش فرض: {", ".join(DEFAULT_PRELOAD)})',
+        )
+
+    def handle(self, *args, **options):
+        if font_subset is None:
+            raise CommandError('fonttools نصب نیست: pip install fonttools brotli')
+
+        characters = collect_characters(include_database=not options['no_database'])
+        self.stdout.write(f'{len(characters)} کاراکتر مختلف پیدا شد')
+
+        entries = build_subsets(characters, preload=options['preload'] or DEFAULT_PRELOAD)
+        if not entries:
+            raise CommandError('هیچ @font-face با فایل WOFF2 پیدا نشد')
+
+        original = subset = 0
+        for entry in entries:
+            saved = 1 - entry['size'] / entry['original_size']
+            self.stdout.write(
+                f"{entry['family']:<5} {entry['weight']:<7} {entry['source']:<36} "
+                f"{entry['original_size'] / 1024:7.1f}KB -> {entry['size'] / 1024:6.1f}KB "
+                f"({saved:.0%} کمتر، {entry['glyphs']} کاراکتر)"
+            )
+            original += entry['original_size']
+            subset += entry['size']
+
+        self.stdout.write(self.style.SUCCESS(
+            f'WOFF2: {original / 1024:.1f}KB -> {subset / 1024:.1f}KB '
+            f'({1 - subset / original:.0%} کمتر در {len(entries)} فونت)'
+        ))
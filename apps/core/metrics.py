@@ -0,0 +1,416 @@
+"""
+جمع آوری معیارهای کارایی با خروجی متنی Prometheus
+
+معیارها:
+- cv_http_request_duration_seconds: زمان پاسخ هر view (بر اساس نام url)
+- cv_db_query_duration_seconds و cv_db_queries_total: زمان و تعداد query های هر درخواست
+- cv_template_render_duration_seconds: زمان render شدن TemplateResponse ها
+- cv_cache_page_requests_total: hit/miss کش صفحه (cache_page یا CacheMiddleware)
+- cv_object_cache_requests_total: hit/miss کش مدل ها (apps/core/cache.py)
+
+هر process معیارهای خودش را در حافظه جمع می کند (فقط چند عملیات dict
+داخل یک قفل برای هر درخواست) و یک thread پس زمینه هر چند ثانیه snapshot
+آن را در فایل metrics-<pid>.json داخل ROOT می نویسد. endpoint /metrics
+فایل های همه worker های گونیکورن را جمع می کند؛ فایل worker هایی که دیگر
+وجود ندارند در metrics-archive.json ادغام می شوند تا شمارنده ها کم نشوند
+
+تنظیمات از طریق METRICS در settings خوانده می شود
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# تنظیمات پیش فرض
+DEFAULTS = {
+    'ENABLED': True,
+    'ROOT': Path(tempfile.gettempdir()) / 'cv-django-metrics',
+    'FLUSH_INTERVAL': 5,        # فاصله نوشتن snapshot هر worker (ثانیه)
+    'TOKEN': '',                # توکن Bearer برای Prometheus (بدون نیاز به ورود ادمین)
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+# نام، نوع و توضیح معیارها
+METRICS = {
+    'cv_http_request_duration_seconds': ('histogram', 'Request latency by URL name'),
+    'cv_db_query_duration_seconds': ('histogram', 'Total database time per request'),
+    'cv_db_queries_total': ('counter', 'Database queries executed'),
+    'cv_template_render_duration_seconds': ('histogram', 'TemplateResponse render time'),
+    'cv_cache_page_requests_total': ('counter', 'Page cache lookups by result'),
+    'cv_object_cache_requests_total': ('counter', 'Model cache lookups by result'),
+}
+
+ARCHIVE_NAME = 'metrics-archive.json'
+
+
+def get_config():
+    config = DEFAULTS.copy()
+    config.update(getattr(settings, 'METRICS', {}))
+    return config
+
+
+class Registry:
+    """
+    معیارهای یک process
+
+    counters: {(نام, برچسب ها): مقدار}
+    histograms: {(نام, برچسب ها): [تعداد هر bucket..., تعداد بیشتر از آخرین bucket, مجموع]}
+    برچسب ها tuple مرتب از (کلید, مقدار) هستند
+    """
+
+    def __init__(self, root, flush_interval, buckets, enabled=True):
+        self.root = Path(root)
+        self.flush_interval = flush_interval
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pid = None
+        self._dirty = False
+        self._stop = threading.Event()
+        self.counters = {}
+        self.histograms = {}
+        atexit.register(self.flush)
+
+    def inc(self, name, labels=(), amount=1):
+        if not self.enabled:
+            return
+        self._ensure_worker()
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            self._dirty = True
+
+    def observe(self, name, labels, value):
+        if not self.enabled:
+            return
+        self._ensure_worker()
+        key = (name, labels)
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += value
+            self._dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'buckets': list(self.buckets),
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, labels, list(values)] for (name, labels), values in self.histograms.items()],
+            }
+
+    @property
+    def path(self):
+        return self.root / f'metrics-{os.getpid()}.json'
+
+    def flush(self):
+        """
+        نوشتن snapshot این process (فقط اگر از آخرین نوشتن تغییری کرده باشد)
+        """
+        if not self._dirty:
+            return
+        with self._lock:
+            self._dirty = False
+        snapshot = self.snapshot()
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=self.root, prefix='.metrics-')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(snapshot, file)
+        os.replace(temp, self.path)
+
+    def _ensure_worker(self):
+        """
+        راه اندازی thread نویسنده - بعد از fork معیارهای process والد پاک می شوند
+        تا در worker ها دوباره شمرده نشوند
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                self.counters.clear()
+                self.histograms.clear()
+            self._pid = pid
+            worker = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+            worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('خطا در نوشتن معیارها')
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                config = get_config()
+                _registry = Registry(
+                    config['ROOT'], config['FLUSH_INTERVAL'], config['BUCKETS'], config['ENABLED'],
+                )
+    return _registry
+
+
+def labels(**values):
+    return tuple(sorted(values.items()))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge(total, snapshot):
+    """
+    اضافه کردن یک snapshot به مجموع: {'counters': {...}, 'histograms': {...}}
+    """
+    for name, label_pairs, value in snapshot.get('counters', ()):
+        key = (name, tuple(map(tuple, label_pairs)))
+        total['counters'][key] = total['counters'].get(key, 0) + value
+    for name, label_pairs, values in snapshot.get('histograms', ()):
+        key = (name, tuple(map(tuple, label_pairs)))
+        current = total['histograms'].get(key)
+        if current is None or len(current) != len(values):
+            total['histograms'][key] = list(values)
+        else:
+            total['histograms'][key] = [a + b for a, b in zip(current, values)]
+
+
+def _dump(total, buckets):
+    return {
+        'buckets': list(buckets),
+        'counters': [[name, labels, value] for (name, labels), value in total['counters'].items()],
+        'histograms': [[name, labels, values] for (name, labels), values in total['histograms'].items()],
+    }
+
+
+def _read(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def collect():
+    """
+    مجموع معیارهای همه worker ها
+
+    فایل worker های متوقف شده در فایل archive ادغام و حذف می شوند
+    """
+    registry = get_registry()
+    registry.flush()
+    root = registry.root
+    root.mkdir(parents=True, exist_ok=True)
+
+    with open(root / '.lock', 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        archive_path = root / ARCHIVE_NAME
+        archive = {'counters': {}, 'histograms': {}}
+        _merge(archive, _read(archive_path))
+        total = {'counters': {}, 'histograms': {}}
+        archived = []
+
+        for path in root.glob('metrics-*.json'):
+            if path.name == ARCHIVE_NAME:
+                continue
+            snapshot = _read(path)
+            pid = int(path.stem.split('-', 1)[1])
+            if pid != os.getpid() and not _pid_alive(pid):
+                _merge(archive, snapshot)
+                archived.append(path)
+            else:
+                _merge(total, snapshot)
+
+        if archived:
+            fd, temp = tempfile.mkstemp(dir=root, prefix='.metrics-')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(_dump(archive, registry.buckets), file)
+            os.replace(temp, archive_path)
+            for path in archived:
+                path.unlink(missing_ok=True)
+
+    _merge(total, _dump(archive, registry.buckets))
+    return total
+
+
+def _format_labels(label_pairs, extra=()):
+    pairs = list(label_pairs) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def render_text(total=None, buckets=None):
+    """
+    خروجی متنی Prometheus (text format 0.0.4)
+    """
+    total = collect() if total is None else total
+    buckets = buckets or get_registry().buckets
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, label_pairs), value in sorted(total['counters'].items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(label_pairs)} {value}')
+            continue
+        for (metric, label_pairs), values in sorted(total['histograms'].items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], values[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(label_pairs, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(label_pairs)} {values[-1]}')
+            lines.append(f'{name}_count{_format_labels(label_pairs)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """
+    execute_wrapper سبک که فقط تعداد و زمان query ها را جمع می کند
+    """
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """
+    ثبت زمان پاسخ، زمان دیتابیس، زمان render و نتیجه کش صفحه برای هر درخواست
+
+    باید اولین middleware باشد تا زمان کل درخواست اندازه گرفته شود
+    در ASGI به صورت async اجرا می شود تا view های async در thread اجرا نشوند
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.registry = get_registry()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.registry.enabled:
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            self.wrap_connections(stack, timer)
+            response = self.get_response(request)
+        self.record(request, response, timer, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.registry.enabled:
+            return await self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        # ORM در view های async روی thread همگام درخواست اجرا می شود
+        # (sync_to_async با thread_sensitive)، پس wrapper ها همان جا نصب می شوند
+        stack = ExitStack()
+        await sync_to_async(self.wrap_connections)(stack, timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, response, timer, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def wrap_connections(stack, timer):
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timer))
+
+    def record(self, request, response, timer, elapsed):
+        view = self.view_name(request)
+        registry = self.registry
+        registry.observe('cv_http_request_duration_seconds', labels(
+            view=view, method=request.method, status=f'{response.status_code // 100}xx',
+        ), elapsed)
+        registry.observe('cv_db_query_duration_seconds', labels(view=view), timer.duration)
+        if timer.count:
+            registry.inc('cv_db_queries_total', labels(view=view), timer.count)
+
+        # FetchFromCacheMiddleware برای درخواست های GET/HEAD این مقدار را تنظیم می کند:
+        # False یعنی پاسخ از کش خوانده شد و True یعنی پاسخ باید در کش ذخیره شود
+        cached = getattr(request, '_cache_update_cache', None)
+        if cached is not None and request.method in ('GET', 'HEAD'):
+            registry.inc('cv_cache_page_requests_total', labels(view=view, result='miss' if cached else 'hit'))
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+        view = self.view_name(request)
+
+        def rendered(response):
+            self.registry.observe(
+                'cv_template_render_duration_seconds', labels(view=view), time.perf_counter() - started,
+            )
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match is not None else 'unresolved'
@@ -0,0 +1,190 @@
+"""
+صفحه بندی keyset (cursor)
+
+به جای OFFSET که با هر صفحه کندتر می شود، از آخرین رکورد صفحه قبل
+به عنوان نقطه شروع استفاده می کنیم:
+WHERE (published_at, id) < (:published_at, :id) ORDER BY published_at DESC, id DESC
+
+هزینه هر صفحه مستقل از شماره صفحه است و با یک index روی همین ستون ها
+فقط همان تعداد رکورد لازم خوانده می شود
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+
+class InvalidCursor(Exception):
+    """
+    cursor ارسال شده معتبر نیست
+    """
+
+
+class KeysetPage:
+    """
+    یک صفحه از نتایج
+
+    next_cursor و previous_cursor برای ساختن لینک صفحه بعد و قبل استفاده می شوند
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    صفحه بند keyset روی چند فیلد (مثلا published_at و id)
+
+    استفاده:
+    paginator = KeysetPaginator(Post.active.all(), 10, ('-published_at', '-id'))
+    page = paginator.get_page(after=request.GET.get('after'))
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+        # فیلد آخر باید یکتا باشد (مثلا id) تا ترتیب قطعی باشد
+        self.model_fields = [queryset.model._meta.get_field(name) for name in self.fields]
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self.model_fields:
+            value = getattr(obj, field.attname)
+            values.append(field.value_to_string(obj) if value is not None else None)
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.model_fields):
+                raise InvalidCursor(cursor)
+            return [field.to_python(value) for field, value in zip(self.model_fields, values)]
+        except (ValueError, TypeError, ValidationError) as e:
+            raise InvalidCursor(cursor) from e
+
+    def _seek(self, values, forward):
+        """
+        ساختن شرط (a, b) > (x, y) به صورت OR از AND ها
+        چون همه دیتابیس ها مقایسه tuple را پشتیبانی نمی کنند
+
+        شرط اضافه a >= x (که از OR نتیجه می شود) هم AND می شود تا
+        دیتابیس بتواند با index بازه را جستجو کند (SEARCH به جای SCAN)
+        """
+        condition = Q()
+        for index, (name, descending) in enumerate(zip(self.fields, self.descending)):
+            lookup = 'lt' if descending == forward else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_name, prev_value in zip(self.fields[:index], values[:index]):
+                term &= Q(**{prev_name: prev_value})
+            condition |= term
+
+        if len(self.fields) > 1 and values[0] is not None:
+            lookup = 'lte' if self.descending[0] == forward else 'gte'
+            condition &= Q(**{f'{self.fields[0]}__{lookup}': values[0]})
+        return condition
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def get_page_queryset(self, after=None, before=None):
+        """
+        queryset یک صفحه (بدون اجرا) - per_page + 1 رکورد
+        """
+        queryset = self.queryset
+        if before:
+            values = self.decode_cursor(before)
+            queryset = queryset.filter(self._seek(values, forward=False))
+            queryset = queryset.order_by(*self._reversed_ordering())
+        else:
+            if after:
+                queryset = queryset.filter(self._seek(self.decode_cursor(after), forward=True))
+            queryset = queryset.order_by(*self.ordering)
+
+        # یک رکورد اضافه می خوانیم تا وجود صفحه بعد را بدون COUNT بفهمیم
+        return queryset[:self.per_page + 1]
+
+    def _build_page(self, rows, after, before):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if before:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(after)
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0]) if rows and has_previous else None,
+        )
+
+    def get_page(self, after=None, before=None):
+        """
+        دریافت صفحه بعد از cursor after یا صفحه قبل از cursor before
+        """
+        return self._build_page(list(self.get_page_queryset(after, before)), after, before)
+
+    async def aget_page(self, after=None, before=None):
+        """
+        نسخه async get_page (برای view های async)
+        """
+        rows = [obj async for obj in self.get_page_queryset(after, before)]
+        return self._build_page(rows, after, before)
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin برای ListView که به جای Paginator جنگو از KeysetPaginator استفاده می کند
+
+    پارامترهای URL: ?after=<cursor> یا ?before=<cursor>
+    """
+    paginate_by = 10
+    keyset_ordering = ('-pk',)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.get_page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidCursor:
+            raise Http404(_('صفحه نامعتبر است'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = await paginator.aget_page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidCursor:
+            raise Http404(_('صفحه نامعتبر است'))
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,317 @@
+"""
+شمارش query های هر درخواست و تشخیص N+1
+
+برای هر درخواست تعداد query ها، زمان کل دیتابیس و query های تکراری
+(query هایی با ساختار یکسان که فقط پارامترهایشان فرق دارد) شمرده می شود.
+ساختاری که بیشتر از DUPLICATE_THRESHOLD بار تکرار شود احتمالا N+1 است و
+محل اجرای آن گزارش می شود: خط template (مثلا blog/blog.html:42) یا اگر
+query از template نیامده باشد اولین خط کد پروژه
+
+برای هر view می توان بودجه تعیین کرد:
+
+@query_budget(max_queries=5, max_duplicates=0)
+def view(request): ...
+
+@query_budget(max_queries=8)
+class PostListView(ListView): ...
+
+و در shell یا دستورات مدیریتی:
+
+with assert_max_queries(3):
+    render_page()
+
+نتیجه هر درخواست در request.query_stats قرار می گیرد، در لاگ نوشته
+می شود و (با HEADERS) در هدرهای X-Query-Count و X-Query-Time ارسال می شود
+
+تنظیمات از طریق QUERY_BUDGET در settings خوانده می شود
+"""
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+import django
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# تنظیمات پیش فرض
+DEFAULTS = {
+    'ENABLED': True,
+    'DUPLICATE_THRESHOLD': 3,   # تعداد تکرار یک ساختار که N+1 حساب می شود
+    'SLOW_QUERY': 0.1,          # query کندتر از این (ثانیه) در لاگ ثبت می شود
+    'HEADERS': False,           # ارسال X-Query-Count و X-Query-Time در پاسخ
+    'RAISE': False,             # خطا به جای لاگ وقتی بودجه view رد شود (مناسب DEBUG)
+}
+
+# مقادیر رشته ای، اعداد و لیست های IN در ساختار query یکسان در نظر گرفته می شوند
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|\.\.\.)\s*,?)+\)', re.IGNORECASE)
+
+# فریم های این مسیرها محل اجرای query حساب نمی شوند
+IGNORED_PATHS = (
+    os.path.dirname(django.__file__),
+    os.path.dirname(os.__file__),
+    __file__,
+)
+
+
+def get_config():
+    config = DEFAULTS.copy()
+    config.update(getattr(settings, 'QUERY_BUDGET', {}))
+    return config
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    تعداد یا زمان query های یک view بیشتر از بودجه تعیین شده است
+    """
+
+
+def normalize_sql(sql):
+    """
+    ساختار query بدون مقادیر
+
+    "... WHERE id IN (%s, %s, %s) LIMIT 21" -> "... WHERE id IN (...) LIMIT ?"
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def find_origin():
+    """
+    محل اجرای query فعلی
+
+    اگر query هنگام render یک template اجرا شده باشد نزدیک ترین node
+    template (نام فایل و شماره خط) برگردانده می شود، وگرنه اولین فریم
+    خارج از Django و کتابخانه های پایتون
+    """
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        if frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'{origin.template_name or origin.name}:{token.lineno}'
+        if fallback is None:
+            filename = frame.f_code.co_filename
+            if not filename.startswith(IGNORED_PATHS) and 'site-packages' not in filename:
+                fallback = f'{os.path.relpath(filename, settings.BASE_DIR)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return fallback or 'unknown'
+
+
+class QueryStats:
+    """
+    آمار query های یک درخواست (یا یک بلوک کد)
+    """
+
+    def __init__(self, duplicate_threshold=None, slow_query=None):
+        config = get_config()
+        self.duplicate_threshold = duplicate_threshold or config['DUPLICATE_THRESHOLD']
+        self.slow_query = config['SLOW_QUERY'] if slow_query is None else slow_query
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        # اولین محل اجرای هر ساختار تکراری: {ساختار: محل}
+        self.origins = {}
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+
+            shape = normalize_sql(sql)
+            self.shapes[shape] += 1
+            # محل اجرا فقط برای تکرار دوم پیدا می شود تا query های عادی هزینه ای نداشته باشند
+            if self.shapes[shape] == 2:
+                self.origins[shape] = find_origin()
+            if elapsed >= self.slow_query:
+                self.slow.append((elapsed, sql))
+
+    @property
+    def duplicates(self):
+        """
+        تعداد query هایی که تکرار یک ساختار قبلی هستند
+        """
+        return sum(count - 1 for count in self.shapes.values())
+
+    def n_plus_one(self):
+        """
+        [(تعداد تکرار, محل, ساختار)] برای ساختارهای مشکوک به N+1
+        """
+        return sorted(
+            (
+                (count, self.origins.get(shape, 'unknown'), shape)
+                for shape, count in self.shapes.items()
+                if count >= self.duplicate_threshold
+            ),
+            reverse=True,
+        )
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'duration': round(self.duration, 6),
+            'duplicates': self.duplicates,
+            'n_plus_one': [
+                {'count': count, 'origin': origin, 'sql': shape}
+                for count, origin, shape in self.n_plus_one()
+            ],
+        }
+
+    def summary(self):
+        lines = [f'{self.count} query در {self.duration * 1000:.1f}ms ({self.duplicates} تکراری)']
+        for count, origin, shape in self.n_plus_one():
+            lines.append(f'  N+1: {count}x در {origin}: {shape[:200]}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def count_queries(using=None, **kwargs):
+    """
+    شمارش query های داخل بلوک روی همه دیتابیس ها (یا فقط using)
+
+    with count_queries() as stats:
+        ...
+    print(stats.count, stats.n_plus_one())
+    """
+    stats = QueryStats(**kwargs)
+    aliases = [using] if using else list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+
+def check_budget(stats, max_queries=None, max_duplicates=None, max_time=None):
+    """
+    لیست دلایل رد شدن بودجه (لیست خالی یعنی در محدوده بودجه)
+    """
+    problems = []
+    if max_queries is not None and stats.count > max_queries:
+        problems.append(f'{stats.count} query (حداکثر {max_queries})')
+    if max_duplicates is not None and stats.duplicates > max_duplicates:
+        problems.append(f'{stats.duplicates} query تکراری (حداکثر {max_duplicates})')
+    if max_time is not None and stats.duration > max_time:
+        problems.append(f'{stats.duration * 1000:.1f}ms زمان دیتابیس (حداکثر {max_time * 1000:.0f}ms)')
+    return problems
+
+
+@contextmanager
+def assert_max_queries(max_queries=None, max_duplicates=None, max_time=None, using=None):
+    """
+    خطای QueryBudgetExceeded اگر کد داخل بلوک بیشتر از بودجه query اجرا کند
+    """
+    with count_queries(using) as stats:
+        yield stats
+    problems = check_budget(stats, max_queries, max_duplicates, max_time)
+    if problems:
+        raise QueryBudgetExceeded(f'{"، ".join(problems)}\n{stats.summary()}')
+
+
+def query_budget(max_queries=None, max_duplicates=None, max_time=None):
+    """
+    تعیین بودجه query برای یک view (تابع یا کلاس)
+
+    بودجه توسط QueryCountMiddleware بررسی می شود
+    """
+    budget = {'max_queries': max_queries, 'max_duplicates': max_duplicates, 'max_time': max_time}
+
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def get_view_budget(view_func):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        # view کلاسی: as_view کلاس را در view_class نگه می دارد
+        budget = getattr(getattr(view_func, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+class QueryCountMiddleware:
+    """
+    شمارش query های هر درخواست، گزارش N+1 و بررسی بودجه view
+
+    باید بالای MIDDLEWARE قرار بگیرد تا query های session و کاربر هم شمرده شوند
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.config['ENABLED']:
+            return self.get_response(request)
+
+        with count_queries() as stats:
+            response = self.get_response(request)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        if not self.config['ENABLED']:
+            return await self.get_response(request)
+
+        # wrapper ها روی thread همگام درخواست نصب می شوند که ORM view های async هم آنجا اجرا می شود
+        counter = count_queries()
+        stats = await sync_to_async(counter.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(counter.__exit__)(None, None, None)
+        return self.finish(request, response, stats)
+
+    def finish(self, request, response, stats):
+        request.query_stats = stats
+        self.report(request, response, stats)
+
+        if self.config['HEADERS']:
+            response['X-Query-Count'] = str(stats.count)
+            response['X-Query-Time'] = f'{stats.duration * 1000:.1f}ms'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_view_budget(view_func)
+
+    def report(self, request, response, stats):
+        extra = {'path': request.path, 'status': response.status_code, 'queries': stats.as_dict()}
+
+        for elapsed, sql in stats.slow:
+            logger.warning('query کند (%.1fms) در %s: %s', elapsed * 1000, request.path, sql[:500], extra=extra)
+
+        suspects = stats.n_plus_one()
+        if suspects:
+            logger.warning('احتمال N+1 در %s\n%s', request.path, stats.summary(), extra=extra)
+
+        budget = getattr(request, 'query_budget', None)
+        problems = check_budget(stats, **budget) if budget else []
+        if problems:
+            message = f'بودجه query در {request.path} رد شد: {"، ".join(problems)}'
+            if self.config['RAISE']:
+                raise QueryBudgetExceeded(f'{message}\n{stats.summary()}')
+            logger.warning(message, extra=extra)
+        elif not suspects:
+            logger.debug('%s: %s', request.path, stats.summary(), extra=extra)
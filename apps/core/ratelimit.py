@@ -0,0 +1,478 @@
+"""
+محدود کردن تعداد درخواست ها (rate limiting)
+
+دو الگوریتم:
+- sliding_window: تعداد درخواست ها در پنجره زمانی لغزان، تخمین زده شده از روی
+  شمارنده پنجره فعلی و پنجره قبلی (حافظه ثابت برای هر کلید)
+- token_bucket: سطل توکن با ظرفیت limit که با سرعت limit/period پر می شود
+  (پیاده سازی GCRA - برای هر کلید فقط یک عدد ذخیره می شود)
+
+دو backend با API یکسان:
+- local: داخل حافظه process با حذف LRU کلیدهای قدیمی (سریع، برای هر worker جداگانه)
+- cache: در کش مشترک (Redis) تا محدودیت بین همه worker ها مشترک باشد
+
+درخواست رد شده شمرده نمی شود و هیچ چیزی در دیتابیس نوشته نمی شود
+
+استفاده:
+@ratelimit(rate='5/10m', key=('ip', 'post:email'))
+def view(request): ...
+
+class SendMessageView(View):
+    @ratelimit(rate='5/10m', key='ip', backend='cache')
+    async def post(self, request): ...
+
+تنظیمات از طریق RATELIMIT در settings خوانده می شود
+"""
+import asyncio
+import functools
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest, JsonResponse
+
+try:
+    from django_redis import get_redis_connection
+    from redis.exceptions import RedisError
+except ImportError:
+    # بدون django-redis اسکریپت Lua استفاده نمی شود
+    get_redis_connection = RedisError = None
+
+# تنظیمات پیش فرض
+DEFAULTS = {
+    'BACKEND': 'local',         # local یا cache
+    'MAX_KEYS': 10000,          # حداکثر کلید در backend محلی (LRU)
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'rl',
+    'PROXY_COUNT': 0,           # تعداد proxy های مورد اعتماد جلوی سایت (X-Forwarded-For)
+    'ENABLED': True,
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+
+
+def get_config():
+    config = DEFAULTS.copy()
+    config.update(getattr(settings, 'RATELIMIT', {}))
+    return config
+
+
+@functools.lru_cache(maxsize=None)
+def parse_rate(rate):
+    """
+    '5/10m' -> (5, 600.0)
+    """
+    match = RATE_RE.match(rate.replace(' ', ''))
+    if not match:
+        raise ValueError(f'نرخ نامعتبر: {rate!r} (مثال درست: 5/m یا 100/10m)')
+    count, multiplier, unit = match.groups()
+    return int(count), float(int(multiplier or 1) * PERIODS[unit])
+
+
+def _sliding_window(state, limit, period, now):
+    """
+    یک قدم پنجره لغزان روی وضعیت (index, previous, current) یا None
+
+    خروجی: (پذیرفته شد؟, ثانیه تا درخواست مجاز بعدی, وضعیت بعد از ثبت درخواست)
+    """
+    index = int(now // period)
+    if state is None or state[0] < index - 1:
+        previous = current = 0
+    elif state[0] == index - 1:
+        previous, current = state[2], 0
+    else:
+        previous, current = state[1], state[2]
+
+    elapsed = now - index * period
+    if previous * (1 - elapsed / period) + current >= limit:
+        return False, _window_retry_after(limit, period, previous, current, elapsed), None
+    return True, 0, (index, previous, current + 1)
+
+
+def _token_bucket(state, limit, period, now):
+    """
+    یک قدم GCRA روی زمان رسیدن نظری (TAT) یا None - خروجی مثل _sliding_window
+    """
+    interval = period / limit
+    tat = max(now if state is None else state, now)
+    if tat + interval - now > period:
+        return False, tat + interval - period - now, None
+    return True, 0, tat + interval
+
+
+STEPS = {'sliding_window': _sliding_window, 'token_bucket': _token_bucket}
+
+
+def _apply(step, states, limit, period, now):
+    """
+    بررسی همه کلیدها قبل از ثبت درخواست برای هر کدام
+
+    خروجی: (پذیرفته شد؟, ثانیه تا درخواست مجاز بعدی, وضعیت های جدید یا None)
+    اگر یکی از کلیدها رد کند هیچ کلیدی شمرده نمی شود
+    """
+    results = [step(state, limit, period, now) for state in states]
+    rejected = [retry_after for allowed, retry_after, _ in results if not allowed]
+    if rejected:
+        return False, max(rejected), None
+    return True, 0, [state for _, _, state in results]
+
+
+class LocalBackend:
+    """
+    نگهداری وضعیت کلیدها در حافظه process
+
+    حداکثر max_keys کلید نگه داشته می شود و کلیدی که مدت بیشتری استفاده
+    نشده حذف می شود، پس حافظه در برابر هجوم IP های مختلف محدود است
+    """
+    is_local = True
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, key, state):
+        # صدا زده شده داخل قفل
+        self._states[key] = state
+        self._states.move_to_end(key)
+        if len(self._states) > self.max_keys:
+            self._states.popitem(last=False)
+
+    def hit_many(self, algorithm, keys, limit, period, now):
+        step = STEPS[algorithm]
+        with self._lock:
+            allowed, retry_after, states = _apply(
+                step, [self._states.get(key) for key in keys], limit, period, now
+            )
+            if allowed:
+                for key, state in zip(keys, states):
+                    self._store(key, state)
+        return allowed, retry_after
+
+    def reset(self):
+        with self._lock:
+            self._states.clear()
+
+
+# بررسی و ثبت همه کلیدها در یک مرحله اتمیک داخل Redis
+# KEYS: برای هر کلید (پنجره فعلی, پنجره قبلی) - ARGV: limit, period, elapsed, ttl
+# خروجی: لیست خالی اگر پذیرفته شد، وگرنه (previous, current) همه کلیدها
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local weight = 1 - tonumber(ARGV[3]) / tonumber(ARGV[2])
+local counts = {}
+local rejected = false
+for i = 1, #KEYS, 2 do
+    local current = tonumber(redis.call('GET', KEYS[i])) or 0
+    local previous = tonumber(redis.call('GET', KEYS[i + 1])) or 0
+    counts[#counts + 1] = tostring(previous)
+    counts[#counts + 1] = tostring(current)
+    if previous * weight + current >= limit then
+        rejected = true
+    end
+end
+if rejected then
+    return counts
+end
+for i = 1, #KEYS, 2 do
+    redis.call('INCR', KEYS[i])
+    redis.call('EXPIRE', KEYS[i], ARGV[4])
+end
+return {}
+"""
+
+# KEYS: TAT هر کلید - ARGV: interval, period, now, ttl
+# خروجی: '0' اگر پذیرفته شد، وگرنه ثانیه تا درخواست مجاز بعدی
+TOKEN_BUCKET_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tats = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local tat = math.max(tonumber(redis.call('GET', key)) or now, now)
+    tats[i] = tat
+    wait = math.max(wait, tat + interval - period - now)
+end
+if wait > 0 then
+    return string.format('%.6f', wait)
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, string.format('%.6f', tats[i] + interval), 'EX', ARGV[4])
+end
+return '0'
+"""
+
+
+class CacheBackend:
+    """
+    نگهداری وضعیت کلیدها در کش مشترک
+
+    با django-redis بررسی و ثبت همه کلیدها با یک اسکریپت Lua و به صورت
+    اتمیک انجام می شود، پس درخواست های همزمان worker ها از حد مجاز عبور
+    نمی کنند. با سایر کش ها get و set پشت یک قفل همین process انجام
+    می شوند (برای LocMemCache کافی است، بین process ها اتمیک نیست)
+
+    اگر Redis در دسترس نباشد درخواست پذیرفته می شود (مثل IGNORE_EXCEPTIONS)
+    """
+    is_local = False
+
+    def __init__(self, alias='default', key_prefix='rl'):
+        self.cache = caches[alias]
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self.scripts = None
+        if get_redis_connection is not None:
+            try:
+                redis = get_redis_connection(alias)
+            except NotImplementedError:
+                # backend کش django-redis نیست
+                pass
+            else:
+                self.scripts = {
+                    'sliding_window': redis.register_script(SLIDING_WINDOW_SCRIPT),
+                    'token_bucket': redis.register_script(TOKEN_BUCKET_SCRIPT),
+                }
+
+    def _key(self, key, suffix=''):
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return f'{self.key_prefix}:{digest}{suffix}'
+
+    def hit_many(self, algorithm, keys, limit, period, now):
+        # کلید دو پنجره زنده می ماند تا به عنوان پنجره قبلی هم خوانده شود
+        ttl = math.ceil(period * 2)
+        if self.scripts is not None:
+            try:
+                return getattr(self, f'_redis_{algorithm}')(keys, limit, period, now, ttl)
+            except RedisError:
+                return True, 0
+
+        cache_keys = [self._key(key) for key in keys]
+        with self._lock:
+            found = self.cache.get_many(cache_keys)
+            allowed, retry_after, states = _apply(
+                STEPS[algorithm], [found.get(key) for key in cache_keys], limit, period, now
+            )
+            if allowed:
+                self.cache.set_many(dict(zip(cache_keys, states)), timeout=ttl)
+        return allowed, retry_after
+
+    def _redis_sliding_window(self, keys, limit, period, now, ttl):
+        index = int(now // period)
+        elapsed = now - index * period
+        redis_keys = []
+        for key in keys:
+            redis_keys.append(self.cache.make_key(self._key(key, f':{index}')))
+            redis_keys.append(self.cache.make_key(self._key(key, f':{index - 1}')))
+        counts = self.scripts['sliding_window'](keys=redis_keys, args=[limit, period, elapsed, ttl])
+        if not counts:
+            return True, 0
+        counts = [float(count) for count in counts]
+        pairs = zip(counts[::2], counts[1::2])
+        return False, max(
+            _window_retry_after(limit, period, previous, current, elapsed)
+            for previous, current in pairs
+            if previous * (1 - elapsed / period) + current >= limit
+        )
+
+    def _redis_token_bucket(self, keys, limit, period, now, ttl):
+        redis_keys = [self.cache.make_key(self._key(key)) for key in keys]
+        wait = float(self.scripts['token_bucket'](keys=redis_keys, args=[period / limit, period, now, ttl]))
+        if wait > 0:
+            return False, wait
+        return True, 0
+
+    def reset(self):
+        pass
+
+
+def _window_retry_after(limit, period, previous, current, elapsed):
+    """
+    زمان تقریبی تا پذیرفته شدن درخواست بعدی در پنجره لغزان
+    """
+    if current >= limit or not previous:
+        return period - elapsed
+    # سهم پنجره قبلی باید تا جایی کم شود که previous * weight + current < limit
+    weight = (limit - current) / previous
+    return max(0.0, (1 - weight) * period - elapsed)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """
+    backend مشترک با نام local یا cache (پیش فرض از تنظیمات)
+    """
+    config = get_config()
+    name = name or config['BACKEND']
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                if name == 'cache':
+                    backend = CacheBackend(config['CACHE_ALIAS'], config['KEY_PREFIX'])
+                elif name == 'local':
+                    backend = LocalBackend(config['MAX_KEYS'])
+                else:
+                    raise ValueError(f'backend نامعتبر برای rate limit: {name!r}')
+                _backends[name] = backend
+    return backend
+
+
+def get_client_ip(request):
+    """
+    IP کاربر - X-Forwarded-For فقط به تعداد proxy های مورد اعتماد بررسی می شود
+    """
+    proxy_count = get_config()['PROXY_COUNT']
+    if proxy_count:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            addresses = [address.strip() for address in forwarded.split(',')]
+            if len(addresses) >= proxy_count:
+                return addresses[-proxy_count]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_key_value(request, key):
+    """
+    مقدار یک کلید برای درخواست
+
+    کلیدها: ip، user، post:<field>، get:<field>، header:<name> یا یک تابع
+    """
+    if callable(key):
+        return key(request)
+    if key == 'ip':
+        return get_client_ip(request)
+    if key == 'user':
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return str(user.pk)
+        return get_client_ip(request)
+    source, _, name = key.partition(':')
+    if source == 'post':
+        return request.POST.get(name, '').strip().lower()
+    if source == 'get':
+        return request.GET.get(name, '').strip().lower()
+    if source == 'header':
+        return request.headers.get(name, '')
+    raise ValueError(f'کلید نامعتبر برای rate limit: {key!r}')
+
+
+class RateLimiter:
+    """
+    یک قاعده محدودیت: نرخ + الگوریتم + backend
+
+    limiter = RateLimiter('10/m')
+    allowed, retry_after = limiter.hit('ip:1.2.3.4')
+    """
+    ALGORITHMS = ('sliding_window', 'token_bucket')
+
+    def __init__(self, rate, algorithm='sliding_window', backend=None):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f'الگوریتم نامعتبر برای rate limit: {algorithm!r}')
+        self.limit, self.period = parse_rate(rate)
+        self.algorithm = algorithm
+        self._backend = backend
+
+    @property
+    def backend(self):
+        # backend با اولین استفاده ساخته می شود تا تنظیمات در زمان import لازم نباشد
+        if self._backend is None or isinstance(self._backend, str):
+            self._backend = get_backend(self._backend)
+        return self._backend
+
+    def hit(self, key, now=None):
+        """
+        ثبت یک درخواست برای کلید - (پذیرفته شد؟, ثانیه تا درخواست مجاز بعدی)
+        """
+        return self.hit_many([key], now)
+
+    def hit_many(self, keys, now=None):
+        """
+        ثبت یک درخواست برای چند کلید؛ فقط اگر همه کلیدها اجازه دهند شمرده می شود
+        """
+        return self.backend.hit_many(
+            self.algorithm, keys, self.limit, self.period, time.time() if now is None else now
+        )
+
+
+def too_many_requests(request, retry_after):
+    response = JsonResponse({
+        'success': False,
+        'message': 'تعداد درخواست های شما بیش از حد مجاز است. لطفا بعدا تلاش کنید.',
+    }, status=429, json_dumps_params={'ensure_ascii': False})
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def ratelimit(rate, key='ip', algorithm='sliding_window', backend=None,
+              methods=('POST',), group=None, response=too_many_requests):
+    """
+    decorator محدودیت درخواست برای view های همزمان و غیرهمزمان
+
+    key می تواند یک کلید یا چند کلید باشد (مثلا ('ip', 'post:email'))؛
+    هر کلید جداگانه شمرده می شود و درخواست باید از همه عبور کند. درخواستی
+    که یکی از کلیدها ردش کند برای هیچ کلیدی شمرده نمی شود.
+    کلیدی که مقدارش خالی است (مثلا ایمیل ارسال نشده) نادیده گرفته می شود
+
+    روی متد view کلاسی هم مستقیما قابل استفاده است (بدون method_decorator)
+    """
+    keys = key if isinstance(key, (list, tuple)) else (key,)
+    limiter = RateLimiter(rate, algorithm, backend)
+    methods = {method.upper() for method in methods} if methods else None
+
+    def decorator(view):
+        prefix = group or f'{view.__module__}.{view.__qualname__}'
+
+        def check(request):
+            """
+            پاسخ 429 اگر درخواست رد شود، وگرنه None
+            """
+            if methods is not None and request.method not in methods:
+                return None
+            if not get_config()['ENABLED']:
+                return None
+            values = [(name, get_key_value(request, name)) for name in keys]
+            values = [f'{prefix}:{name}:{value}' for name, value in values if value]
+            if not values:
+                return None
+            allowed, retry_after = limiter.hit_many(values)
+            if not allowed:
+                return response(request, retry_after)
+            return None
+
+        def find_request(args):
+            return args[0] if isinstance(args[0], HttpRequest) else args[1]
+
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                request = find_request(args)
+                if limiter.backend.is_local:
+                    rejected = check(request)
+                else:
+                    rejected = await sync_to_async(check)(request)
+                if rejected is not None:
+                    return rejected
+                return await view(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            rejected = check(find_request(args))
+            if rejected is not None:
+                return rejected
+            return view(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,205 @@
+"""
+ارسال خواندن ها به دیتابیس های replica
+
+- خواندن مدل های APPS (about، blog و core) بین replica ها با وزن داده شده
+  تقسیم می شود؛ بقیه مدل ها (مثل پیام های تماس) همیشه از primary خوانده می شوند
+- همه نوشتن ها روی primary انجام می شوند
+- بعد از اولین نوشتن، بقیه درخواست (و داخل هر تراکنش روی primary) از
+  primary خوانده می شود تا کاربر تغییر خودش را ببیند. ReplicaRouterMiddleware
+  این وضعیت را برای هر درخواست جدا نگه می دارد و با یک کوکی کوتاه مدت
+  درخواست های بعدی همان کاربر را هم تا PIN_SECONDS به primary می فرستد
+  (تاخیر replication)
+- سلامت هر replica هر HEALTH_CHECK_INTERVAL ثانیه با SELECT 1 بررسی
+  می شود و replica خراب تا بررسی بعدی کنار گذاشته می شود
+
+تنظیمات از طریق REPLICA_ROUTER در settings خوانده می شود
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# تنظیمات پیش فرض
+DEFAULTS = {
+    'REPLICAS': {},                     # {alias: وزن}
+    'APPS': ('about', 'blog', 'core'),  # app هایی که از replica خوانده می شوند
+    'HEALTH_CHECK_INTERVAL': 30,        # ثانیه
+    'PIN_SECONDS': 5,                   # خواندن از primary بعد از نوشتن (حداکثر تاخیر replication)
+    'PIN_COOKIE': 'pin_primary',
+}
+
+# آیا درخواست (یا context) فعلی باید از primary بخواند
+_pinned = contextvars.ContextVar('core_routers_pinned', default=False)
+
+
+def get_config():
+    config = DEFAULTS.copy()
+    config.update(getattr(settings, 'REPLICA_ROUTER', {}))
+    return config
+
+
+def pin_primary():
+    """
+    خواندن های بعدی همین درخواست از primary
+    """
+    _pinned.set(True)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+class ReplicaHealth:
+    """
+    وضعیت سلامت replica ها در این process
+
+    هر replica قفل جدای خودش را دارد تا بررسی یک replica کند بقیه را
+    منتظر نگذارد. در زمان بررسی یک replica، درخواست های دیگر منتظر
+    نمی مانند و نتیجه قبلی را می گیرند (یا اگر هنوز نتیجه ای نیست از primary
+    می خوانند). مدت انتظار برای اتصال با connect_timeout دیتابیس محدود است
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._locks_lock = threading.Lock()
+        self._locks = {}
+        # {alias: (سالم است؟, زمان بررسی)}
+        self._states = {}
+
+    def _lock(self, alias):
+        lock = self._locks.get(alias)
+        if lock is None:
+            with self._locks_lock:
+                lock = self._locks.setdefault(alias, threading.Lock())
+        return lock
+
+    def is_healthy(self, alias):
+        state = self._states.get(alias)
+        now = time.monotonic()
+        if state is not None and now - state[1] < self.interval:
+            return state[0]
+
+        lock = self._lock(alias)
+        if not lock.acquire(blocking=False):
+            # thread دیگری در حال بررسی همین replica است
+            return state[0] if state is not None else False
+        try:
+            state = self._states.get(alias)
+            if state is not None and now - state[1] < self.interval:
+                return state[0]
+            healthy = self.check(alias)
+            self._states[alias] = (healthy, time.monotonic())
+        finally:
+            lock.release()
+        if not healthy:
+            logger.warning('replica %s در دسترس نیست - خواندن ها به primary می روند', alias)
+        return healthy
+
+    @staticmethod
+    def check(alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except DatabaseError:
+            connection.close()
+            return False
+
+    def reset(self):
+        self._states.clear()
+
+
+class ReplicaRouter:
+    """
+    router دیتابیس: خواندن از replica ها، نوشتن روی primary
+    """
+
+    def __init__(self):
+        config = get_config()
+        self.replicas = dict(config['REPLICAS'])
+        self.apps = set(config['APPS'])
+        self.health = ReplicaHealth(config['HEALTH_CHECK_INTERVAL'])
+        self.databases = {DEFAULT_DB_ALIAS, *self.replicas}
+
+    def choose_replica(self):
+        healthy = [alias for alias in self.replicas if self.health.is_healthy(alias)]
+        if not healthy:
+            return DEFAULT_DB_ALIAS
+        if len(healthy) == 1:
+            return healthy[0]
+        return random.choices(healthy, weights=[self.replicas[alias] for alias in healthy])[0]
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or model._meta.app_label not in self.apps:
+            return DEFAULT_DB_ALIAS
+        if _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return self.choose_replica()
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db in self.databases and obj2._state.db in self.databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replica ها از طریق replication پر می شوند
+        if db in self.replicas:
+            return False
+        return None
+
+
+class ReplicaRouterMiddleware:
+    """
+    جدا کردن وضعیت pin هر درخواست و ادامه آن برای چند ثانیه بعد از نوشتن
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = get_config()
+        self.cookie = config['PIN_COOKIE']
+        self.pin_seconds = config['PIN_SECONDS']
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = _pinned.set(self.cookie in request.COOKIES)
+        try:
+            response = self.get_response(request)
+            wrote = _pinned.get() and self.cookie not in request.COOKIES
+        finally:
+            _pinned.reset(token)
+        return self.finish(request, response, wrote)
+
+    async def __acall__(self, request):
+        # sync_to_async تغییر contextvar ها را به همین task برمی گرداند
+        token = _pinned.set(self.cookie in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+            wrote = _pinned.get() and self.cookie not in request.COOKIES
+        finally:
+            _pinned.reset(token)
+        return self.finish(request, response, wrote)
+
+    def finish(self, request, response, wrote):
+        # نوشتن های جانبی درخواست های GET (مثل شمارنده بازدید) کوکی نمی گیرند
+        # تا پاسخ های عمومی قابل کش بمانند
+        if wrote and self.pin_seconds and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(self.cookie, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,125 @@
+"""
+ارسال فایل های استاتیک از لایه Django/WSGI (وقتی CDN یا nginx جلوی سایت نیست)
+
+- اگر مرورگر پشتیبانی کند (با در نظر گرفتن q در Accept-Encoding) نسخه .br
+  یا .gz ساخته شده در collectstatic ارسال می شود؛ هر نسخه ETag جدای خودش را دارد
+- فایل های hash دار با Cache-Control: immutable برای یک سال کش می شوند
+- درخواست های شرطی (If-None-Match و If-Modified-Since) با 304 پاسخ داده می شوند
+
+serve_file برای سایر فایل های از قبل ساخته شده (مثل sitemap و feed) هم استفاده می شود
+
+فعال سازی با SERVE_STATIC = True در settings
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+# نام فایل های hash دار ManifestStaticFilesStorage مثل style.3f2a9c1b0d4e.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+# ترتیب ترجیح فشرده سازی: (نام در Accept-Encoding, پسوند فایل)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+ETAG_SUFFIXES = {'br': 'br', 'gzip': 'gz'}
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+DEFAULT_MAX_AGE = 60 * 60
+
+
+def file_etag(stat, encoding=None):
+    """
+    ETag ضعیف از روی زمان تغییر و حجم فایل (بدون خواندن محتوا)
+
+    نسخه های فشرده پسوند جدا دارند تا cache ها نسخه ها را با هم اشتباه نگیرند
+    """
+    suffix = f'-{ETAG_SUFFIXES[encoding]}' if encoding else ''
+    return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}{suffix}"'
+
+
+def parse_accept_encoding(header):
+    """
+    تبدیل هدر Accept-Encoding به {نام: q}
+
+    مثال: 'br;q=0, gzip' -> {'br': 0.0, 'gzip': 1.0}
+    """
+    codings = {}
+    for item in header.split(','):
+        name, *params = item.split(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[name] = quality
+    return codings
+
+
+def choose_encoding(request, fullpath):
+    """
+    انتخاب نسخه فشرده با بیشترین q (در تساوی به ترتیب ENCODINGS)
+
+    خروجی: (مسیر فایل, نام فشرده سازی یا None)
+    """
+    accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    chosen, best = (fullpath, None), 0.0
+    for name, extension in ENCODINGS:
+        quality = accepted.get(name, accepted.get('*', 0.0))
+        if quality > best and os.path.isfile(fullpath + extension):
+            chosen, best = (fullpath + extension, name), quality
+    return chosen
+
+
+def serve_file(request, fullpath, cache_control, content_type=None):
+    """
+    ارسال یک فایل همراه با نسخه فشرده و پشتیبانی از درخواست های شرطی
+    """
+    try:
+        stat = os.stat(fullpath)
+    except OSError:
+        raise Http404(fullpath)
+
+    served_path, encoding = choose_encoding(request, fullpath)
+    etag = file_etag(stat, encoding)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        not_modified['Cache-Control'] = cache_control
+        patch_vary_headers(not_modified, ('Accept-Encoding',))
+        return not_modified
+
+    if content_type is None:
+        content_type, _ = mimetypes.guess_type(fullpath)
+    response = FileResponse(open(served_path, 'rb'), content_type=content_type or 'application/octet-stream')
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def serve_static(request, path):
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404(path)
+    if not os.path.isfile(fullpath):
+        raise Http404(path)
+
+    if HASHED_NAME_RE.search(path):
+        cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        cache_control = f'public, max-age={DEFAULT_MAX_AGE}'
+    return serve_file(request, fullpath, cache_control)
@@ -0,0 +1,148 @@
+"""
+storage فایل های استاتیک برای production
+
+در زمان collectstatic:
+1. فایل های CSS/JS داخل assets/styles و assets/js کوچک (minify) می شوند
+2. نام فایل ها با hash محتوا ساخته می شود (style.3f2a9c1b0d4e.css) تا بتوان
+   آنها را با Cache-Control: immutable برای مدت طولانی کش کرد
+3. برای فایل های متنی نسخه فشرده .gz و .br (اگر brotli نصب باشد) ساخته
+   می شود تا serve_static (apps/core/static.py) بدون فشرده سازی در هر
+   درخواست آنها را ارسال کند
+
+minify فقط در صورت نصب بودن rcssmin و rjsmin انجام می شود
+"""
+import gzip
+import logging
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+
+def minify(name, content):
+    """
+    کوچک کردن محتوای CSS یا JS - اگر minifier نصب نباشد محتوا بدون تغییر برمی گردد
+    """
+    if name.endswith('.css') and rcssmin is not None:
+        return rcssmin.cssmin(content)
+    if name.endswith('.js') and rjsmin is not None:
+        return rjsmin.jsmin(content)
+    return content
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage همراه با minify و فشرده سازی از قبل
+    """
+    # اگر template به فایلی اشاره کند که وجود ندارد، به جای خطای 500
+    # همان نام بدون hash استفاده می شود
+    manifest_strict = False
+
+    # فایل های .map همراه پروژه نیستند، پس فقط url() و @import پردازش می شوند
+    # (الگوهای sourceMappingURL جنگو برای فایل نبود خطا می دهند)
+    patterns = (
+        ('*.css', (
+            r"""(?P<matched>url\(['"]{0,1}\s*(?P<url>.*?)["']{0,1}\))""",
+            (
+                r"""(?P<matched>@import\s*["']\s*(?P<url>.*?)["'])""",
+                """@import url("%(url)s")""",
+            ),
+        )),
+    )
+
+    # پوشه هایی که فایل های CSS/JS آنها minify می شوند
+    minify_prefixes = ('assets/styles/', 'assets/js/')
+
+    # فایل هایی که فشرده سازی برایشان مفید است (تصاویر و woff از قبل فشرده اند)
+    compress_extensions = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.ttf', '.eot', '.map')
+
+    # حداقل حجم فایل برای فشرده سازی (بایت)
+    compress_min_size = 256
+
+    def should_minify(self, name):
+        return (
+            name.startswith(self.minify_prefixes)
+            and name.endswith(('.css', '.js'))
+            and '.min.' not in name
+        )
+
+    def hashed_name(self, name, content=None, filename=None):
+        """
+        فایل هایی که در CSS به آنها اشاره شده ولی وجود ندارند بدون hash می مانند
+        """
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            logger.warning(f'فایل استاتیک پیدا نشد: {name}')
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        # minify روی کپی فایل در STATIC_ROOT انجام می شود و hash ها از روی
+        # همین کپی محاسبه می شوند تا hash با محتوای نهایی مطابقت داشته باشد
+        paths = {
+            prefixed_path: (self, prefixed_path) if self.should_minify(prefixed_path) else source
+            for prefixed_path, source in paths.items()
+        }
+        for name in paths:
+            if self.should_minify(name):
+                self.minify_file(name)
+
+        yield from super().post_process(paths, dry_run, **options)
+
+        # فقط نسخه های hash دار فشرده می شوند (همان هایی که در production ارسال می شوند)
+        for hashed_name in set(self.hashed_files.values()):
+            self.compress_file(hashed_name)
+
+    def minify_file(self, name):
+        with self.open(name) as file:
+            original = file.read().decode('utf-8')
+        content = minify(name, original)
+        if content != original:
+            self.delete(name)
+            self._save(name, ContentFile(content.encode('utf-8')))
+
+    def compress_file(self, name):
+        """
+        ساختن نسخه های .gz و .br در کنار فایل
+        """
+        if not name.endswith(self.compress_extensions):
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < self.compress_min_size:
+            return
+
+        variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content, quality=11)
+
+        for extension, compressed in variants.items():
+            # اگر فشرده سازی حداقل 5 درصد کاهش حجم نداشته باشد ذخیره نمی کنیم
+            if len(compressed) >= len(content) * 0.95:
+                continue
+            path = name + extension
+            if self.exists(path):
+                self.delete(path)
+            self._save(path, ContentFile(compressed))
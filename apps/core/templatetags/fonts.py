@@ -0,0 +1,32 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from apps.core.fonts import load_manifest
+
+register = template.Library()
+
+
+@register.simple_tag
+def font_subsets():
+    """
+    لینک CSS فونت های subset شده و preload فونت های اصلی صفحه
+
+    استفاده (بعد از لینک rtl.css):
+    {% load fonts %}
+    {% font_subsets %}
+
+    اگر دستور subset_fonts اجرا نشده باشد چیزی چاپ نمی شود و
+    فونت های کامل rtl.css استفاده می شوند
+    """
+    manifest = load_manifest()
+    if not manifest:
+        return ''
+    preloads = format_html_join(
+        '', '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((static(path),) for path in manifest['preload']),
+    )
+    return format_html(
+        '{}<link rel="stylesheet" type="text/css" href="{}"/>',
+        preloads, static(manifest['css']),
+    )
@@ -0,0 +1,67 @@
+from django import template
+from django.apps import apps
+from django.core.cache import cache
+
+from apps.core.cache import fragment_key, get_timeout
+from apps.core.conditional import get_template_stamp
+
+register = template.Library()
+
+
+class ModelCacheNode(template.Node):
+    def __init__(self, nodelist, name, labels, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.labels = labels
+        self.vary_on = vary_on
+
+    def render(self, context):
+        models = [apps.get_model(label.resolve(context)) for label in self.labels]
+        vary_on = [get_template_stamp()] + [value.resolve(context) for value in self.vary_on]
+        key = fragment_key(self.name.resolve(context), models, vary_on)
+
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, get_timeout())
+        return value
+
+
+@register.tag
+def cachemodels(parser, token):
+    """
+    کش یک قسمت از template تا زمان تغییر رکوردهای مدل های داده شده
+
+    استفاده:
+    {% load fragments %}
+    {% cachemodels "about:services" "about.Service" %}
+        {% for service in services %}...{% endfor %}
+    {% endcachemodels %}
+
+    {% cachemodels "blog:post" "blog.Post" "blog.Comment" vary post.pk %}...{% endcachemodels %}
+
+    کلید کش شامل نسخه مدل ها (apps/core/cache.py)، زبان فعال، مقادیر بعد از
+    vary و زمان تغییر template ها است، پس نیازی به timeout کوتاه یا پاک کردن
+    دستی کش نیست
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} حداقل به نام قسمت و یک مدل نیاز دارد: {{% {bits[0]} "name" "app.Model" %}}'
+        )
+    args = bits[1:]
+    vary_on = []
+    if 'vary' in args:
+        index = args.index('vary')
+        args, vary_on = args[:index], args[index + 1:]
+    if len(args) < 2:
+        raise template.TemplateSyntaxError(f'{bits[0]} حداقل به یک مدل قبل از vary نیاز دارد')
+
+    nodelist = parser.parse((f'end{bits[0]}',))
+    parser.delete_first_token()
+    return ModelCacheNode(
+        nodelist,
+        parser.compile_filter(args[0]),
+        [parser.compile_filter(label) for label in args[1:]],
+        [parser.compile_filter(value) for value in vary_on],
+    )
@@ -0,0 +1,67 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from apps.core.images import MIME_TYPES, get_variants, variant_url as get_variant_url
+
+register = template.Library()
+
+
+def _srcset(paths):
+    return ', '.join(f'{default_storage.url(path)} {width}w' for width, path in paths)
+
+
+@register.simple_tag
+def picture(image, alt='', sizes='100vw', css_class='', loading='lazy'):
+    """
+    ساختن تگ <picture> با srcset برای همه نسخه های یک تصویر
+
+    استفاده:
+    {% load images %}
+    {% picture post.featured_image alt=post.title sizes="(max-width: 768px) 100vw, 50vw" %}
+
+    اگر نسخه ها هنوز ساخته نشده باشند، فقط تصویر اصلی نمایش داده می شود
+    """
+    if not image:
+        return ''
+
+    manifest = get_variants(image)
+    if not manifest:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            image.url, alt, css_class, loading,
+        )
+
+    formats = list(manifest['sources'].items())
+    # فرمت آخر (jpeg یا png) در خود تگ img قرار می گیرد
+    *modern, (fallback_format, fallback_paths) = formats
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[name], _srcset(paths), sizes) for name, paths in modern),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" '
+        'alt="{}" class="{}" loading="{}" decoding="async"></picture>',
+        sources,
+        default_storage.url(fallback_paths[-1][1]),
+        _srcset(fallback_paths),
+        sizes,
+        manifest['width'],
+        manifest['height'],
+        alt,
+        css_class,
+        loading,
+    )
+
+
+@register.simple_tag
+def variant_url(image, width):
+    """
+    آدرس نسخه ای از تصویر با حداقل عرض داده شده
+
+    برای جاهایی که <picture> قابل استفاده نیست (مثل <image> داخل svg):
+    {% variant_url profile.avatar 320 %}
+    """
+    if not image:
+        return ''
+    return get_variant_url(image, int(width))
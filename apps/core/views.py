@@ -0,0 +1,37 @@
+import hmac
+
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
+
+from .metrics import get_config, render_text
+
+
+def has_metrics_token(request):
+    """
+    توکن Bearer برای دسترسی Prometheus بدون ورود به ادمین
+    """
+    token = get_config()['TOKEN']
+    header = request.headers.get('Authorization', '')
+    if not token or not header.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(header[7:].strip().encode(), token.encode())
+
+
+@never_cache
+def metrics_view(request):
+    """
+    معیارهای کارایی همه worker ها با فرمت متنی Prometheus
+
+    فقط برای کاربران staff یا درخواست های دارای توکن METRICS['TOKEN']
+    """
+    if not has_metrics_token(request):
+        user = request.user
+        if not user.is_authenticated:
+            if request.headers.get('Authorization'):
+                return HttpResponseForbidden()
+            return redirect_to_login(request.get_full_path(), reverse('admin:login'))
+        if not (user.is_active and user.is_staff):
+            return HttpResponseForbidden()
+    return HttpResponse(render_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
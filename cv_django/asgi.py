@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cv_django.settings')
+# view های async و اتصال دیتابیس بدون CONN_MAX_AGE (settings.ASYNC_VIEWS)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+# بارگذاری ترجمه ها قبل از اولین درخواست (و قبل از fork در gunicorn --preload)
+from apps.core.i18n import warm_translations  # noqa: E402
+
+warm_translations()
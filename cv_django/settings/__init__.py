@@ -0,0 +1,21 @@
+"""
+تنظیمات لایه ای پروژه
+
+- base.py: تنظیمات مشترک
+- dev.py: توسعه (DEBUG، بدون کش template در مرورگر و ...)
+- prod.py: production (امنیت، لاگ و ...)
+
+پروفایل با متغیر محیطی DJANGO_ENV (dev یا prod) انتخاب می شود یا مستقیما:
+DJANGO_SETTINGS_MODULE=cv_django.settings.prod
+"""
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+DJANGO_ENV = config('DJANGO_ENV', default='dev')
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f'DJANGO_ENV نامعتبر: {DJANGO_ENV!r} (dev یا prod)')
@@ -0,0 +1,369 @@
+"""
+Django settings for cv_django project - تنظیمات مشترک همه پروفایل ها
+
+پروفایل ها (dev.py و prod.py) این فایل را import و بازنویسی می کنند.
+مقادیر وابسته به محیط با python-decouple از متغیرهای محیطی یا فایل .env
+خوانده می شوند (نمونه: .env.example)
+
+Generated by 'django-admin startproject' using Django 4.2.20.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/4.2/ref/settings/
+"""
+
+from pathlib import Path
+
+from decouple import Csv, config
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = config('SECRET_KEY', default='django-insecure-#_y^#3^)-t+!^n9m#!#$%rgm46es+l^!8@@bx*-qczm9*zgpfz')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = config('DEBUG', default=False, cast=bool)
+
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='', cast=Csv())
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'apps.about.apps.AboutConfig',
+    'apps.blog.apps.BlogConfig',
+    'apps.contact.apps.ContactConfig',
+    'apps.core.apps.CoreConfig',
+]
+
+MIDDLEWARE = [
+    'apps.core.metrics.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'apps.core.queries.QueryCountMiddleware',
+    'apps.core.routers.ReplicaRouterMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.locale.LocaleMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'cv_django.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'OPTIONS': {
+            # template ها یک بار parse و در حافظه process نگه داشته می شوند
+            # در حالت DEBUG با تغییر فایل ها autoreloader این کش را خالی می کند
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.template.context_processors.i18n',
+                'apps.core.context_processors.language',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'apps.about.context_processors.profile',
+                'apps.contact.context_processors.contact_info',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'cv_django.wsgi.application'
+
+# view های async صفحه درباره من و وبلاگ؛ asgi.py این مقدار را فعال می کند
+# در ASGI هر درخواست thread جداگانه ای برای ORM دارد، پس اتصال دائمی
+# دیتابیس دوباره استفاده نمی شود و CONN_MAX_AGE پیش فرض 0 است
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+
+# Database
+# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+
+# DB_ENGINE: sqlite یا postgres
+# اتصال ها بین درخواست ها نگه داشته می شوند (CONN_MAX_AGE) و قبل از استفاده
+# دوباره بررسی می شوند تا اتصال قطع شده باعث خطای درخواست نشود
+
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='cv_django'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0 if ASYNC_VIEWS else 60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    # backend SQLite با PRAGMA ها و BEGIN IMMEDIATE (apps/core/backends/sqlite3)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'apps.core.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0 if ASYNC_VIEWS else 60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # busy timeout: ثانیه انتظار برای قفل نوشتن قبل از خطای database is locked
+                'timeout': 20,
+                # تراکنش های atomic از ابتدا قفل نوشتن را می گیرند
+                'transaction_mode': 'IMMEDIATE',
+                # WAL خواندن همزمان با نوشتن را ممکن می کند؛ synchronous=NORMAL در حالت WAL امن است
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'cache_size': -20000,       # حدود 20MB
+                    'mmap_size': 134217728,     # 128MB
+                    'temp_store': 'MEMORY',
+                },
+            },
+        }
+    }
+
+
+# Read replicas
+# خواندن مدل های about، blog و core بین replica ها تقسیم می شود (apps/core/routers.py)
+# DB_REPLICAS: فهرست replica ها با وزن، برای postgres آدرس host و برای sqlite مسیر فایل
+# مثال: DB_REPLICAS=10.0.0.2@3,10.0.0.3@1
+# بعد از نوشتن، خواندن های همان کاربر تا PIN_SECONDS ثانیه از primary انجام می شود
+# DB_REPLICA_CONNECT_TIMEOUT: حداکثر انتظار برای اتصال به replica در postgres (ثانیه)
+# تا replica خاموش درخواست ها را در بررسی سلامت معطل نکند؛ SQLite معادلی ندارد
+
+REPLICA_ROUTER = {
+    'REPLICAS': {},
+    'APPS': ('about', 'blog', 'core'),
+    'HEALTH_CHECK_INTERVAL': config('DB_REPLICA_HEALTH_CHECK_INTERVAL', default=30, cast=int),
+    'PIN_SECONDS': config('DB_REPLICA_PIN_SECONDS', default=5, cast=int),
+}
+
+for index, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    location, _, weight = replica.partition('@')
+    alias = f'replica{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgres' else 'NAME': location,
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_ENGINE == 'postgres':
+        DATABASES[alias]['OPTIONS'] = {
+            'connect_timeout': config('DB_REPLICA_CONNECT_TIMEOUT', default=2, cast=int),
+        }
+    REPLICA_ROUTER['REPLICAS'][alias] = int(weight or 1)
+
+DATABASE_ROUTERS = ['apps.core.routers.ReplicaRouter']
+
+
+# Cache
+# با REDIS_URL کش مشترک بین worker ها در Redis است، وگرنه کش حافظه هر process
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'SOCKET_CONNECT_TIMEOUT': 1,
+                'SOCKET_TIMEOUT': 1,
+                # اگر Redis در دسترس نباشد خطا نمی دهد و مثل کش خالی رفتار می کند
+                'IGNORE_EXCEPTIONS': True,
+            },
+            'KEY_PREFIX': 'cv',
+        }
+    }
+    DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cv-django',
+            'OPTIONS': {
+                'MAX_ENTRIES': 5000,
+            },
+        }
+    }
+    # هر worker کش خودش را دارد؛ تغییرات حداکثر بعد از این مدت (ثانیه)
+    # در worker های دیگر دیده می شوند (apps/core/cache.py)
+    OBJECT_CACHE_LOCAL_TIMEOUT = config('OBJECT_CACHE_LOCAL_TIMEOUT', default=60, cast=int)
+
+
+# Password validation
+# https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.2/topics/i18n/
+
+LANGUAGE_CODE = 'fa'
+
+# زبان از کوکی یا Accept-Language انتخاب می شود (LocaleMiddleware)
+LANGUAGES = [
+    ('fa', 'فارسی'),
+    ('en', 'English'),
+]
+
+LOCALE_PATHS = [
+    BASE_DIR / 'locale',
+]
+
+TIME_ZONE = 'Asia/Tehran'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Email
+# https://docs.djangoproject.com/en/4.2/topics/email/
+
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER or 'webmaster@localhost')
+
+# گیرندگان خطاها و اطلاع رسانی پیام های تماس
+ADMINS = [('Admin', email) for email in config('ADMINS', default='', cast=Csv())]
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.2/howto/static-files/
+
+STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'static'
+
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+STATICFILES_DIRS = [
+    BASE_DIR / 'statics'
+]
+
+# نام فایل های استاتیک با hash محتوا، minify و فشرده سازی gzip/brotli در collectstatic
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'apps.core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# ارسال فایل های استاتیک (نسخه های فشرده) توسط خود Django وقتی CDN یا nginx جلوی سایت نیست
+SERVE_STATIC = config('SERVE_STATIC', default=False, cast=bool)
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Blog view counter
+# بازدیدها ابتدا در شمارنده جمع و سپس دسته ای در دیتابیس نوشته می شوند
+# با Redis شمارنده در کش مشترک است تا چند worker گونیکورن با هم کار کنند
+
+BLOG_VIEW_COUNTER = {
+    'BACKEND': 'cache' if REDIS_URL else 'local',
+    'FLUSH_INTERVAL': 10,
+    'FLUSH_THRESHOLD': 500,
+}
+
+# Responsive images
+# تعداد thread های پس زمینه برای ساخت نسخه های کوچک تر تصاویر (apps/core/images.py)
+
+IMAGE_DERIVATIVE_WORKERS = 2
+
+# Contact messages
+# پیام های فرم تماس در صف قرار گرفته و دسته ای در پس زمینه ذخیره می شوند (apps/contact/ingest.py)
+
+CONTACT_INGEST = {
+    'QUEUE_SIZE': 1000,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 1.0,
+}
+
+# Sitemap and feeds
+# فایل های sitemap و RSS/Atom با تغییر مقالات در پس زمینه دوباره ساخته می شوند (apps/blog/syndication.py)
+# SITE_URL برای ساختن آدرس های کامل در sitemap و feed استفاده می شود
+
+BLOG_SYNDICATION = {
+    'ROOT': BASE_DIR / 'syndication',
+    'SITE_URL': config('SITE_URL', default='http://localhost:8000'),
+    'FEED_ITEMS': 20,
+}
+
+# Rate limiting
+# وضعیت محدودیت ها در حافظه هر process (local) یا در کش مشترک (cache) نگهداری می شود
+# اگر سایت پشت nginx است PROXY_COUNT را برابر تعداد proxy ها قرار دهید (apps/core/ratelimit.py)
+
+RATELIMIT = {
+    'BACKEND': 'cache' if REDIS_URL else 'local',
+    'MAX_KEYS': 10000,
+    'PROXY_COUNT': config('PROXY_COUNT', default=0, cast=int),
+}
+
+# Query budget
+# شمارش query های هر درخواست، تشخیص N+1 و بررسی بودجه view ها (apps/core/queries.py)
+# در DEBUG تعداد query ها در هدر پاسخ ارسال می شود و رد شدن بودجه خطا می دهد
+
+QUERY_BUDGET = {
+    'DUPLICATE_THRESHOLD': 3,
+    'HEADERS': DEBUG,
+    'RAISE': DEBUG,
+}
+
+# Metrics
+# معیارهای هر worker در فایل های ROOT نوشته و در /metrics (ادمین یا توکن) جمع می شوند (apps/core/metrics.py)
+# برای Prometheus توکن را تنظیم کنید: Authorization: Bearer <TOKEN>
+
+METRICS = {
+    'ROOT': config('METRICS_ROOT', default=str(BASE_DIR / 'metrics')),
+    'FLUSH_INTERVAL': 5,
+    'TOKEN': config('METRICS_TOKEN', default=''),
+}
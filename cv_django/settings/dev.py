@@ -0,0 +1,17 @@
+"""
+تنظیمات توسعه
+"""
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, QUERY_BUDGET, Csv, config
+
+DEBUG = config('DEBUG', default=True, cast=bool)
+
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1,[::1]', cast=Csv())
+
+# اتصال دیتابیس برای هر درخواست باز و بسته می شود تا تغییرات runserver ساده باشد
+DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=0, cast=int)
+
+# تعداد query ها در هدر پاسخ و خطا هنگام رد شدن بودجه query
+QUERY_BUDGET = {**QUERY_BUDGET, 'HEADERS': DEBUG, 'RAISE': DEBUG}
+
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
@@ -0,0 +1,45 @@
+"""
+تنظیمات production
+
+SECRET_KEY و ALLOWED_HOSTS باید در محیط تنظیم شوند
+"""
+from .base import *  # noqa: F401,F403
+from .base import Csv, config
+
+DEBUG = False
+
+SECRET_KEY = config('SECRET_KEY')
+
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
+
+CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default='', cast=Csv())
+
+# سایت پشت nginx با HTTPS
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=True, cast=bool)
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
+SECURE_HSTS_SECONDS = config('SECURE_HSTS_SECONDS', default=0, cast=int)
+SECURE_HSTS_INCLUDE_SUBDOMAINS = config('SECURE_HSTS_INCLUDE_SUBDOMAINS', default=False, cast=bool)
+SECURE_CONTENT_TYPE_NOSNIFF = True
+
+# session ها در کش (Redis) و در صورت نبود در دیتابیس
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+SERVER_EMAIL = config('SERVER_EMAIL', default='root@localhost')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+        'mail_admins': {'class': 'django.utils.log.AdminEmailHandler', 'level': 'ERROR'},
+    },
+    'root': {'handlers': ['console'], 'level': config('LOG_LEVEL', default='INFO')},
+    'loggers': {
+        'django.request': {'handlers': ['console', 'mail_admins'], 'level': 'ERROR', 'propagate': False},
+    },
+}
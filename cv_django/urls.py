@@ -16,13 +16,25 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from apps.blog.views import SitemapView
+from apps.core.static import serve_static
+from apps.core.views import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("apps.about.urls")),
     path("blog/", include("apps.blog.urls")),
     path("contact/", include("apps.contact.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path("sitemap.xml", SitemapView.as_view(), name="sitemap"),
+    path("sitemap-<slug:section>.xml", SitemapView.as_view(), name="sitemap_section"),
+    path("metrics", metrics_view, name="metrics"),
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static),
+    ]
@@ -0,0 +1,19 @@
+"""
+worker uvicorn برای اجرای cv_django.asgi با gunicorn (gunicorn.conf.py)
+"""
+from uvicorn.workers import UvicornWorker
+
+
+class DjangoUvicornWorker(UvicornWorker):
+    """
+    - lifespan خاموش است چون جنگو 4.2 این پروتکل را پشتیبانی نمی کند
+      (بدون آن در شروع هر worker هشدار و یک تاخیر کوچک داریم)
+    - uvloop و httptools اگر نصب باشند (uvicorn[standard]) استفاده می شوند
+    """
+    CONFIG_KWARGS = {
+        'loop': 'auto',
+        'http': 'auto',
+        'lifespan': 'off',
+        # هدر Server اطلاعات اضافه ای به کاربر نمی دهد
+        'server_header': False,
+    }
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cv_django.settings')
 
 application = get_wsgi_application()
+
+# بارگذاری ترجمه ها قبل از اولین درخواست (و قبل از fork در gunicorn --preload)
+from apps.core.i18n import warm_translations  # noqa: E402
+
+warm_translations()
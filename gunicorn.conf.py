@@ -0,0 +1,44 @@
+"""
+تنظیمات gunicorn (از پوشه پروژه به صورت خودکار خوانده می شود)
+
+WSGI با worker های gthread (پیش فرض):
+    gunicorn
+ASGI با worker های uvicorn و view های async (settings.ASYNC_VIEWS):
+    GUNICORN_ASGI=True gunicorn
+
+- app با preload_app قبل از fork بارگذاری می شود (ترجمه ها بین worker ها
+  مشترک می مانند؛ thread های پس زمینه بعد از fork دوباره ساخته می شوند)
+- هر worker بعد از max_requests درخواست (با jitter) دوباره ساخته می شود
+  تا رشد حافظه محدود بماند
+- برای تعداد worker و thread ها متغیرهای GUNICORN_* را تنظیم کنید
+"""
+import multiprocessing
+
+# نام config در gunicorn خودش یک تنظیم است
+import decouple
+
+ASGI = decouple.config('GUNICORN_ASGI', default=False, cast=bool)
+CPUS = multiprocessing.cpu_count()
+
+bind = decouple.config('GUNICORN_BIND', default='127.0.0.1:8000')
+
+if ASGI:
+    wsgi_app = 'cv_django.asgi:application'
+    worker_class = 'cv_django.workers.DjangoUvicornWorker'
+    # هر worker یک event loop است و انتظار I/O را با درخواست های دیگر پر می کند
+    workers = decouple.config('GUNICORN_WORKERS', default=CPUS, cast=int)
+else:
+    wsgi_app = 'cv_django.wsgi:application'
+    worker_class = 'gthread'
+    workers = decouple.config('GUNICORN_WORKERS', default=CPUS * 2 + 1, cast=int)
+    threads = decouple.config('GUNICORN_THREADS', default=4, cast=int)
+
+preload_app = True
+max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=5000, cast=int)
+max_requests_jitter = max_requests // 10
+timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = 30
+keepalive = decouple.config('GUNICORN_KEEPALIVE', default=5, cast=int)
+
+accesslog = decouple.config('GUNICORN_ACCESS_LOG', default=None)
+errorlog = '-'
@@ -555,30 +555,33 @@ $(document).ready(function() {
     });
 
     function submitForm(){
-        var name = $("#nameContact").val(),
-            email = $("#emailContact").val(),
-            message = $("#messageContact").val();
-			
-        var url = "assets/php/form-contact.php";
-		
+        var form = $("#contact-form");
+
         $.ajax({
             type: "POST",
-            url: url,
-            data: "name=" + name + "&email=" + email + "&message=" + message,
-            success : function(text){
-                if (text == "success"){
-                    formSuccess();
-                } else {
-                    formError();
-                    submitMSG(false,text);
-                }
+            url: form.attr("action"),
+            data: {
+                name: $("#nameContact").val(),
+                email: $("#emailContact").val(),
+                message: $("#messageContact").val(),
+                website: form.find("[name=website]").val(),
+                csrfmiddlewaretoken: form.find("[name=csrfmiddlewaretoken]").val()
+            },
+            dataType: "json",
+            success : function(response){
+                formSuccess(response.message);
+            },
+            error: function(xhr){
+                var response = xhr.responseJSON || {};
+                formError();
+                submitMSG(false, response.message || "خطا در ارسال پیام. لطفا دوباره تلاش کنید.");
             }
         });
     }
 
-    function formSuccess(){
+    function formSuccess(msg){
         $("#contact-form")[0].reset();
-        submitMSG(true, "Thanks! Your message has been sent.");
+        submitMSG(true, msg || "پیام شما با موفقیت ارسال شد.");
     }
   
     function formError(){